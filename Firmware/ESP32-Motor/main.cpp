@@ -64,6 +64,8 @@
 #define UART_RX_PIN         1   // RX from Pi
 #define UART_TX_PIN         3   // TX to Pi
 #define UART_BAUD           115200
+#define UART_CHUNK_SIZE     128     // Bytes pulled from the UART driver per read
+#define UART_LINE_SIZE      2048    // Longest accepted command line
 
 // ==================== MOTOR CONFIGURATION ====================
 
@@ -90,6 +92,9 @@
 #define MAX_X_MM            400.0
 #define MAX_Y_MM            400.0
 
+// Command sequences (e.g. pick up, carry and drop a piece in one request)
+#define MAX_SEQUENCE_STEPS  16
+
 // ==================== GLOBAL VARIABLES ====================
 
 // Hardware Serial for TMC2226 communication
@@ -115,6 +120,7 @@ long targetStepsY = 0;
 // Movement state
 bool isMoving = false;
 bool isHomed = false;
+long moveRequestId = 0;  // Request answered when the current move finishes
 
 // Speed and acceleration
 float currentSpeed = DEFAULT_SPEED;
@@ -123,9 +129,30 @@ unsigned long stepDelay = 1000000 / DEFAULT_SPEED; // microseconds
 // Electromagnet states
 bool magnetStates[4] = {false, false, false, false};
 
+// Queued command sequence, executed step by step from loop()
+enum SequenceOp { SEQ_MOVE, SEQ_MAGNET_ON, SEQ_MAGNET_OFF, SEQ_WAIT };
+
+struct SequenceStep {
+    SequenceOp op;
+    float x;              // SEQ_MOVE target (mm)
+    float y;
+    float speed;          // SEQ_MOVE speed, 0 = keep current
+    unsigned long ms;     // SEQ_WAIT duration
+};
+
+SequenceStep sequenceSteps[MAX_SEQUENCE_STEPS];
+int sequenceLength = 0;
+int sequenceIndex = 0;
+bool sequenceActive = false;
+unsigned long sequenceWaitUntil = 0;
+long sequenceRequestId = 0;
+
 // JSON buffer
 StaticJsonDocument<2048> jsonDoc;
-String inputBuffer = "";
+
+// Current command line from the Pi (without the trailing newline)
+char inputBuffer[UART_LINE_SIZE];
+size_t inputLength = 0;
 
 // Timing
 unsigned long lastStepTime = 0;
@@ -134,17 +161,21 @@ unsigned long lastStepTime = 0;
 
 void setupPins();
 void setupMotorDrivers();
-void homeGantry();
-void moveToAbsolute(float targetX, float targetY);
-void moveRelative(float deltaX, float deltaY);
+void homeGantry(long requestId = 0);
+void moveToAbsolute(float targetX, float targetY, long requestId = 0);
+void moveRelative(float deltaX, float deltaY, long requestId = 0);
 void stepMotors();
 void calculateHBotSteps(long targetX, long targetY, long& stepsA, long& stepsB);
 void setMagnet(int magnetIndex, bool state);
 void setAllMagnets(bool state);
+void startSequence(JsonArray steps, long requestId);
+void runSequence();
+void abortSequence();
 void setFanSpeed(int fanIndex, int pwmValue);
+void readUARTCommands();
 void processUARTCommand();
-void sendStatus(const char* status, const char* message = nullptr);
-void sendPositionUpdate();
+void sendStatus(const char* status, const char* message = nullptr, long requestId = 0);
+void sendPositionUpdate(long requestId = 0);
 
 // ==================== SETUP ====================
 
@@ -177,18 +208,33 @@ void loop() {
     // Execute movement if in motion
     if (isMoving) {
         stepMotors();
+    } else if (sequenceActive) {
+        runSequence();
     }
     
     // Process UART commands from Pi
-    while (Serial1.available()) {
-        char c = Serial1.read();
+    readUARTCommands();
+}
+
+// Drain everything the UART driver has buffered in one read, then split
+// lines in memory (one driver call per chunk instead of ~3 per byte)
+void readUARTCommands() {
+    int available = Serial1.available();
+    
+    while (available > 0) {
+        uint8_t chunk[UART_CHUNK_SIZE];
+        size_t count = Serial1.readBytes(chunk, min(available, UART_CHUNK_SIZE));
         
-        if (c == '\n') {
-            processUARTCommand();
-            inputBuffer = "";
-        } else {
-            inputBuffer += c;
+        for (size_t i = 0; i < count; i++) {
+            if (chunk[i] == '\n') {
+                processUARTCommand();
+                inputLength = 0;
+            } else if (inputLength < UART_LINE_SIZE) {
+                inputBuffer[inputLength++] = chunk[i];
+            }
         }
+        
+        available -= count;
     }
 }
 
@@ -277,7 +323,7 @@ void setupMotorDrivers() {
 
 // ==================== HOMING ====================
 
-void homeGantry() {
+void homeGantry(long requestId) {
     Serial.println("Starting homing sequence...");
     
     isHomed = false;
@@ -323,15 +369,15 @@ void homeGantry() {
     isHomed = true;
     
     Serial.println("Homing complete");
-    sendStatus("homed", "Gantry homed to (0, 0)");
+    sendStatus("homed", "Gantry homed to (0, 0)", requestId);
 }
 
 // ==================== MOVEMENT ====================
 
-void moveToAbsolute(float targetX, float targetY) {
+void moveToAbsolute(float targetX, float targetY, long requestId) {
     if (!isHomed) {
         Serial.println("ERROR: Cannot move - not homed");
-        sendStatus("error", "Gantry not homed");
+        sendStatus("error", "Gantry not homed", requestId);
         return;
     }
     
@@ -349,11 +395,13 @@ void moveToAbsolute(float targetX, float targetY) {
     targetStepsX = (long)(targetX * STEPS_PER_MM);
     targetStepsY = (long)(targetY * STEPS_PER_MM);
     
+    // The position update sent on arrival answers this request
+    moveRequestId = requestId;
     isMoving = true;
 }
 
-void moveRelative(float deltaX, float deltaY) {
-    moveToAbsolute(currentPosX + deltaX, currentPosY + deltaY);
+void moveRelative(float deltaX, float deltaY, long requestId) {
+    moveToAbsolute(currentPosX + deltaX, currentPosY + deltaY, requestId);
 }
 
 void stepMotors() {
@@ -364,7 +412,8 @@ void stepMotors() {
     // Check if we've reached target
     if (remainingX == 0 && remainingY == 0) {
         isMoving = false;
-        sendPositionUpdate();
+        sendPositionUpdate(moveRequestId);
+        moveRequestId = 0;
         Serial.println("Movement complete");
         return;
     }
@@ -437,6 +486,102 @@ void setAllMagnets(bool state) {
     }
 }
 
+// ==================== COMMAND SEQUENCES ====================
+
+void startSequence(JsonArray steps, long requestId) {
+    if (!isHomed) {
+        sendStatus("error", "Gantry not homed", requestId);
+        return;
+    }
+    
+    if (sequenceActive) {
+        sendStatus("error", "Sequence already running", requestId);
+        return;
+    }
+    
+    if (steps.isNull() || steps.size() > MAX_SEQUENCE_STEPS) {
+        sendStatus("error", "Invalid sequence", requestId);
+        return;
+    }
+    
+    // Copy the steps out of the JSON document (it is reused by the next command)
+    int length = 0;
+    for (JsonObject step : steps) {
+        const char* op = step["cmd"] | "";
+        SequenceStep& entry = sequenceSteps[length];
+        
+        if (strcmp(op, "move_absolute") == 0) {
+            entry.op = SEQ_MOVE;
+            entry.x = step["x"] | 0.0;
+            entry.y = step["y"] | 0.0;
+            entry.speed = step["speed"] | 0.0;
+        } else if (strcmp(op, "magnet_on") == 0) {
+            entry.op = SEQ_MAGNET_ON;
+        } else if (strcmp(op, "magnet_off") == 0) {
+            entry.op = SEQ_MAGNET_OFF;
+        } else if (strcmp(op, "wait") == 0) {
+            entry.op = SEQ_WAIT;
+            entry.ms = step["ms"] | 0;
+        } else {
+            sendStatus("error", "Unknown sequence step", requestId);
+            return;
+        }
+        length++;
+    }
+    
+    sequenceLength = length;
+    sequenceIndex = 0;
+    sequenceWaitUntil = 0;
+    sequenceRequestId = requestId;
+    sequenceActive = true;
+}
+
+void runSequence() {
+    // Called from loop() whenever the gantry is idle
+    if (millis() < sequenceWaitUntil) {
+        return;
+    }
+    
+    // Every step done (last move arrived, last wait elapsed): answer the request
+    if (sequenceIndex == sequenceLength) {
+        sequenceActive = false;
+        sendPositionUpdate(sequenceRequestId);
+        sequenceRequestId = 0;
+        return;
+    }
+    
+    SequenceStep& step = sequenceSteps[sequenceIndex++];
+    
+    switch (step.op) {
+        case SEQ_MOVE:
+            if (step.speed > 0) {
+                currentSpeed = step.speed;
+                stepDelay = 1000000 / currentSpeed;
+            }
+            moveToAbsolute(step.x, step.y);
+            break;
+        case SEQ_MAGNET_ON:
+            setAllMagnets(true);
+            break;
+        case SEQ_MAGNET_OFF:
+            setAllMagnets(false);
+            break;
+        case SEQ_WAIT:
+            sequenceWaitUntil = millis() + step.ms;
+            break;
+    }
+}
+
+void abortSequence() {
+    if (!sequenceActive) {
+        return;
+    }
+    
+    sequenceActive = false;
+    sendStatus("stopped", "Sequence aborted", sequenceRequestId);
+    sequenceRequestId = 0;
+}
+
 // ==================== FAN CONTROL ====================
 
 void setFanSpeed(int fanIndex, int pwmValue) {
@@ -455,7 +600,7 @@ void setFanSpeed(int fanIndex, int pwmValue) {
 
 void processUARTCommand() {
     // Parse JSON command
-    DeserializationError error = deserializeJson(jsonDoc, inputBuffer);
+    DeserializationError error = deserializeJson(jsonDoc, inputBuffer, inputLength);
     
     if (error) {
         Serial.print("JSON parse error: ");
@@ -465,6 +610,7 @@ void processUARTCommand() {
     
     JsonObject cmd = jsonDoc.as<JsonObject>();
     const char* cmdType = cmd["cmd"];
+    long requestId = cmd["id"] | 0;
     
     if (cmdType == nullptr) {
         Serial.println("No 'cmd' field in JSON");
@@ -473,7 +619,7 @@ void processUARTCommand() {
     
     // Route command
     if (strcmp(cmdType, "home") == 0) {
-        homeGantry();
+        homeGantry(requestId);
     }
     else if (strcmp(cmdType, "move_absolute") == 0) {
         float x = cmd["x"] | 0.0;
@@ -484,12 +630,12 @@ void processUARTCommand() {
             stepDelay = 1000000 / currentSpeed;
         }
         
-        moveToAbsolute(x, y);
+        moveToAbsolute(x, y, requestId);
     }
     else if (strcmp(cmdType, "move_relative") == 0) {
         float dx = cmd["dx"] | 0.0;
         float dy = cmd["dy"] | 0.0;
-        moveRelative(dx, dy);
+        moveRelative(dx, dy, requestId);
     }
     else if (strcmp(cmdType, "magnet_on") == 0) {
         if (cmd.containsKey("magnet")) {
@@ -512,14 +658,19 @@ void processUARTCommand() {
         int speed = cmd["speed"] | 128;
         setFanSpeed(fan - 1, speed);
     }
+    else if (strcmp(cmdType, "sequence") == 0) {
+        startSequence(cmd["steps"].as<JsonArray>(), requestId);
+    }
     else if (strcmp(cmdType, "stop") == 0) {
+        abortSequence();
         isMoving = false;
         targetStepsX = currentStepsX;
         targetStepsY = currentStepsY;
-        sendStatus("stopped", "Movement stopped");
+        sendStatus("stopped", "Movement stopped", moveRequestId);
+        moveRequestId = 0;
     }
     else if (strcmp(cmdType, "get_position") == 0) {
-        sendPositionUpdate();
+        sendPositionUpdate(requestId);
     }
     else {
         Serial.print("Unknown command: ");
@@ -529,12 +680,17 @@ void processUARTCommand() {
 
 // ==================== STATUS REPORTING ====================
 
-void sendStatus(const char* status, const char* message) {
+void sendStatus(const char* status, const char* message, long requestId) {
     jsonDoc.clear();
     jsonDoc["type"] = "status";
     jsonDoc["status"] = status;
     jsonDoc["controller"] = "motor";
     
+    // Tag replies with the id of the request they answer
+    if (requestId) {
+        jsonDoc["id"] = requestId;
+    }
+    
     if (message) {
         jsonDoc["message"] = message;
     }
@@ -543,9 +699,13 @@ void sendStatus(const char* status, const char* message) {
     Serial1.println();
 }
 
-void sendPositionUpdate() {
+void sendPositionUpdate(long requestId) {
     jsonDoc.clear();
     jsonDoc["type"] = "position";
+    
+    if (requestId) {
+        jsonDoc["id"] = requestId;
+    }
     jsonDoc["x"] = currentPosX;
     jsonDoc["y"] = currentPosY;
     jsonDoc["homed"] = isHomed;
@@ -5,7 +5,7 @@
  * - Scan 64 Hall Effect sensors via 4x CD74HC4067 multiplexers
  * - Control 64 WS2812B LEDs for board visualization
  * - Read 6 buttons and 2 rotary encoders
- * - Communicate with Raspberry Pi via UART (JSON protocol)
+ * - Communicate with Raspberry Pi via UART (JSON protocol, binary scan frames)
  * 
  * Hardware:
  * - ESP32-S3 DevKit C-1
@@ -62,6 +62,14 @@
 #define UART_RX_PIN   1   // RX from Pi
 #define UART_TX_PIN   3   // TX to Pi
 #define UART_BAUD     115200
+#define UART_CHUNK_SIZE 128   // Bytes pulled from the UART driver per read
+#define UART_LINE_SIZE  2048  // Longest accepted command line
+
+// Binary frames (little-endian), used for the sensor scan hot path
+#define FRAME_MAGIC         0xA5  // First byte of a binary frame (never starts a JSON line)
+#define FRAME_SCAN          0x01  // Scan request / sensor bitboard reply
+#define SCAN_REQUEST_SIZE   6     // magic, cmd, uint32 request id
+#define SCAN_FRAME_SIZE     14    // magic, cmd, uint32 request id, uint64 bitboard
 
 // ==================== CONSTANTS ====================
 
@@ -72,9 +80,10 @@
 
 // ==================== GLOBAL VARIABLES ====================
 
-// Sensor state (8x8 matrix, true = piece detected)
-bool sensorState[BOARD_SIZE][BOARD_SIZE];
-bool lastSensorState[BOARD_SIZE][BOARD_SIZE];
+// Sensor state as bitboards: bit (rank * 8 + file) set = piece detected,
+// i.e. bit 0 = a1 ... bit 63 = h8 (same layout as python-chess)
+uint64_t sensorBitboard = 0;
+uint64_t lastSensorBitboard = 0;
 
 // LED control
 Adafruit_NeoPixel strip(LED_COUNT, LED_DATA_PIN, NEO_GRB + NEO_KHZ800);
@@ -95,7 +104,14 @@ unsigned long lastScanTime = 0;
 
 // JSON buffer
 StaticJsonDocument<2048> jsonDoc;
-String inputBuffer = "";
+
+// Current command line from the Pi (without the trailing newline)
+char inputBuffer[UART_LINE_SIZE];
+size_t inputLength = 0;
+
+// Current binary frame from the Pi (collecting while frameLength > 0)
+uint8_t frameBuffer[SCAN_REQUEST_SIZE];
+size_t frameLength = 0;
 
 // LED theme/colors
 struct LEDTheme {
@@ -110,12 +126,14 @@ struct LEDTheme {
 
 void setupPins();
 void setupLEDs();
-void scanSensors();
+bool scanSensors();
 void readButtons();
-void sendSensorUpdate();
+void sendSensorUpdate(uint32_t requestId = 0);
 void sendButtonEvent(int buttonIndex, bool pressed);
 void sendEncoderEvent(int encoderIndex, int delta);
+void readUARTCommands();
 void processUARTCommand();
+void processBinaryCommand();
 void handleLEDCommand(JsonObject& cmd);
 void handleConfigCommand(JsonObject& cmd);
 void setLEDSquare(int file, int rank, uint32_t color);
@@ -139,8 +157,8 @@ void setup() {
     setupLEDs();
     
     // Initialize sensor state to all empty
-    memset(sensorState, 0, sizeof(sensorState));
-    memset(lastSensorState, 0, sizeof(lastSensorState));
+    sensorBitboard = 0;
+    lastSensorBitboard = 0;
     
     // Set default LED theme
     currentTheme.backgroundColor = strip.Color(0, 0, 0);        // Black
@@ -165,9 +183,11 @@ void setup() {
 void loop() {
     unsigned long currentTime = millis();
     
-    // Scan sensors at regular interval
+    // Scan sensors at regular interval, send update to Pi on change
     if (currentTime - lastScanTime >= SCAN_INTERVAL_MS) {
-        scanSensors();
+        if (scanSensors()) {
+            sendSensorUpdate();
+        }
         lastScanTime = currentTime;
     }
     
@@ -188,15 +208,35 @@ void loop() {
     }
     
     // Process UART commands from Pi
-    while (Serial1.available()) {
-        char c = Serial1.read();
+    readUARTCommands();
+}
+
+// Drain everything the UART driver has buffered in one read, then split
+// lines and binary frames in memory (one driver call per chunk instead of
+// ~3 per byte)
+void readUARTCommands() {
+    int available = Serial1.available();
+    
+    while (available > 0) {
+        uint8_t chunk[UART_CHUNK_SIZE];
+        size_t count = Serial1.readBytes(chunk, min(available, UART_CHUNK_SIZE));
         
-        if (c == '\n') {
-            processUARTCommand();
-            inputBuffer = "";
-        } else {
-            inputBuffer += c;
+        for (size_t i = 0; i < count; i++) {
+            if (frameLength > 0 || (inputLength == 0 && chunk[i] == FRAME_MAGIC)) {
+                frameBuffer[frameLength++] = chunk[i];
+                if (frameLength == SCAN_REQUEST_SIZE) {
+                    processBinaryCommand();
+                    frameLength = 0;
+                }
+            } else if (chunk[i] == '\n') {
+                processUARTCommand();
+                inputLength = 0;
+            } else if (inputLength < UART_LINE_SIZE) {
+                inputBuffer[inputLength++] = chunk[i];
+            }
         }
+        
+        available -= count;
     }
 }
 
@@ -262,8 +302,9 @@ void setupLEDs() {
 
 // ==================== SENSOR SCANNING ====================
 
-void scanSensors() {
-    bool changed = false;
+// Returns true if the occupancy changed since the previous scan
+bool scanSensors() {
+    uint64_t bitboard = 0;
     
     // Scan all 64 sensors (8x8 matrix)
     for (int rank = 0; rank < BOARD_SIZE; rank++) {
@@ -276,22 +317,22 @@ void scanSensors() {
             // Read sensor (active LOW, so invert)
             bool pieceDetected = !readMultiplexer(muxIndex, channel);
             
-            sensorState[rank][file] = pieceDetected;
-            
-            // Check for changes
-            if (sensorState[rank][file] != lastSensorState[rank][file]) {
-                changed = true;
+            if (pieceDetected) {
+                bitboard |= 1ULL << (rank * BOARD_SIZE + file);
             }
         }
     }
     
-    // If board state changed, send update to Pi
-    if (changed) {
-        sendSensorUpdate();
-        
-        // Update last known state
-        memcpy(lastSensorState, sensorState, sizeof(sensorState));
+    sensorBitboard = bitboard;
+    
+    // Board state changed? (one compare)
+    if (sensorBitboard == lastSensorBitboard) {
+        return false;
     }
+    
+    // Update last known state
+    lastSensorBitboard = sensorBitboard;
+    return true;
 }
 
 uint8_t readMultiplexer(uint8_t muxIndex, uint8_t channel) {
@@ -317,22 +358,21 @@ uint8_t readMultiplexer(uint8_t muxIndex, uint8_t channel) {
     return value;
 }
 
-void sendSensorUpdate() {
-    // Build JSON message with sensor matrix
-    jsonDoc.clear();
-    jsonDoc["type"] = "sensor_update";
+void sendSensorUpdate(uint32_t requestId) {
+    // Fixed 14-byte binary frame; requestId is 0 for unsolicited updates
+    uint8_t frame[SCAN_FRAME_SIZE];
+    frame[0] = FRAME_MAGIC;
+    frame[1] = FRAME_SCAN;
     
-    JsonArray sensors = jsonDoc.createNestedArray("sensors");
+    for (int i = 0; i < 4; i++) {
+        frame[2 + i] = (requestId >> (8 * i)) & 0xFF;
+    }
     
-    for (int rank = 0; rank < BOARD_SIZE; rank++) {
-        JsonArray row = sensors.createNestedArray();
-        for (int file = 0; file < BOARD_SIZE; file++) {
-            row.add(sensorState[rank][file]);
-        }
+    for (int i = 0; i < 8; i++) {
+        frame[6 + i] = (sensorBitboard >> (8 * i)) & 0xFF;
     }
     
-    serializeJson(jsonDoc, Serial1);
-    Serial1.println();
+    Serial1.write(frame, SCAN_FRAME_SIZE);
     
     Serial.println("Sensor update sent");
 }
@@ -419,7 +459,7 @@ void sendEncoderEvent(int encoderIndex, int delta) {
 
 void processUARTCommand() {
     // Parse JSON command
-    DeserializationError error = deserializeJson(jsonDoc, inputBuffer);
+    DeserializationError error = deserializeJson(jsonDoc, inputBuffer, inputLength);
     
     if (error) {
         Serial.print("JSON parse error: ");
@@ -429,6 +469,7 @@ void processUARTCommand() {
     
     JsonObject cmd = jsonDoc.as<JsonObject>();
     const char* cmdType = cmd["cmd"];
+    uint32_t requestId = cmd["id"] | 0;
     
     if (cmdType == nullptr) {
         Serial.println("No 'cmd' field in JSON");
@@ -437,8 +478,9 @@ void processUARTCommand() {
     
     // Route command
     if (strcmp(cmdType, "scan_sensors") == 0) {
+        // Legacy JSON request, answered with the binary frame
         scanSensors();
-        sendSensorUpdate();
+        sendSensorUpdate(requestId);
     }
     else if (strcmp(cmdType, "highlight_squares") == 0) {
         handleLEDCommand(cmd);
@@ -466,6 +508,22 @@ void processUARTCommand() {
     }
 }
 
+void processBinaryCommand() {
+    uint32_t requestId = 0;
+    for (int i = 0; i < 4; i++) {
+        requestId |= (uint32_t)frameBuffer[2 + i] << (8 * i);
+    }
+    
+    if (frameBuffer[1] == FRAME_SCAN) {
+        scanSensors();
+        sendSensorUpdate(requestId);
+    }
+    else {
+        Serial.print("Unknown binary command: ");
+        Serial.println(frameBuffer[1]);
+    }
+}
+
 // ==================== LED CONTROL ====================
 
 void handleLEDCommand(JsonObject& cmd) {
@@ -0,0 +1,69 @@
+"""
+CPU affinity for the Smart Chess Board.
+The event loop thread gets ORCHESTRATOR_CPU to itself; threads and processes
+started afterwards would inherit that mask on Linux, so each one is moved to
+WORKER_CPUS (executor workers, stream threads, Stockfish processes).
+"""
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Core reserved for the event loop
+ORCHESTRATOR_CPU = 0
+
+# Every other core: Stockfish, executor workers and helper threads
+# (empty on a single-core machine, where nothing is pinned)
+WORKER_CPUS = frozenset(range(os.cpu_count() or 1)) - {ORCHESTRATOR_CPU}
+
+
+def _affinity_supported() -> bool:
+    """True when there is a spare core and the OS supports affinity masks"""
+    return bool(WORKER_CPUS) and hasattr(os, "sched_setaffinity")
+
+
+def pin_orchestrator():
+    """
+    Pin the calling thread (the event loop) to ORCHESTRATOR_CPU.
+    
+    Only the calling thread is pinned; threads and processes that were
+    already running keep their mask. Call it once the subsystems are up.
+    """
+    if not _affinity_supported():
+        return
+    try:
+        os.sched_setaffinity(0, {ORCHESTRATOR_CPU})
+        logger.info(f"Event loop pinned to CPU {ORCHESTRATOR_CPU}")
+    except OSError as e:
+        logger.warning(f"Could not pin event loop to CPU {ORCHESTRATOR_CPU}: {e}")
+
+
+def pin_worker_thread():
+    """Move the calling thread off the event loop's core (use as a thread initializer)"""
+    if not _affinity_supported():
+        return
+    try:
+        os.sched_setaffinity(0, WORKER_CPUS)
+    except OSError as e:
+        logger.warning(f"Could not pin worker thread to CPUs {sorted(WORKER_CPUS)}: {e}")
+
+
+def pin_worker_process(pid: Optional[int], name: str = "process"):
+    """
+    Move a child process off the event loop's core.
+    
+    Call it right after spawning, before the child starts its own threads
+    (Stockfish creates its search threads when "Threads" is set), so they
+    inherit the worker mask.
+    
+    Args:
+        pid: Child process id (None is ignored)
+        name: Process name for the log message
+    """
+    if pid is None or not _affinity_supported():
+        return
+    try:
+        os.sched_setaffinity(pid, WORKER_CPUS)
+    except OSError as e:
+        logger.warning(f"Could not pin {name} (pid {pid}) to CPUs {sorted(WORKER_CPUS)}: {e}")
@@ -3,13 +3,445 @@ Database manager for the Smart Chess Board.
 Handles all database operations using SQLite with async support.
 """
 import aiosqlite
+import asyncio
 import logging
+import struct
+from collections import OrderedDict
+from enum import IntFlag
+from functools import lru_cache
 from datetime import datetime
+from contextlib import asynccontextmanager
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Full schema, applied with a single executescript call
+SCHEMA_DDL = """
+-- Table 1: Users
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    display_name TEXT,
+    email TEXT UNIQUE,
+    password_hash TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP,
+    total_games INTEGER DEFAULT 0,
+    wins INTEGER DEFAULT 0,
+    losses INTEGER DEFAULT 0,
+    draws INTEGER DEFAULT 0
+);
+
+-- Table 2: UserSettings
+CREATE TABLE IF NOT EXISTS user_settings (
+    user_id INTEGER PRIMARY KEY,
+    -- Motor & Movement
+    motor_speed TEXT DEFAULT 'MEDIUM',  -- SLOW/MEDIUM/FAST
+    move_animation_speed TEXT DEFAULT 'MEDIUM',
+    
+    -- On/off preferences packed into one bitmask (see SettingsFlags)
+    flags INTEGER DEFAULT 16382,  -- everything on except clock, auto-queen and confirm
+    
+    -- Chess Clock
+    clock_time_minutes INTEGER DEFAULT 10,
+    clock_increment_seconds INTEGER DEFAULT 0,
+    
+    -- Move Evaluation
+    evaluation_level TEXT DEFAULT 'BASIC',  -- NONE/BASIC/ADVANCED
+    hint_count INTEGER DEFAULT 3,
+    
+    -- LEDs
+    led_brightness INTEGER DEFAULT 128,  -- 0-255
+    led_theme TEXT DEFAULT 'CLASSIC',  -- CLASSIC/MODERN/RAINBOW/etc
+    
+    -- Engine
+    engine_difficulty INTEGER DEFAULT 5,  -- 0-19: UCI_Elo 1320-3190 (5 ~ 1787), 20: full strength
+    engine_type TEXT DEFAULT 'STOCKFISH',
+    
+    -- Voice Recognition
+    voice_language TEXT DEFAULT 'en-US',
+    
+    -- UI Preferences
+    ui_theme TEXT DEFAULT 'DARK',  -- DARK/LIGHT
+    sound_volume INTEGER DEFAULT 70,  -- 0-100
+    
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+-- Table 3: Games
+CREATE TABLE IF NOT EXISTS games (
+    game_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    white_user_id INTEGER,
+    black_user_id INTEGER,  -- NULL for AI
+    game_mode TEXT NOT NULL,  -- OFFLINE_PVP/VS_ENGINE/ONLINE_LICHESS
+    start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    end_time TIMESTAMP,
+    result TEXT,  -- WHITE_WIN/BLACK_WIN/DRAW/ABANDONED
+    termination TEXT,  -- CHECKMATE/STALEMATE/RESIGNATION/TIME/AGREEMENT
+    opening_name TEXT,
+    final_fen TEXT,
+    
+    -- Clock data
+    white_time_remaining INTEGER,  -- seconds
+    black_time_remaining INTEGER,
+    
+    -- Online game reference
+    lichess_game_id TEXT,
+    
+    FOREIGN KEY (white_user_id) REFERENCES users(user_id) ON DELETE SET NULL,
+    FOREIGN KEY (black_user_id) REFERENCES users(user_id) ON DELETE SET NULL
+);
+
+-- Table 4: MoveHistory
+CREATE TABLE IF NOT EXISTS move_history (
+    move_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_id INTEGER NOT NULL,
+    move_number INTEGER NOT NULL,
+    side TEXT NOT NULL,  -- WHITE/BLACK
+    move_notation TEXT NOT NULL,  -- e.g., "e2e4"
+    san_notation TEXT,  -- Standard Algebraic Notation: "Nf3"
+    fen_after BLOB,  -- Board state after move (packed, see _pack_fen; legacy rows hold FEN text)
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    time_taken INTEGER,  -- milliseconds
+    
+    -- Move evaluation (from Stockfish)
+    evaluation_cp INTEGER,  -- centipawns
+    evaluation_mate INTEGER,  -- moves to mate (NULL if not applicable)
+    classification TEXT,  -- BRILLIANT/EXCELLENT/GOOD/INACCURACY/MISTAKE/BLUNDER
+    
+    FOREIGN KEY (game_id) REFERENCES games(game_id) ON DELETE CASCADE
+);
+
+-- Table 5: Graveyard (piece capture positions)
+CREATE TABLE IF NOT EXISTS graveyard (
+    graveyard_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_id INTEGER NOT NULL,
+    side TEXT NOT NULL,  -- WHITE/BLACK (which side's pieces)
+    coordinate TEXT NOT NULL,  -- e.g., "G1", "G2" (graveyard position)
+    piece_type TEXT NOT NULL,  -- PAWN/KNIGHT/BISHOP/ROOK/QUEEN
+    occupied BOOLEAN DEFAULT 1,
+    captured_on_move INTEGER,  -- move number when captured
+    
+    FOREIGN KEY (game_id) REFERENCES games(game_id) ON DELETE CASCADE
+);
+
+-- Table 6: CustomPositions (for board editor)
+CREATE TABLE IF NOT EXISTS custom_positions (
+    position_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    fen TEXT NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    times_used INTEGER DEFAULT 0,
+    
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+
+-- Indexes for the hot reader predicates
+CREATE INDEX IF NOT EXISTS idx_moves_game ON move_history(game_id, move_number);
+CREATE INDEX IF NOT EXISTS idx_games_white ON games(white_user_id, start_time DESC);
+CREATE INDEX IF NOT EXISTS idx_games_black ON games(black_user_id, start_time DESC);
+CREATE INDEX IF NOT EXISTS idx_graveyard_game ON graveyard(game_id) WHERE occupied = 1;
+CREATE INDEX IF NOT EXISTS idx_positions_user ON custom_positions(user_id, created_at DESC);
+"""
+
+# Stored in PRAGMA user_version; _migrate_schema upgrades older databases
+# 1: boolean settings packed into user_settings.flags, fen_after packed to BLOB
+SCHEMA_VERSION = 1
+
+# Bulk inserts are split so each statement binds at most this many parameters
+MAX_SQL_PARAMS = 500
+MOVE_COLUMN_COUNT = 7
+MOVE_ROW_PLACEHOLDER = "(" + ", ".join(["?"] * MOVE_COLUMN_COUNT) + ")"
+
+# Per-connection prepared statement cache (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Column lists for the hot readers (password_hash and fen_after are left out)
+USER_COLUMNS = (
+    "user_id, username, display_name, email, created_at, last_login, "
+    "total_games, wins, losses, draws"
+)
+GAME_COLUMNS = (
+    "game_id, white_user_id, black_user_id, game_mode, start_time, end_time, "
+    "result, termination, opening_name, final_fen, "
+    "white_time_remaining, black_time_remaining, lichess_game_id"
+)
+MOVE_COLUMNS = (
+    "move_id, move_number, side, move_notation, san_notation, time_taken, "
+    "evaluation_cp, evaluation_mate, classification"
+)
+GRAVEYARD_COLUMNS = "graveyard_id, game_id, side, coordinate, piece_type, captured_on_move"
+
+# Hot-path statements, kept as constants so every call reuses the cached plan
+SQL_GET_USER = f"SELECT {USER_COLUMNS} FROM users WHERE user_id = ?"
+SQL_GET_USER_BY_USERNAME = f"SELECT {USER_COLUMNS} FROM users WHERE username = ?"
+SQL_TOUCH_LAST_LOGIN = "UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE user_id = ?"
+SQL_SAVE_GAME_RESULT = """
+    UPDATE games 
+    SET end_time = CURRENT_TIMESTAMP, result = ?, termination = ?, final_fen = ?
+    WHERE game_id = ?
+"""
+# Params: (result, win_result, result, loss_result, result, user_id)
+SQL_RECORD_USER_RESULT = """
+    UPDATE users
+    SET total_games = total_games + 1,
+        wins = wins + (? = ?),
+        losses = losses + (? = ?),
+        draws = draws + (? = 'DRAW')
+    WHERE user_id = ?
+"""
+# Stats from the white player's perspective; unknown results match no row
+SQL_UPDATE_USER_STATS = """
+    UPDATE users
+    SET total_games = total_games + 1,
+        wins = wins + (? = 'WHITE_WIN'),
+        losses = losses + (? = 'BLACK_WIN'),
+        draws = draws + (? = 'DRAW')
+    WHERE user_id = ? AND ? IN ('WHITE_WIN', 'BLACK_WIN', 'DRAW')
+"""
+COUNTED_RESULTS = frozenset({"WHITE_WIN", "BLACK_WIN", "DRAW"})
+SQL_GET_USER_SETTINGS = "SELECT * FROM user_settings WHERE user_id = ?"
+SQL_GET_GAME = f"SELECT {GAME_COLUMNS} FROM games WHERE game_id = ?"
+SQL_GET_USER_GAMES = f"""
+    SELECT {GAME_COLUMNS} FROM (
+        SELECT {GAME_COLUMNS} FROM games WHERE white_user_id = ?
+        UNION ALL
+        -- Skip games already matched as white (same user on both sides)
+        SELECT {GAME_COLUMNS} FROM games WHERE black_user_id = ? AND white_user_id IS NOT ?
+    )
+    ORDER BY start_time DESC
+    LIMIT ?
+"""
+SQL_INSERT_MOVE = """
+    INSERT INTO move_history 
+    (game_id, move_number, side, move_notation, san_notation, fen_after, time_taken)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+SQL_UPDATE_MOVE_EVALUATION = """
+    UPDATE move_history 
+    SET evaluation_cp = ?, evaluation_mate = ?, classification = ?
+    WHERE move_id = ?
+"""
+# Robot-game moves of a user's most recent games, first plies only
+# Params: (user_id, user_id, user_id, game_limit, max_ply)
+SQL_GET_OPENING_MOVES = """
+    SELECT m.game_id, g.white_user_id = ? AS user_is_white, m.move_notation
+    FROM move_history m JOIN games g ON g.game_id = m.game_id
+    WHERE m.game_id IN (
+        SELECT game_id FROM games
+        WHERE (white_user_id = ? OR black_user_id = ?) AND game_mode = 'VS_ENGINE'
+        ORDER BY game_id DESC LIMIT ?
+    ) AND m.move_number <= ?
+    ORDER BY m.game_id, m.move_number
+"""
+SQL_GET_GAME_MOVES = f"""
+    SELECT {MOVE_COLUMNS} FROM move_history 
+    WHERE game_id = ?
+    ORDER BY move_number ASC
+"""
+SQL_GET_GAME_MOVES_WITH_FEN = f"""
+    SELECT {MOVE_COLUMNS}, fen_after, timestamp FROM move_history 
+    WHERE game_id = ?
+    ORDER BY move_number ASC
+"""
+SQL_SEED_GRAVEYARD = """
+    INSERT INTO graveyard (game_id, side, coordinate, piece_type, occupied)
+    VALUES (?, ?, ?, '', 0)
+"""
+SQL_OCCUPY_GRAVEYARD = """
+    UPDATE graveyard SET occupied = 1, piece_type = ?, captured_on_move = ?
+    WHERE game_id = ? AND side = ? AND coordinate = ?
+"""
+SQL_GET_GRAVEYARD_STATE = f"""
+    SELECT {GRAVEYARD_COLUMNS} FROM graveyard 
+    WHERE game_id = ? AND occupied = 1
+    ORDER BY captured_on_move ASC
+"""
+SQL_GET_CUSTOM_POSITIONS = """
+    SELECT * FROM custom_positions 
+    WHERE user_id = ?
+    ORDER BY created_at DESC
+"""
+
+# Fixed graveyard slots per side (G1..G15), seeded empty when a game is created
+GRAVEYARD_SLOTS_PER_SIDE = 15
+GRAVEYARD_SLOTS = tuple(
+    (side, f"G{slot}")
+    for side in ("WHITE", "BLACK")
+    for slot in range(1, GRAVEYARD_SLOTS_PER_SIDE + 1)
+)
+
+
+
+class SettingsFlags(IntFlag):
+    """Boolean user settings, stored together in user_settings.flags"""
+    CLOCK_ENABLED = 1 << 0
+    EVALUATION_ENABLED = 1 << 1
+    SHOW_BLUNDERS = 1 << 2
+    SHOW_MISTAKES = 1 << 3
+    SHOW_INACCURACIES = 1 << 4
+    SHOW_GOOD_MOVES = 1 << 5
+    SHOW_EXCELLENT_MOVES = 1 << 6
+    SHOW_BRILLIANT_MOVES = 1 << 7
+    LEDS_ENABLED = 1 << 8
+    HIGHLIGHT_LEGAL_MOVES = 1 << 9
+    HIGHLIGHT_LAST_MOVE = 1 << 10
+    VOICE_ENABLED = 1 << 11
+    VOICE_FEEDBACK = 1 << 12
+    SOUND_ENABLED = 1 << 13
+    AUTO_QUEEN_PROMOTION = 1 << 14
+    CONFIRM_MOVES = 1 << 15
+
+
+# Column default for user_settings.flags: on except clock, auto-queen and confirm
+DEFAULT_SETTINGS_FLAGS = ~(
+    SettingsFlags.CLOCK_ENABLED | SettingsFlags.AUTO_QUEEN_PROMOTION | SettingsFlags.CONFIRM_MOVES
+) & sum(SettingsFlags)
+
+# Setting name -> its bit in user_settings.flags
+SETTINGS_FLAGS = {flag.name.lower(): flag for flag in SettingsFlags}
+
+# Every writable non-flag user_settings column, in the fixed order used by SQL_UPDATE_USER_SETTINGS
+SETTINGS_COLUMNS = (
+    "motor_speed", "move_animation_speed",
+    "clock_time_minutes", "clock_increment_seconds",
+    "evaluation_level", "hint_count",
+    "led_brightness", "led_theme",
+    "engine_difficulty", "engine_type",
+    "voice_language",
+    "ui_theme", "sound_volume",
+)
+SETTINGS_COLUMN_SET = frozenset(SETTINGS_COLUMNS) | SETTINGS_FLAGS.keys()
+
+# Fixed-shape update: a NULL parameter leaves that column unchanged, and
+# flags = (flags & ~changed_mask) | new_bits
+SQL_UPDATE_USER_SETTINGS = (
+    "UPDATE user_settings SET "
+    + ", ".join(f"{column} = COALESCE(?, {column})" for column in SETTINGS_COLUMNS)
+    + ", flags = (flags & ~?) | ?"
+    + " WHERE user_id = ?"
+)
+
+
+@lru_cache(maxsize=None)
+def _bulk_insert_move_sql(row_count: int) -> str:
+    """Multi-row move INSERT for row_count rows, built once per size"""
+    placeholders = ", ".join([MOVE_ROW_PLACEHOLDER] * row_count)
+    return f"""
+    INSERT INTO move_history
+    (game_id, move_number, side, move_notation, san_notation, fen_after, time_taken)
+    VALUES {placeholders}
+"""
+
+# Packed FEN layout: occupancy bitboard (a8..h1), flags, en-passant file,
+# halfmove clock, fullmove number, then one 4-bit code per occupied square
+FEN_HEADER = struct.Struct(">QBBHH")
+FEN_PIECES = "PNBRQKpnbrqk"
+FEN_CASTLING = "KQkq"
+
+
+def _pack_fen(fen: Optional[str]):
+    """
+    Pack a standard FEN into ~14-30 bytes.
+    
+    Returns:
+        Packed bytes, or the FEN text unchanged if it can't be packed losslessly
+    """
+    if fen is None:
+        return None
+    try:
+        placement, turn, castling, ep, halfmove, fullmove = fen.split(" ")
+        occupancy = 0
+        codes = []
+        index = 0
+        for char in placement:
+            if char == "/":
+                continue
+            if char.isdigit():
+                index += int(char)
+            else:
+                occupancy |= 1 << (63 - index)
+                codes.append(FEN_PIECES.index(char) + 1)
+                index += 1
+        
+        flags = 1 if turn == "b" else 0
+        if castling != "-":
+            for char in castling:
+                flags |= 2 << FEN_CASTLING.index(char)
+        ep_file = 0 if ep == "-" else "abcdefgh".index(ep[0]) + 1
+        
+        if len(codes) % 2:
+            codes.append(0)
+        packed = FEN_HEADER.pack(occupancy, flags, ep_file, int(halfmove), int(fullmove)) + bytes(
+            (codes[i] << 4) | codes[i + 1] for i in range(0, len(codes), 2)
+        )
+    except (ValueError, struct.error):
+        return fen
+    
+    # Only keep the packed form if it round-trips exactly
+    return packed if _unpack_fen(packed) == fen else fen
+
+
+def _unpack_fen(value) -> Optional[str]:
+    """Inverse of _pack_fen; text values (legacy or unpackable) pass through"""
+    if not isinstance(value, bytes):
+        return value
+    occupancy, flags, ep_file, halfmove, fullmove = FEN_HEADER.unpack_from(value)
+    codes = []
+    for byte in value[FEN_HEADER.size:]:
+        codes.append(byte >> 4)
+        codes.append(byte & 0x0F)
+    
+    ranks = []
+    code_index = 0
+    for rank in range(8):
+        row = ""
+        empty = 0
+        for file in range(8):
+            if occupancy >> (63 - (rank * 8 + file)) & 1:
+                if empty:
+                    row += str(empty)
+                    empty = 0
+                row += FEN_PIECES[codes[code_index] - 1]
+                code_index += 1
+            else:
+                empty += 1
+        if empty:
+            row += str(empty)
+        ranks.append(row)
+    
+    turn = "b" if flags & 1 else "w"
+    castling = "".join(c for i, c in enumerate(FEN_CASTLING) if flags & (2 << i)) or "-"
+    if ep_file:
+        ep = "abcdefgh"[ep_file - 1] + ("3" if turn == "b" else "6")
+    else:
+        ep = "-"
+    return f"{'/'.join(ranks)} {turn} {castling} {ep} {halfmove} {fullmove}"
+
+
+def _unpack_move_row(move: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore a move row's fen_after to FEN text"""
+    move["fen_after"] = _unpack_fen(move["fen_after"])
+    return move
+
+# Most-recently-used user settings kept in memory
+SETTINGS_CACHE_SIZE = 1024
+
+# Read-only connections kept open alongside the single writer. Each aiosqlite
+# connection owns a worker thread and sqlite3 releases the GIL while stepping,
+# so pooled reads run in parallel instead of queueing behind writes.
+READER_POOL_SIZE = 4
+
+# Rows handed across the reader thread boundary per hop when iterating a cursor
+READER_ITER_CHUNK_SIZE = 256
+
+# Write-behind queue: group commit every WRITE_BATCH_MS or WRITE_BATCH_SIZE writes
+WRITE_BATCH_MS = 20
+WRITE_BATCH_SIZE = 64
+
 
 class DatabaseManager:
     """
@@ -19,7 +451,29 @@ class DatabaseManager:
     
     def __init__(self, db_path: str = "chessboard.db"):
         self.db_path = Path(db_path)
-        self.connection: Optional[aiosqlite.Connection] = None
+        # One writer connection plus a pool of read-only connections (WAL lets them overlap)
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._readers: asyncio.Queue = asyncio.Queue()
+        self._reader_connections: List[aiosqlite.Connection] = []
+
+        # Write-behind queue of (sql, params, future) drained by _writer_loop
+        self._write_queue: asyncio.Queue = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+        # Serializes explicit transactions on the shared connection
+        self._write_lock = asyncio.Lock()
+
+        # SQL text -> result column names, filled from cursor.description on first use
+        self._columns: Dict[str, tuple] = {}
+        
+        # user_id -> settings row, LRU-bounded by SETTINGS_CACHE_SIZE
+        self._settings_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        # user_id -> settings queued but not yet committed, merged into every read
+        self._pending_settings: Dict[int, Dict[str, Any]] = {}
+        # user_id -> number of its settings writes still queued
+        self._pending_settings_writes: Dict[int, int] = {}
+        # Bumped on every queued settings write; a cache-miss read only caches
+        # its row if no write was queued while it ran
+        self._settings_generation = 0
     
     async def initialize(self):
         """Initialize database connection and create tables if they don't exist"""
@@ -28,420 +482,670 @@ class DatabaseManager:
         # Create database directory if it doesn't exist
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Connect to database
-        self.connection = await aiosqlite.connect(self.db_path)
-        
-        # Enable foreign keys
-        await self.connection.execute("PRAGMA foreign_keys = ON")
+        # Connect to database: the writer first, so the WAL journal exists for readers
+        self._writer = await self._connect()
         
         # Create tables
         await self._create_tables()
+
+        for _ in range(READER_POOL_SIZE):
+            reader = await self._connect(read_only=True)
+            self._reader_connections.append(reader)
+            self._readers.put_nowait(reader)
+
+        # Start the group-commit writer
+        self._writer_task = asyncio.create_task(self._writer_loop(), name="db_writer")
         
         logger.info("Database initialized successfully")
     
+    async def _connect(self, read_only: bool = False) -> aiosqlite.Connection:
+        """Open a connection with the shared PRAGMA setup"""
+        # Autocommit: SELECTs never open an implicit transaction, and multi-statement
+        # writes use explicit BEGIN IMMEDIATE / COMMIT
+        connection = await aiosqlite.connect(
+            self.db_path,
+            iter_chunk_size=READER_ITER_CHUNK_SIZE if read_only else 64,
+            isolation_level=None,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        # Rows come back as plain tuples; readers zip them with memoized column names
+
+        # WAL journal + relaxed sync: one fsync per checkpoint instead of per commit
+        await connection.execute("PRAGMA journal_mode = WAL")
+        await connection.execute("PRAGMA synchronous = NORMAL")
+        await connection.execute("PRAGMA temp_store = MEMORY")
+        await connection.execute("PRAGMA cache_size = -64000")  # 64 MB
+        await connection.execute("PRAGMA mmap_size = 268435456")  # 256 MB
+        await connection.execute("PRAGMA busy_timeout = 5000")  # ms
+
+        # Enable foreign keys
+        await connection.execute("PRAGMA foreign_keys = ON")
+
+        if read_only:
+            # Guard against accidental writes through the reader pool
+            await connection.execute("PRAGMA query_only = ON")
+
+        return connection
+    
+    def _columns_for(self, sql: str, cursor: aiosqlite.Cursor) -> tuple:
+        """Column names for a statement's result rows, read once per SQL string"""
+        columns = self._columns.get(sql)
+        if columns is None:
+            columns = tuple(description[0] for description in cursor.description)
+            self._columns[sql] = columns
+        return columns
+    
+    @asynccontextmanager
+    async def _acquire_read(self):
+        """Borrow a reader connection from the pool"""
+        connection = await self._readers.get()
+        try:
+            yield connection
+        finally:
+            self._readers.put_nowait(connection)
+    
+    @property
+    def connection(self) -> Optional[aiosqlite.Connection]:
+        """The writer connection"""
+        return self._writer
+    
     async def _create_tables(self):
-        """Create all necessary tables"""
-        
-        # Table 1: Users
-        await self.connection.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                display_name TEXT,
-                email TEXT UNIQUE,
-                password_hash TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP,
-                total_games INTEGER DEFAULT 0,
-                wins INTEGER DEFAULT 0,
-                losses INTEGER DEFAULT 0,
-                draws INTEGER DEFAULT 0
-            )
-        """)
-        
-        # Table 2: UserSettings
-        await self.connection.execute("""
-            CREATE TABLE IF NOT EXISTS user_settings (
-                user_id INTEGER PRIMARY KEY,
-                -- Motor & Movement
-                motor_speed TEXT DEFAULT 'MEDIUM',  -- SLOW/MEDIUM/FAST
-                move_animation_speed TEXT DEFAULT 'MEDIUM',
-                
-                -- Chess Clock
-                clock_enabled BOOLEAN DEFAULT 0,
-                clock_time_minutes INTEGER DEFAULT 10,
-                clock_increment_seconds INTEGER DEFAULT 0,
-                
-                -- Move Evaluation
-                evaluation_enabled BOOLEAN DEFAULT 1,
-                evaluation_level TEXT DEFAULT 'BASIC',  -- NONE/BASIC/ADVANCED
-                show_blunders BOOLEAN DEFAULT 1,
-                show_mistakes BOOLEAN DEFAULT 1,
-                show_inaccuracies BOOLEAN DEFAULT 1,
-                show_good_moves BOOLEAN DEFAULT 1,
-                show_excellent_moves BOOLEAN DEFAULT 1,
-                show_brilliant_moves BOOLEAN DEFAULT 1,
-                hint_count INTEGER DEFAULT 3,
-                
-                -- LEDs
-                leds_enabled BOOLEAN DEFAULT 1,
-                led_brightness INTEGER DEFAULT 128,  -- 0-255
-                led_theme TEXT DEFAULT 'CLASSIC',  -- CLASSIC/MODERN/RAINBOW/etc
-                highlight_legal_moves BOOLEAN DEFAULT 1,
-                highlight_last_move BOOLEAN DEFAULT 1,
-                
-                -- Engine
-                engine_difficulty INTEGER DEFAULT 5,  -- 1-20 Stockfish skill level
-                engine_type TEXT DEFAULT 'STOCKFISH',
-                
-                -- Voice Recognition
-                voice_enabled BOOLEAN DEFAULT 1,
-                voice_language TEXT DEFAULT 'en-US',
-                voice_feedback BOOLEAN DEFAULT 1,
-                
-                -- UI Preferences
-                ui_theme TEXT DEFAULT 'DARK',  -- DARK/LIGHT
-                sound_enabled BOOLEAN DEFAULT 1,
-                sound_volume INTEGER DEFAULT 70,  -- 0-100
-                
-                -- Advanced
-                auto_queen_promotion BOOLEAN DEFAULT 0,
-                confirm_moves BOOLEAN DEFAULT 0,
-                
-                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-            )
-        """)
-        
-        # Table 3: Games
-        await self.connection.execute("""
-            CREATE TABLE IF NOT EXISTS games (
-                game_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                white_user_id INTEGER,
-                black_user_id INTEGER,  -- NULL for AI
-                game_mode TEXT NOT NULL,  -- OFFLINE_PVP/VS_ENGINE/ONLINE_LICHESS
-                start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                end_time TIMESTAMP,
-                result TEXT,  -- WHITE_WIN/BLACK_WIN/DRAW/ABANDONED
-                termination TEXT,  -- CHECKMATE/STALEMATE/RESIGNATION/TIME/AGREEMENT
-                opening_name TEXT,
-                final_fen TEXT,
-                
-                -- Clock data
-                white_time_remaining INTEGER,  -- seconds
-                black_time_remaining INTEGER,
-                
-                -- Online game reference
-                lichess_game_id TEXT,
-                
-                FOREIGN KEY (white_user_id) REFERENCES users(user_id) ON DELETE SET NULL,
-                FOREIGN KEY (black_user_id) REFERENCES users(user_id) ON DELETE SET NULL
-            )
-        """)
-        
-        # Table 4: MoveHistory
-        await self.connection.execute("""
-            CREATE TABLE IF NOT EXISTS move_history (
-                move_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                game_id INTEGER NOT NULL,
-                move_number INTEGER NOT NULL,
-                side TEXT NOT NULL,  -- WHITE/BLACK
-                move_notation TEXT NOT NULL,  -- e.g., "e2e4"
-                san_notation TEXT,  -- Standard Algebraic Notation: "Nf3"
-                fen_after TEXT,  -- Board state after move
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                time_taken INTEGER,  -- milliseconds
-                
-                -- Move evaluation (from Stockfish)
-                evaluation_cp INTEGER,  -- centipawns
-                evaluation_mate INTEGER,  -- moves to mate (NULL if not applicable)
-                classification TEXT,  -- BRILLIANT/EXCELLENT/GOOD/INACCURACY/MISTAKE/BLUNDER
-                
-                FOREIGN KEY (game_id) REFERENCES games(game_id) ON DELETE CASCADE
-            )
-        """)
-        
-        # Table 5: Graveyard (piece capture positions)
-        await self.connection.execute("""
-            CREATE TABLE IF NOT EXISTS graveyard (
-                graveyard_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                game_id INTEGER NOT NULL,
-                side TEXT NOT NULL,  -- WHITE/BLACK (which side's pieces)
-                coordinate TEXT NOT NULL,  -- e.g., "G1", "G2" (graveyard position)
-                piece_type TEXT NOT NULL,  -- PAWN/KNIGHT/BISHOP/ROOK/QUEEN
-                occupied BOOLEAN DEFAULT 1,
-                captured_on_move INTEGER,  -- move number when captured
-                
-                FOREIGN KEY (game_id) REFERENCES games(game_id) ON DELETE CASCADE
-            )
-        """)
-        
-        # Table 6: CustomPositions (for board editor)
-        await self.connection.execute("""
-            CREATE TABLE IF NOT EXISTS custom_positions (
-                position_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                fen TEXT NOT NULL,
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                times_used INTEGER DEFAULT 0,
-                
-                FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-            )
-        """)
-        
-        await self.connection.commit()
+        """Create all necessary tables and indexes, then migrate older databases"""
+        await self._writer.executescript(SCHEMA_DDL)
         logger.info("All tables created successfully")
+        
+        async with self._writer.execute("PRAGMA user_version") as cursor:
+            (version,) = await cursor.fetchone()
+        if version < SCHEMA_VERSION:
+            await self._migrate_schema(version)
+    
+    async def _migrate_schema(self, version: int):
+        """
+        Upgrade a database created by an older schema to SCHEMA_VERSION.
+        
+        CREATE TABLE IF NOT EXISTS leaves existing tables alone, so columns
+        added since are created and backfilled here, in one transaction.
+        
+        Args:
+            version: The database's current PRAGMA user_version
+        """
+        logger.info(f"Migrating database schema from version {version} to {SCHEMA_VERSION}")
+        await self._writer.execute("BEGIN IMMEDIATE")
+        try:
+            if version < 1:
+                await self._migrate_settings_flags()
+                await self._migrate_packed_fens()
+            
+            # PRAGMA doesn't take parameters; SCHEMA_VERSION is a trusted int
+            await self._writer.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            await self._writer.execute("COMMIT")
+        except Exception:
+            await self._writer.execute("ROLLBACK")
+            raise
+        logger.info("Database schema migration complete")
+    
+    async def _migrate_settings_flags(self):
+        """Add user_settings.flags and fill it from the old per-setting BOOLEAN columns"""
+        async with self._writer.execute("PRAGMA table_info(user_settings)") as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if "flags" in columns:
+            return  # Created by the current schema
+        
+        await self._writer.execute(
+            f"ALTER TABLE user_settings ADD COLUMN flags INTEGER DEFAULT {int(DEFAULT_SETTINGS_FLAGS)}"
+        )
+        
+        # Each old column sets its bit; settings that had no column keep their default
+        migrated = [(name, flag) for name, flag in SETTINGS_FLAGS.items() if name in columns]
+        kept_defaults = DEFAULT_SETTINGS_FLAGS & ~sum(flag for _, flag in migrated)
+        terms = [str(int(kept_defaults))] + [
+            f"(CASE WHEN COALESCE({name}, {int(bool(DEFAULT_SETTINGS_FLAGS & flag))}) "
+            f"THEN {int(flag)} ELSE 0 END)"
+            for name, flag in migrated
+        ]
+        await self._writer.execute(f"UPDATE user_settings SET flags = {' | '.join(terms)}")
+    
+    async def _migrate_packed_fens(self):
+        """Repack move_history.fen_after values still stored as FEN text"""
+        async with self._writer.execute(
+            "SELECT move_id, fen_after FROM move_history WHERE typeof(fen_after) = 'text'"
+        ) as cursor:
+            rows = await cursor.fetchall()
+        
+        # Anything _pack_fen can't pack stays as text, which _unpack_fen passes through
+        updates = []
+        for move_id, fen in rows:
+            packed = _pack_fen(fen)
+            if isinstance(packed, bytes):
+                updates.append((packed, move_id))
+        if updates:
+            await self._writer.executemany(
+                "UPDATE move_history SET fen_after = ? WHERE move_id = ?", updates
+            )
+        logger.info(f"Packed {len(updates)} of {len(rows)} text fen_after rows")
     
     # ==================== User Management ====================
     
     async def create_user(self, username: str, display_name: Optional[str] = None, 
                          email: Optional[str] = None, password_hash: Optional[str] = None) -> int:
         """Create a new user and return user_id"""
-        cursor = await self.connection.execute(
-            """
-            INSERT INTO users (username, display_name, email, password_hash)
-            VALUES (?, ?, ?, ?)
-            """,
-            (username, display_name or username, email, password_hash)
-        )
-        await self.connection.commit()
-        
-        user_id = cursor.lastrowid
-        
-        # Create default settings for new user
-        await self.connection.execute(
-            "INSERT INTO user_settings (user_id) VALUES (?)",
-            (user_id,)
-        )
-        await self.connection.commit()
-        
+        # User row and default settings are written in one transaction
+        async with self._write_lock:
+            await self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = await self._writer.execute(
+                    """
+                    INSERT INTO users (username, display_name, email, password_hash)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (username, display_name or username, email, password_hash)
+                )
+                user_id = cursor.lastrowid
+
+                # Create default settings for new user
+                await self._writer.execute(
+                    "INSERT INTO user_settings (user_id) VALUES (?)",
+                    (user_id,)
+                )
+                await self._writer.commit()
+            except Exception:
+                await self._writer.rollback()
+                raise
+
         logger.info(f"Created user: {username} (ID: {user_id})")
         return user_id
     
     async def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
-        async with self.connection.execute(
-            "SELECT * FROM users WHERE user_id = ?", (user_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if row:
-                return dict(row)
-        return None
+        async with self._acquire_read() as connection:
+            async with connection.execute(
+                SQL_GET_USER, (user_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                if row:
+                    return dict(zip(self._columns_for(SQL_GET_USER, cursor), row))
+            return None
     
     async def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username"""
-        async with self.connection.execute(
-            "SELECT * FROM users WHERE username = ?", (username,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if row:
-                return dict(row)
-        return None
+        async with self._acquire_read() as connection:
+            async with connection.execute(
+                SQL_GET_USER_BY_USERNAME, (username,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                if row:
+                    return dict(zip(self._columns_for(SQL_GET_USER_BY_USERNAME, cursor), row))
+            return None
     
     async def update_user_stats(self, user_id: int, result: str):
         """Update user statistics after a game"""
-        if result == "WHITE_WIN":
-            await self.connection.execute(
-                "UPDATE users SET total_games = total_games + 1, wins = wins + 1 WHERE user_id = ?",
-                (user_id,)
-            )
-        elif result == "BLACK_WIN":
-            await self.connection.execute(
-                "UPDATE users SET total_games = total_games + 1, losses = losses + 1 WHERE user_id = ?",
-                (user_id,)
-            )
-        elif result == "DRAW":
-            await self.connection.execute(
-                "UPDATE users SET total_games = total_games + 1, draws = draws + 1 WHERE user_id = ?",
-                (user_id,)
+        if result not in COUNTED_RESULTS:
+            return
+        
+        async with self._write_lock:
+            await self._writer.execute(
+                SQL_UPDATE_USER_STATS, (result, result, result, user_id, result)
             )
-        await self.connection.commit()
+    
+    def touch_last_login(self, user_id: int) -> asyncio.Future:
+        """
+        Queue stamping a user's last_login with the current time.
+
+        Returns:
+            Future resolving once the batch is committed
+        """
+        return self._enqueue_write(SQL_TOUCH_LAST_LOGIN, (user_id,), f"update last login of user {user_id}")
     
     # ==================== Settings Management ====================
     
     async def get_user_settings(self, user_id: int) -> Optional[Dict[str, Any]]:
-        """Get user settings"""
-        async with self.connection.execute(
-            "SELECT * FROM user_settings WHERE user_id = ?", (user_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if row:
-                return dict(row)
-        return None
+        """
+        Get user settings (served from the in-memory cache when possible).
+        
+        Updates still queued for the writer are merged in, so a read right
+        after update_user_settings() sees the new values.
+        """
+        cached = self._settings_cache.get(user_id)
+        if cached is not None:
+            self._settings_cache.move_to_end(user_id)
+            return {**cached, **self._pending_settings.get(user_id, {})}
+        
+        generation = self._settings_generation
+        
+        async with self._acquire_read() as connection:
+            async with connection.execute(
+                SQL_GET_USER_SETTINGS, (user_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                if row is None:
+                    return None
+                columns = self._columns_for(SQL_GET_USER_SETTINGS, cursor)
+        
+        settings = dict(zip(columns, row))
+        flags = settings.pop("flags")
+        for name, flag in SETTINGS_FLAGS.items():
+            settings[name] = bool(flags & flag)
+        
+        # A write queued before or during the read may commit after the row was
+        # read: caching that row would hide the write until the next update
+        if generation == self._settings_generation and user_id not in self._pending_settings:
+            self._settings_cache[user_id] = settings
+            if len(self._settings_cache) > SETTINGS_CACHE_SIZE:
+                self._settings_cache.popitem(last=False)
+        return {**settings, **self._pending_settings.get(user_id, {})}
     
-    async def update_user_settings(self, user_id: int, settings: Dict[str, Any]):
-        """Update user settings"""
-        # Build dynamic UPDATE query
-        set_clause = ", ".join([f"{key} = ?" for key in settings.keys()])
-        values = list(settings.values()) + [user_id]
+    def update_user_settings(self, user_id: int, settings: Dict[str, Any]) -> asyncio.Future:
+        """
+        Queue a user settings update for the write-behind writer.
+
+        The change is recorded as pending until the batch commits, and
+        get_user_settings() merges it in, so reads see the new values at once.
+
+        Args:
+            user_id: User whose settings to change
+            settings: Column name -> new value; omitted columns keep their value
+
+        Returns:
+            Future resolving once the batch is committed
+
+        Raises:
+            ValueError: If a key is not a user_settings column
+        """
+        unknown = settings.keys() - SETTINGS_COLUMN_SET
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
         
-        await self.connection.execute(
-            f"UPDATE user_settings SET {set_clause} WHERE user_id = ?",
-            values
-        )
-        await self.connection.commit()
-        logger.info(f"Updated settings for user {user_id}")
+        values = [settings.get(column) for column in SETTINGS_COLUMNS]
+        
+        mask = 0
+        bits = 0
+        for name, flag in SETTINGS_FLAGS.items():
+            value = settings.get(name)
+            if value is not None:
+                mask |= flag
+                if value:
+                    bits |= flag
+        values.extend((mask, bits, user_id))
+        
+        changes = {name: value for name, value in settings.items() if value is not None}
+        self._pending_settings.setdefault(user_id, {}).update(changes)
+        self._pending_settings_writes[user_id] = self._pending_settings_writes.get(user_id, 0) + 1
+        self._settings_generation += 1
+        
+        future = self._enqueue_write(SQL_UPDATE_USER_SETTINGS, tuple(values), f"update settings of user {user_id}")
+        future.add_done_callback(lambda _: self._settings_write_done(user_id))
+        logger.debug(f"Queued settings update for user {user_id}")
+        return future
+    
+    def _settings_write_done(self, user_id: int):
+        """A queued settings write finished: after the last one, reads go back to the database"""
+        remaining = self._pending_settings_writes[user_id] - 1
+        if remaining:
+            self._pending_settings_writes[user_id] = remaining
+            return
+        del self._pending_settings_writes[user_id]
+        self._pending_settings.pop(user_id, None)
+        # The cached row predates the writes; the next read loads the committed one
+        self._settings_cache.pop(user_id, None)
     
     # ==================== Game Management ====================
     
     async def create_game(self, white_user_id: Optional[int], black_user_id: Optional[int],
                          game_mode: str) -> int:
-        """Create a new game record and return game_id"""
-        cursor = await self.connection.execute(
-            """
-            INSERT INTO games (white_user_id, black_user_id, game_mode)
-            VALUES (?, ?, ?)
-            """,
-            (white_user_id, black_user_id, game_mode)
-        )
-        await self.connection.commit()
+        """Create a new game record (with empty graveyard slots) and return game_id"""
+        async with self._write_lock:
+            await self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = await self._writer.execute(
+                    """
+                    INSERT INTO games (white_user_id, black_user_id, game_mode)
+                    VALUES (?, ?, ?)
+                    """,
+                    (white_user_id, black_user_id, game_mode)
+                )
+                game_id = cursor.lastrowid
+                
+                # Captures later UPDATE these rows in place instead of inserting
+                await self._writer.executemany(
+                    SQL_SEED_GRAVEYARD,
+                    [(game_id, side, coordinate) for side, coordinate in GRAVEYARD_SLOTS]
+                )
+                await self._writer.commit()
+            except Exception:
+                await self._writer.rollback()
+                raise
         
-        game_id = cursor.lastrowid
         logger.info(f"Created game {game_id}: {game_mode}")
         return game_id
     
     async def save_game_result(self, game_id: int, result: str, termination: str = "CHECKMATE",
                                final_fen: Optional[str] = None):
         """Save game result when game ends"""
-        await self.connection.execute(
-            """
-            UPDATE games 
-            SET end_time = CURRENT_TIMESTAMP, result = ?, termination = ?, final_fen = ?
-            WHERE game_id = ?
-            """,
-            (result, termination, final_fen, game_id)
-        )
-        await self.connection.commit()
+        async with self._write_lock:
+            await self._writer.execute(
+                SQL_SAVE_GAME_RESULT, (result, termination, final_fen, game_id)
+            )
+        logger.info(f"Game {game_id} finished: {result} by {termination}")
+        
+        # End of game is a quiet moment to shrink the WAL
+        await self.checkpoint()
+    
+    async def finalize_game(self, game_id: int, white_user_id: Optional[int],
+                            black_user_id: Optional[int], result: str,
+                            termination: str = "CHECKMATE", final_fen: Optional[str] = None):
+        """
+        Save the game result and both players' stats in a single transaction.
+        
+        Args:
+            game_id: Finished game
+            white_user_id: White player's user_id (None for AI/online)
+            black_user_id: Black player's user_id (None for AI/online)
+            result: WHITE_WIN/BLACK_WIN/DRAW/ABANDONED
+            termination: How the game ended
+            final_fen: Final board position
+        """
+        async with self._write_lock:
+            await self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                await self._writer.execute(
+                    SQL_SAVE_GAME_RESULT, (result, termination, final_fen, game_id)
+                )
+                if result in COUNTED_RESULTS:
+                    if white_user_id is not None:
+                        await self._writer.execute(
+                            SQL_RECORD_USER_RESULT,
+                            (result, "WHITE_WIN", result, "BLACK_WIN", result, white_user_id)
+                        )
+                    if black_user_id is not None:
+                        await self._writer.execute(
+                            SQL_RECORD_USER_RESULT,
+                            (result, "BLACK_WIN", result, "WHITE_WIN", result, black_user_id)
+                        )
+                await self._writer.commit()
+            except Exception:
+                await self._writer.rollback()
+                raise
         logger.info(f"Game {game_id} finished: {result} by {termination}")
+        
+        # End of game is a quiet moment to shrink the WAL
+        await self.checkpoint()
     
     async def get_game(self, game_id: int) -> Optional[Dict[str, Any]]:
         """Get game by ID"""
-        async with self.connection.execute(
-            "SELECT * FROM games WHERE game_id = ?", (game_id,)
-        ) as cursor:
-            row = await cursor.fetchone()
-            if row:
-                return dict(row)
-        return None
+        async with self._acquire_read() as connection:
+            async with connection.execute(
+                SQL_GET_GAME, (game_id,)
+            ) as cursor:
+                row = await cursor.fetchone()
+                if row:
+                    return dict(zip(self._columns_for(SQL_GET_GAME, cursor), row))
+            return None
     
     async def get_user_games(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent games for a user"""
-        async with self.connection.execute(
-            """
-            SELECT * FROM games 
-            WHERE white_user_id = ? OR black_user_id = ?
-            ORDER BY start_time DESC
-            LIMIT ?
-            """,
-            (user_id, user_id, limit)
-        ) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+        async with self._acquire_read() as connection:
+            async with connection.execute(
+                SQL_GET_USER_GAMES, (user_id, user_id, user_id, limit)
+            ) as cursor:
+                rows = await cursor.fetchall()
+                columns = self._columns_for(SQL_GET_USER_GAMES, cursor)
+                return [dict(zip(columns, row)) for row in rows]
     
     # ==================== Move History ====================
     
-    async def save_move(self, game_id: int, move_number: int, side: str,
-                       move_notation: str, san_notation: Optional[str] = None,
-                       fen_after: Optional[str] = None, time_taken: Optional[int] = None) -> int:
-        """Save a move to the database"""
-        cursor = await self.connection.execute(
-            """
-            INSERT INTO move_history 
-            (game_id, move_number, side, move_notation, san_notation, fen_after, time_taken)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (game_id, move_number, side, move_notation, san_notation, fen_after, time_taken)
+    def save_move(self, game_id: int, move_number: int, side: str,
+                  move_notation: str, san_notation: Optional[str] = None,
+                  fen_after: Optional[str] = None, time_taken: Optional[int] = None) -> asyncio.Future:
+        """
+        Queue a move for the write-behind writer.
+
+        Returns:
+            Future resolving to the move_id once the batch is committed
+        """
+        return self._enqueue_write(
+            SQL_INSERT_MOVE,
+            (game_id, move_number, side, move_notation, san_notation,
+             _pack_fen(fen_after), time_taken),
+            f"save move {move_number} ({move_notation}) of game {game_id}"
         )
-        await self.connection.commit()
-        return cursor.lastrowid
+
+    async def save_moves_bulk(self, rows: List[tuple]) -> Optional[int]:
+        """
+        Save several moves in a single transaction.
+
+        Args:
+            rows: Tuples of (game_id, move_number, side, move_notation,
+                  san_notation, fen_after, time_taken)
+
+        Returns:
+            move_id of the last inserted move, or None if rows is empty
+        """
+        if not rows:
+            return None
+
+        # Multi-row VALUES, chunked to stay under SQLite's bound-parameter limit
+        chunk_size = MAX_SQL_PARAMS // MOVE_COLUMN_COUNT
+        last_id = None
+        async with self._write_lock:
+            await self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                for start in range(0, len(rows), chunk_size):
+                    chunk = rows[start:start + chunk_size]
+                    params = []
+                    for row in chunk:
+                        params.extend(row[:5])
+                        params.append(_pack_fen(row[5]))
+                        params.append(row[6])
+                    cursor = await self._writer.execute(_bulk_insert_move_sql(len(chunk)), params)
+                    last_id = cursor.lastrowid
+                await self._writer.commit()
+            except Exception:
+                await self._writer.rollback()
+                raise
+
+        return last_id
     
-    async def update_move_evaluation(self, move_id: int, evaluation_cp: Optional[int],
-                                    evaluation_mate: Optional[int], classification: str):
-        """Update move with engine evaluation"""
-        await self.connection.execute(
-            """
-            UPDATE move_history 
-            SET evaluation_cp = ?, evaluation_mate = ?, classification = ?
-            WHERE move_id = ?
-            """,
-            (evaluation_cp, evaluation_mate, classification, move_id)
+    def update_move_evaluation(self, move_id: int, evaluation_cp: Optional[int],
+                               evaluation_mate: Optional[int], classification: str) -> asyncio.Future:
+        """Queue an engine evaluation update for a move"""
+        return self._enqueue_write(
+            SQL_UPDATE_MOVE_EVALUATION,
+            (evaluation_cp, evaluation_mate, classification, move_id),
+            f"save evaluation of move {move_id}"
         )
-        await self.connection.commit()
     
     async def get_game_moves(self, game_id: int) -> List[Dict[str, Any]]:
-        """Get all moves for a game"""
-        async with self.connection.execute(
-            """
-            SELECT * FROM move_history 
-            WHERE game_id = ?
-            ORDER BY move_number ASC
-            """,
-            (game_id,)
-        ) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+        """Get all moves for a game (without the per-move FEN)"""
+        async with self._acquire_read() as connection:
+            async with connection.execute(SQL_GET_GAME_MOVES, (game_id,)) as cursor:
+                rows = await cursor.fetchall()
+                columns = self._columns_for(SQL_GET_GAME_MOVES, cursor)
+                return [dict(zip(columns, row)) for row in rows]
+    
+    async def get_game_moves_with_fen(self, game_id: int) -> List[Dict[str, Any]]:
+        """Get all moves for a game including fen_after and timestamp"""
+        async with self._acquire_read() as connection:
+            async with connection.execute(SQL_GET_GAME_MOVES_WITH_FEN, (game_id,)) as cursor:
+                rows = await cursor.fetchall()
+                columns = self._columns_for(SQL_GET_GAME_MOVES_WITH_FEN, cursor)
+                return [_unpack_move_row(dict(zip(columns, row))) for row in rows]
+    
+    async def get_opening_moves(self, user_id: int, max_ply: int, game_limit: int) -> List[tuple]:
+        """
+        Opening moves of a user's most recent games against the engine.
+        
+        Args:
+            user_id: Player whose games to read
+            max_ply: Last move_number (ply) to include per game
+            game_limit: Number of most recent games to read
+            
+        Returns:
+            (game_id, user_is_white, move_notation) rows in game and ply order
+        """
+        async with self._acquire_read() as connection:
+            async with connection.execute(
+                SQL_GET_OPENING_MOVES, (user_id, user_id, user_id, game_limit, max_ply)
+            ) as cursor:
+                return await cursor.fetchall()
     
     # ==================== Graveyard Management ====================
     
-    async def occupy_graveyard_space(self, game_id: int, side: str, coordinate: str,
-                                    piece_type: str, move_number: int) -> int:
-        """Mark a graveyard position as occupied when a piece is captured"""
-        cursor = await self.connection.execute(
-            """
-            INSERT INTO graveyard (game_id, side, coordinate, piece_type, captured_on_move)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (game_id, side, coordinate, piece_type, move_number)
+    def occupy_graveyard_space(self, game_id: int, side: str, coordinate: str,
+                               piece_type: str, move_number: int) -> asyncio.Future:
+        """
+        Queue marking a pre-seeded graveyard position as occupied when a piece is captured.
+
+        Returns:
+            Future resolving once the batch is committed
+        """
+        return self._enqueue_write(
+            SQL_OCCUPY_GRAVEYARD,
+            (piece_type, move_number, game_id, side, coordinate),
+            f"occupy graveyard {coordinate} of game {game_id}"
         )
-        await self.connection.commit()
-        return cursor.lastrowid
     
     async def get_graveyard_state(self, game_id: int) -> List[Dict[str, Any]]:
         """Get current graveyard occupancy for a game"""
-        async with self.connection.execute(
-            """
-            SELECT * FROM graveyard 
-            WHERE game_id = ? AND occupied = 1
-            ORDER BY captured_on_move ASC
-            """,
-            (game_id,)
-        ) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+        async with self._acquire_read() as connection:
+            async with connection.execute(SQL_GET_GRAVEYARD_STATE, (game_id,)) as cursor:
+                rows = await cursor.fetchall()
+                columns = self._columns_for(SQL_GET_GRAVEYARD_STATE, cursor)
+                return [dict(zip(columns, row)) for row in rows]
     
     # ==================== Custom Positions ====================
     
     async def save_custom_position(self, user_id: int, name: str, fen: str,
                                    description: Optional[str] = None) -> int:
         """Save a custom board position"""
-        cursor = await self.connection.execute(
-            """
-            INSERT INTO custom_positions (user_id, name, fen, description)
-            VALUES (?, ?, ?, ?)
-            """,
-            (user_id, name, fen, description)
-        )
-        await self.connection.commit()
+        async with self._write_lock:
+            cursor = await self._writer.execute(
+                """
+                INSERT INTO custom_positions (user_id, name, fen, description)
+                VALUES (?, ?, ?, ?)
+                """,
+                (user_id, name, fen, description)
+            )
         return cursor.lastrowid
     
     async def get_user_positions(self, user_id: int) -> List[Dict[str, Any]]:
         """Get all custom positions for a user"""
-        async with self.connection.execute(
-            """
-            SELECT * FROM custom_positions 
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-            """,
-            (user_id,)
-        ) as cursor:
-            rows = await cursor.fetchall()
-            return [dict(row) for row in rows]
+        async with self._acquire_read() as connection:
+            async with connection.execute(SQL_GET_CUSTOM_POSITIONS, (user_id,)) as cursor:
+                rows = await cursor.fetchall()
+                columns = self._columns_for(SQL_GET_CUSTOM_POSITIONS, cursor)
+                return [dict(zip(columns, row)) for row in rows]
+    
+    # ==================== Write-Behind Queue ====================
+    
+    def _enqueue_write(self, sql: str, params: tuple, description: str) -> asyncio.Future:
+        """
+        Queue a write and return a future resolved with lastrowid after commit.
+        
+        Most callers never await the future, so a failure is logged here
+        (which also marks the exception retrieved); awaiting callers still
+        get it raised.
+        
+        Args:
+            sql: Statement to run
+            params: Its parameters
+            description: What the write does, for the failure log ("save move 12 ...")
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda done: self._log_failed_write(done, description))
+        self._write_queue.put_nowait((sql, params, future))
+        return future
+    
+    @staticmethod
+    def _log_failed_write(future: asyncio.Future, description: str):
+        """Done-callback for queued writes: log the error if the write failed"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Failed to {description}: {error}")
+    
+    async def _writer_loop(self):
+        """Drain the write queue, committing up to WRITE_BATCH_SIZE writes per transaction"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._write_queue.get()]
+            
+            # Keep collecting until the batch window closes or the batch is full
+            deadline = loop.time() + WRITE_BATCH_MS / 1000
+            while len(batch) < WRITE_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._write_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._commit_batch(batch)
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    async def _commit_batch(self, batch: List[tuple]):
+        """Run a batch of queued writes inside one transaction"""
+        results = []
+        
+        async with self._write_lock:
+            try:
+                await self._writer.execute("BEGIN IMMEDIATE")
+                for sql, params, future in batch:
+                    # A failed statement only rolls back itself, not the batch
+                    try:
+                        cursor = await self._writer.execute(sql, params)
+                        results.append((future, cursor.lastrowid, None))
+                    except Exception as e:
+                        results.append((future, None, e))
+                await self._writer.commit()
+            except Exception as e:
+                logger.error(f"Write batch of {len(batch)} failed: {e}")
+                if self._writer.in_transaction:
+                    await self._writer.rollback()
+                results = [(future, None, e) for _, _, future in batch]
+        
+        for future, row_id, error in results:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(row_id)
+    
+    async def flush(self):
+        """Wait until every queued write has been committed"""
+        await self._write_queue.join()
     
     # ==================== Utility ====================
     
+    async def checkpoint(self):
+        """Copy the WAL back into the database file and truncate it"""
+        await self.flush()
+        async with self._write_lock:
+            async with self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)") as cursor:
+                busy, wal_pages, checkpointed = await cursor.fetchone()
+        if busy:
+            logger.debug(f"WAL checkpoint incomplete: {checkpointed}/{wal_pages} pages (readers busy)")
+    
     async def close(self):
         """Close database connection"""
-        if self.connection:
-            await self.connection.close()
+        if self._writer_task:
+            await self.flush()
+            self._writer_task.cancel()
+            await asyncio.gather(self._writer_task, return_exceptions=True)
+            self._writer_task = None
+        
+        for reader in self._reader_connections:
+            await reader.close()
+        self._reader_connections.clear()
+        
+        if self._writer:
+            # Refresh planner statistics for long-running installs
+            await self._writer.execute("PRAGMA optimize")
+            await self._writer.close()
             logger.info("Database connection closed")
@@ -5,16 +5,130 @@ Handles chess logic, move validation, and integration with chess engines/provide
 import chess
 import chess.engine
 import logging
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Union
 from pathlib import Path
 import asyncio
+import bisect
+from enum import Enum
+from functools import lru_cache
+from itertools import chain
+from collections import OrderedDict
+import numpy as np
 
 from providers.local_provider import LocalProvider
 from providers.engine_provider import EngineProvider
 from providers.lichess_provider import LichessProvider
+from cpu_affinity import pin_worker_process
+from zobrist_board import ZobristBoard, zobrist_key
 
 logger = logging.getLogger(__name__)
 
+class GameResult(str, Enum):
+    """Game result; members compare equal to (and are stored as) their names"""
+    IN_PROGRESS = "IN_PROGRESS"
+    WHITE_WIN = "WHITE_WIN"
+    BLACK_WIN = "BLACK_WIN"
+    DRAW = "DRAW"
+    
+    def __str__(self) -> str:
+        return self.value
+
+
+# chess.Square -> (file, rank) board coordinates
+SQUARE_COORDS: Tuple[Tuple[int, int], ...] = tuple(
+    (chess.square_file(square), chess.square_rank(square)) for square in chess.SQUARES
+)
+
+# Default Stockfish path on Linux, used for analysis and hints
+ANALYSIS_ENGINE_PATH = Path("/usr/games/stockfish")
+
+# Engine time budgets (seconds)
+ANALYSIS_TIME = 0.1
+HINT_TIME = 0.85  # what a level-15 EngineProvider used to think for
+LIVE_EVALUATION_TIME = 0.3  # one MultiPV search over every destination of a lifted piece
+
+# Centipawn value reported for forced mates
+MATE_SCORE_CP = 10000
+
+# Move classification by centipawn delta: a delta >= MOVE_CLASS_THRESHOLDS[i]
+# and below the next threshold gets MOVE_CLASSES[i + 1] (based on common
+# chess evaluation guidelines)
+MOVE_CLASS_THRESHOLDS: Tuple[int, ...] = (-300, -100, -50, 0, 100, 300)
+MOVE_CLASSES: Tuple[Tuple[str, Tuple[int, int, int]], ...] = (
+    ("BLUNDER", (255, 0, 0)),          # Red
+    ("MISTAKE", (255, 100, 0)),        # Dark orange
+    ("INACCURACY", (255, 165, 0)),     # Orange
+    ("NEUTRAL", (200, 200, 200)),      # White/gray
+    ("GOOD", (100, 200, 100)),         # Light green
+    ("EXCELLENT", (0, 255, 0)),        # Green
+    ("BRILLIANT", (255, 215, 0)),      # Gold
+)
+
+# Positions whose evaluate_position() result is kept (Zobrist-keyed, LRU)
+EVAL_CACHE_SIZE = 50_000
+
+# Castling move keyed by the 4 squares it changes (king from/to, rook from/to)
+CASTLING_FINGERPRINTS: Dict[chess.Bitboard, chess.Move] = {
+    chess.BB_SQUARES[king_from] | chess.BB_SQUARES[king_to]
+    | chess.BB_SQUARES[rook_from] | chess.BB_SQUARES[rook_to]: chess.Move(king_from, king_to)
+    for king_from, king_to, rook_from, rook_to in (
+        (chess.E1, chess.G1, chess.H1, chess.F1),
+        (chess.E1, chess.C1, chess.A1, chess.D1),
+        (chess.E8, chess.G8, chess.H8, chess.F8),
+        (chess.E8, chess.C8, chess.A8, chess.D8),
+    )
+}
+
+
+@lru_cache(maxsize=1)
+def _analysis_engine_path() -> Optional[Path]:
+    """ANALYSIS_ENGINE_PATH if Stockfish is installed there, stat'ed once per process"""
+    return ANALYSIS_ENGINE_PATH if ANALYSIS_ENGINE_PATH.exists() else None
+
+
+# A sensor reading: 8x8 matrix, the same 64 cells flat (bytes or a 64-element
+# sequence/array, index rank * 8 + file), or a packed bitboard
+SensorState = Union[List[List[bool]], bytes, bytearray, memoryview, np.ndarray, chess.Bitboard]
+
+# Flat sensor index for each chess.Square (row-major from the 8th rank: i ^ 56)
+SQUARE_TO_SENSOR = np.arange(64) ^ 56
+
+# Raw-frame packing: every sensor byte becomes an ASCII binary digit, and the
+# ranks are re-joined 1st..8th so the reversed digit string parses as the bitboard
+SENSOR_BYTE_TO_DIGIT = b"0" + b"1" * 255
+SENSOR_RANK_SLICES = tuple(slice(start, start + 8) for start in range(56, -8, -8))
+
+
+def sensor_matrix_to_bitboard(state: SensorState) -> chess.Bitboard:
+    """
+    Pack an 8x8 sensor matrix into an occupancy bitboard.
+    
+    Args:
+        state: Matrix indexed [rank][file] with rank 0 = 8th rank, the same
+               64 cells flat (raw bytes avoid per-cell Python objects), or an
+               already-packed bitboard (returned unchanged)
+            
+    Returns:
+        Bitboard with bit chess.square(file, 7 - rank) set for each occupied sensor
+    """
+    if isinstance(state, int):
+        return state
+    if isinstance(state, np.ndarray):
+        # Reorder into chess.Square order, then one bit per square
+        occupied = state.reshape(64)[SQUARE_TO_SENSOR] != 0
+        return int.from_bytes(np.packbits(occupied, bitorder="little").tobytes(), "little")
+    
+    if isinstance(state, (bytes, bytearray, memoryview)):
+        raw = bytes(state)
+    elif state and isinstance(state[0], (list, tuple)):
+        raw = bytes(chain.from_iterable(state))
+    else:
+        raw = bytes(state)
+    
+    # C-level path: translate + join + int(..., 2), no per-cell Python work
+    digits = raw.translate(SENSOR_BYTE_TO_DIGIT)
+    return int(b"".join([digits[ranks] for ranks in SENSOR_RANK_SLICES])[::-1], 2)
+
 
 class GameManager:
     """
@@ -23,7 +137,8 @@ class GameManager:
     """
     
     def __init__(self, mode: str = "VS_ENGINE", settings: Optional[Dict[str, Any]] = None, 
-                 human_color: Optional[chess.Color] = None):
+                 human_color: Optional[chess.Color] = None,
+                 opening_book: Optional[Dict[int, str]] = None):
         """
         Initialize game manager with specified mode.
         
@@ -32,18 +147,19 @@ class GameManager:
             settings: User settings dictionary
             human_color: Which side human plays (WHITE/BLACK/None for PVP). 
                         For ONLINE_LICHESS, None means accept either color from server
+            opening_book: The player's opening book (Zobrist hash -> engine move)
+                          for VS_ENGINE games
         """
-        self.board = chess.Board()
+        # Keeps its Zobrist hash current on every push/pop (see zobrist_board)
+        self.board = ZobristBoard()
         self.mode = mode
         self.settings = settings or {}
         self.game_id: Optional[int] = None
         
         # Track the digital twin of the physical board
-        self.physical_board_state: Optional[List[List[bool]]] = None
-        self.last_known_state: Optional[List[List[bool]]] = None
-        
-        # Move history (for UI and analysis)
-        self.move_history: List[chess.Move] = []
+        # Sensor occupancy as bitboards (bit N set = chess.Square N occupied)
+        self.physical_board_bb: Optional[chess.Bitboard] = None
+        self.last_known_bb: Optional[chess.Bitboard] = None
         
         # For human vs AI games - None means both are AI or both are human
         self.human_color = human_color
@@ -52,13 +168,36 @@ class GameManager:
         self.analysis_mode = False
         self.analysis_position_index = 0  # Current position in loaded PGN
         
+        # Long-lived Stockfish for evaluations and hints (opened on first use)
+        self._analysis_engine: Optional[chess.engine.Protocol] = None
+        self._engine_lock = asyncio.Lock()
+        # Analyses in flight; robot pondering stays paused while any are
+        self._analyses_running = 0
+        
+        # Legal moves grouped by from-square for the current position
+        # (built lazily, dropped whenever the board changes)
+        self._legal_by_from: Optional[Dict[chess.Square, List[chess.Move]]] = None
+        self._result_cache: Optional[GameResult] = None
+        self._fen_cache: Optional[str] = None
+        
+        # evaluate_position() results by Zobrist hash: (score_cp, best_move, pv)
+        self._eval_cache: "OrderedDict[int, Tuple[Optional[int], Optional[str], Tuple[str, ...]]]" = OrderedDict()
+        
         # Set up players based on mode
-        self._setup_players(mode, settings, human_color)
+        self._setup_players(mode, settings, human_color, opening_book)
+        
+        # Whether the gantry plays each side's moves, indexed by chess.Color
+        # (engine and online opponents move through the robot, local humans don't)
+        self._robot_moves: Tuple[bool, bool] = tuple(
+            player is not None and not isinstance(player, LocalProvider)
+            for player in (self.black_player, self.white_player)
+        )
         
         logger.info(f"GameManager initialized: mode={mode}")
     
     def _setup_players(self, mode: str, settings: Optional[Dict[str, Any]], 
-                      human_color: Optional[chess.Color]):
+                      human_color: Optional[chess.Color],
+                      opening_book: Optional[Dict[int, str]] = None):
         """Set up the input providers based on game mode"""
         if mode == "OFFLINE_PVP":
             # Both players are local humans
@@ -77,9 +216,9 @@ class GameManager:
             # Set up human and engine based on chosen color
             if human_color == chess.WHITE:
                 self.white_player = LocalProvider()
-                self.black_player = EngineProvider(difficulty=difficulty)
+                self.black_player = EngineProvider(difficulty=difficulty, opening_book=opening_book, game=self)
             else:
-                self.white_player = EngineProvider(difficulty=difficulty)
+                self.white_player = EngineProvider(difficulty=difficulty, opening_book=opening_book, game=self)
                 self.black_player = LocalProvider()
             
             self.human_color = human_color
@@ -106,8 +245,8 @@ class GameManager:
             difficulty_white = settings.get('engine_difficulty_white', 10) if settings else 10
             difficulty_black = settings.get('engine_difficulty_black', 10) if settings else 10
             
-            self.white_player = EngineProvider(difficulty=difficulty_white)
-            self.black_player = EngineProvider(difficulty=difficulty_black)
+            self.white_player = EngineProvider(difficulty=difficulty_white, game=self)
+            self.black_player = EngineProvider(difficulty=difficulty_black, game=self)
             self.human_color = None  # No human player
             
         elif mode == "ANALYSIS":
@@ -121,30 +260,83 @@ class GameManager:
         else:
             raise ValueError(f"Unknown game mode: {mode}")
     
+    def is_robot_next(self) -> bool:
+        """Whether the side to move is played by the robot"""
+        return self._robot_moves[self.board.turn]
+    
+    @property
+    def move_history(self) -> List[chess.Move]:
+        """Moves played so far (for UI and analysis), straight from the board"""
+        return self.board.move_stack
+    
+    def _invalidate_position_caches(self):
+        """Drop everything derived from the current position"""
+        self._legal_by_from = None
+        self._result_cache = None
+        self._fen_cache = None
+    
+    def _legal_moves_from(self, from_square: chess.Square) -> List[chess.Move]:
+        """Legal moves of the piece on from_square, cached per square for the current position"""
+        if self._legal_by_from is None:
+            self._legal_by_from = {}
+        moves = self._legal_by_from.get(from_square)
+        if moves is None:
+            # Masked generation: only this square's piece is expanded, not the whole move list
+            moves = list(self.board.generate_legal_moves(from_mask=chess.BB_SQUARES[from_square]))
+            self._legal_by_from[from_square] = moves
+        return moves
+    
     # ==================== Board State Management ====================
     
-    def has_board_changed(self, new_state: List[List[bool]]) -> bool:
+    def has_board_changed(self, new_state: SensorState) -> bool:
         """
         Check if the physical board state has changed.
         
         Args:
-            new_state: 8x8 boolean matrix from Hall Effect sensors
+            new_state: 8x8 boolean matrix from Hall Effect sensors, or its bitboard
             
         Returns:
             True if state has changed since last reading
         """
-        if self.last_known_state is None:
-            self.last_known_state = new_state
+        new_bb = sensor_matrix_to_bitboard(new_state)
+        if self.last_known_bb is None:
+            self.last_known_bb = new_bb
             return False
         
-        changed = new_state != self.last_known_state
+        changed = new_bb != self.last_known_bb
         
         if changed:
-            self.physical_board_state = new_state
+            self.physical_board_bb = new_bb
             
         return changed
     
-    def parse_physical_move(self, new_state: List[List[bool]]) -> Optional[chess.Move]:
+    def apply_sensor_delta(self, square: chess.Square, occupied: bool) -> chess.Bitboard:
+        """
+        Fold a single sensor edge event into the physical board bitboard.
+        
+        For sensor drivers that report (square, occupied) changes instead of
+        full scans; the first full scan still seeds the state.
+        
+        Args:
+            square: chess.Square whose sensor changed
+            occupied: New sensor reading for that square
+        
+        Returns:
+            Updated occupancy bitboard, ready for parse_physical_move()
+        """
+        bb = self.physical_board_bb
+        if bb is None:
+            bb = self.last_known_bb or 0
+        
+        if occupied:
+            bb |= chess.BB_SQUARES[square]
+        else:
+            bb &= ~chess.BB_SQUARES[square]
+        
+        self.physical_board_bb = bb
+        return bb
+    
+    def parse_physical_move(self, new_state: SensorState) -> Optional[chess.Move]:
         """
         Parse a physical board change into a chess move.
         
@@ -161,96 +353,99 @@ class GameManager:
         2. Piece placed on square B (B becomes occupied)
         
         Args:
-            new_state: Current sensor reading
+            new_state: Current sensor reading (matrix or bitboard)
             
         Returns:
             chess.Move object if valid, None if still in progress or invalid
         """
-        if self.last_known_state is None:
+        if self.last_known_bb is None:
             return None
         
-        # Find squares that changed
-        changed_squares = []
-        for rank in range(8):
-            for file in range(8):
-                if self.last_known_state[rank][file] != new_state[rank][file]:
-                    square = chess.square(file, 7 - rank)  # Convert to chess.Square
-                    is_occupied_now = new_state[rank][file]
-                    changed_squares.append((square, is_occupied_now))
+        # Find squares that changed: one XOR over the 64 sensors
+        new_bb = sensor_matrix_to_bitboard(new_state)
+        diff = new_bb ^ self.last_known_bb
         
         # No changes detected
-        if len(changed_squares) == 0:
+        if not diff:
+            return None
+        
+        change_count = chess.popcount(diff)
+        if change_count > 4:
+            logger.warning(f"Unexpected number of square changes: {change_count}")
             return None
         
+        # Sanity gate for partial sequences: a sensor can only go empty where
+        # the position has a piece, otherwise it's noise
+        if change_count != 2 and change_count != 4:
+            phantom = diff & ~new_bb & ~self.board.occupied
+            if phantom:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Ignoring sensor noise on empty squares: {chess.SquareSet(phantom)}")
+                return None
+        
         # Single square change - piece lifted but not yet placed
         # Wait for the full move to complete
-        if len(changed_squares) == 1:
+        if change_count == 1:
             logger.debug(f"Piece in transit - waiting for placement...")
             return None  # Move still in progress
         
+        # Split the diff into squares that emptied and squares that filled
+        emptied = diff & ~new_bb
+        placed = diff & new_bb
+        
         # Two squares changed - normal move OR capture in progress
-        if len(changed_squares) == 2:
-            from_square = None
-            to_square = None
-            
-            for square, is_occupied in changed_squares:
-                if not is_occupied:  # Was occupied, now empty
-                    from_square = square
-                else:  # Was empty, now occupied
-                    to_square = square
-            
-            # Both squares should be identified
-            if from_square is None or to_square is None:
+        if change_count == 2:
+            # Exactly one square should have emptied and one filled
+            if emptied == 0 or placed == 0:
                 # This might be capture in progress (two pieces lifted)
                 logger.debug(f"Two pieces lifted - capture in progress?")
                 return None  # Wait for piece to be placed
             
-            # Validate this is actually a legal move
+            from_square = chess.lsb(emptied)
+            to_square = chess.lsb(placed)
+            
             move = chess.Move(from_square, to_square)
             
-            # Check if this move is legal
-            if move not in self.board.legal_moves:
+            # Handle pawn promotion (before validation: a pawn reaching the
+            # back rank is only legal with a promotion piece)
+            # Cheap back-rank mask test first, piece lookup only on the back rank
+            if placed & chess.BB_BACKRANKS and self.board.piece_type_at(from_square) == chess.PAWN:
+                # Default to queen promotion
+                # TODO: Add UI for promotion choice
+                move = chess.Move(from_square, to_square, promotion=chess.QUEEN)
+            
+            # Validate this single move, without generating every legal move
+            if not self.board.is_legal(move):
                 # Maybe it's a capture and we detected it at the wrong time
                 logger.debug(f"Move {move.uci()} not legal yet - waiting...")
                 return None
             
             # Update last known state
-            self.last_known_state = new_state
-            
-            # Handle pawn promotion
-            if self.board.piece_at(from_square) == chess.Piece(chess.PAWN, self.board.turn):
-                to_rank = chess.square_rank(to_square)
-                if to_rank in [0, 7]:  # Back rank
-                    # Default to queen promotion
-                    # TODO: Add UI for promotion choice
-                    move = chess.Move(from_square, to_square, promotion=chess.QUEEN)
+            self.last_known_bb = new_bb
             
             return move
         
         # Three squares changed - this is likely capture sequence
         # Player has lifted their piece (1 empty), removed opponent piece (1 empty),
         # but hasn't placed yet. OR they just placed.
-        if len(changed_squares) == 3:
+        if change_count == 3:
             # Check if this resolves to a valid capture
             # One square should be newly occupied (destination)
             # Two squares should be newly empty (from_square and captured_square)
             
-            newly_empty = [sq for sq, occupied in changed_squares if not occupied]
-            newly_occupied = [sq for sq, occupied in changed_squares if occupied]
-            
-            if len(newly_occupied) == 1 and len(newly_empty) == 2:
+            if chess.popcount(placed) == 1:
                 # This looks like a capture!
-                to_square = newly_occupied[0]
+                to_square = chess.lsb(placed)
                 
                 # One of the empty squares was the captured piece
                 # The other was where our piece came from
                 # We need to figure out which is which using the legal moves
                 
-                for from_candidate in newly_empty:
+                for from_candidate in chess.scan_forward(emptied):
                     move = chess.Move(from_candidate, to_square)
-                    if move in self.board.legal_moves and self.board.is_capture(move):
+                    if self.board.is_legal(move) and self.board.is_capture(move):
                         # This is the valid capture!
-                        self.last_known_state = new_state
+                        self.last_known_bb = new_bb
                         logger.info(f"Capture detected: {move.uci()}")
                         return move
             
@@ -259,52 +454,33 @@ class GameManager:
             return None
         
         # Four squares changed - castling
-        if len(changed_squares) == 4:
+        if change_count == 4:
             # Castling: 4 squares change (king moves 2, rook jumps over)
-            self.last_known_state = new_state
+            self.last_known_bb = new_bb
             
-            moves = list(self.board.legal_moves)
-            castling_moves = [m for m in moves if self.board.is_castling(m)]
-            
-            # Find which castling move matches the changed squares
-            for move in castling_moves:
-                if self._move_matches_changes(move, changed_squares):
+            # The changed squares identify the castling move directly; cheap
+            # rights/king checks come before the full legality test
+            move = CASTLING_FINGERPRINTS.get(diff)
+            if move is not None:
+                turn = self.board.turn
+                if move.to_square > move.from_square:
+                    has_rights = self.board.has_kingside_castling_rights(turn)
+                else:
+                    has_rights = self.board.has_queenside_castling_rights(turn)
+                
+                if has_rights and self.board.is_castling(move) and self.board.is_legal(move):
                     logger.info(f"Castling detected: {move.uci()}")
                     return move
         
         # More than 4 changes - something weird happened
-        logger.warning(f"Unexpected number of square changes: {len(changed_squares)}")
+        logger.warning(f"Unexpected number of square changes: {change_count}")
         return None
     
-    def _move_matches_changes(self, move: chess.Move, changed_squares: List[Tuple[int, bool]]) -> bool:
-        """Helper to check if a move matches the observed square changes"""
-        # This is a simplified check - you might need to make this more robust
-        changed_square_nums = {sq for sq, _ in changed_squares}
-        
-        # For castling, check if the king and rook squares are in the changes
-        if self.board.is_castling(move):
-            # Get the squares involved in this castling move
-            from_sq = move.from_square
-            to_sq = move.to_square
-            
-            # Rook squares depend on which side
-            if to_sq > from_sq:  # Kingside
-                rook_from = from_sq + 3
-                rook_to = from_sq + 1
-            else:  # Queenside
-                rook_from = from_sq - 4
-                rook_to = from_sq - 1
-            
-            expected = {from_sq, to_sq, rook_from, rook_to}
-            return changed_square_nums == expected
-        
-        return False
-    
     # ==================== Move Validation & Execution ====================
     
     def is_legal_move(self, move: chess.Move) -> bool:
         """Check if a move is legal in the current position"""
-        return move in self.board.legal_moves
+        return self.board.is_legal(move)
     
     def make_move(self, move: chess.Move) -> bool:
         """
@@ -320,18 +496,20 @@ class GameManager:
             logger.warning(f"Attempted illegal move: {move}")
             return False
         
+        # SAN needs the pre-move position and a legal-move scan: only build it if logged
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"Move executed: {move.uci()} (SAN: {self.board.san(move)})")
+        
         # Push the move
         self.board.push(move)
-        self.move_history.append(move)
-        
-        logger.info(f"Move executed: {move.uci()} (SAN: {self.board.san(move)})")
+        self._invalidate_position_caches()
         return True
     
     def undo_move(self) -> Optional[chess.Move]:
         """Undo the last move"""
         if len(self.board.move_stack) > 0:
             move = self.board.pop()
-            self.move_history.pop()
+            self._invalidate_position_caches()
             logger.info(f"Move undone: {move.uci()}")
             return move
         return None
@@ -345,22 +523,49 @@ class GameManager:
         else:
             return self.black_player
     
+    async def start_online_game(self, game_id: str):
+        """
+        Attach an ONLINE_LICHESS game to a running Lichess game.
+        
+        Args:
+            game_id: Lichess game id whose moves are streamed to the board
+        """
+        for player in (self.white_player, self.black_player):
+            if isinstance(player, LichessProvider):
+                await player.start_game(game_id)
+                return
+        raise ValueError(f"Game mode {self.mode} has no Lichess opponent")
+    
+    async def start_pondering(self):
+        """
+        After a robot move, let the robot's engine search on the human's
+        thinking time (only when a human is to move).
+        """
+        turn = self.board.turn
+        if self._robot_moves[turn] or not self._robot_moves[not turn]:
+            return
+        
+        robot_player = self.black_player if turn == chess.WHITE else self.white_player
+        if isinstance(robot_player, EngineProvider):
+            await robot_player.start_pondering(self.board.copy())
+    
     async def get_hint(self) -> Optional[chess.Move]:
         """
         Get a hint for the current position.
         Uses the engine even if playing PvP.
         """
-        # Temporarily create an engine provider
-        hint_engine = EngineProvider(difficulty=15)
         try:
-            hint_move = await hint_engine.get_next_move(self.board)
-            logger.info(f"Hint: {hint_move.uci()}")
-            return hint_move
+            info = await self._analyse(chess.engine.Limit(time=HINT_TIME))
         except Exception as e:
             logger.error(f"Error getting hint: {e}")
             return None
-        finally:
-            await hint_engine.shutdown()
+        
+        pv = info.get("pv") if info else None
+        if not pv:
+            return None
+        hint_move = pv[0]
+        logger.info(f"Hint: {hint_move.uci()}")
+        return hint_move
     
     async def get_live_evaluation_for_piece(self, from_square: chess.Square) -> Dict[int, Dict[str, Any]]:
         """
@@ -375,45 +580,46 @@ class GameManager:
                 'move': chess.Move,
                 'evaluation_cp': int (centipawns),
                 'classification': str (BRILLIANT/EXCELLENT/GOOD/NEUTRAL/INACCURACY/MISTAKE/BLUNDER),
-                'color': [r, g, b] (LED color to display)
+                'color': (r, g, b) (LED color to display)
             }
         """
         logger.info(f"Calculating live evaluation for piece on {chess.square_name(from_square)}")
         
-        # Get current position evaluation
-        current_eval = await self.evaluate_position()
-        current_score = self._extract_cp_score(current_eval.get('score'))
-        
         # Find all legal moves from this square
-        legal_moves_from_square = [
-            move for move in self.board.legal_moves 
-            if move.from_square == from_square
-        ]
+        legal_moves_from_square = self._legal_moves_from(from_square)
         
         if not legal_moves_from_square:
             logger.warning(f"No legal moves from {chess.square_name(from_square)}")
             return {}
         
+        # Snapshot so both searches see the same position
+        board = self.board.copy(stack=False)
+        turn = board.turn
+        
+        # Get current position evaluation
+        current = await self._analyse(chess.engine.Limit(time=ANALYSIS_TIME), board=board)
+        if not current or "score" not in current:
+            return {}
+        current_score = current["score"].pov(turn).score(mate_score=MATE_SCORE_CP)
+        
+        # Score every destination in one MultiPV search restricted to this piece
+        lines = await self._analyse(
+            chess.engine.Limit(time=LIVE_EVALUATION_TIME),
+            root_moves=legal_moves_from_square,
+            multipv=len(legal_moves_from_square),
+            board=board
+        )
+        
         evaluations = {}
         
-        # Evaluate each possible destination
-        for move in legal_moves_from_square:
-            # Make the move temporarily
-            self.board.push(move)
-            
-            # Evaluate the resulting position
-            eval_after = await self.evaluate_position()
-            score_after = self._extract_cp_score(eval_after.get('score'))
-            
-            # Undo the move
-            self.board.pop()
+        for line in lines or []:
+            if not line.get("pv") or "score" not in line:
+                continue
+            move = line["pv"][0]
             
             # Calculate the evaluation delta
             # Positive delta = good for current player
-            if self.board.turn == chess.WHITE:
-                delta = score_after - current_score
-            else:
-                delta = current_score - score_after  # Flip for black
+            delta = line["score"].pov(turn).score(mate_score=MATE_SCORE_CP) - current_score
             
             # Classify the move based on evaluation delta
             classification, color = self._classify_move_by_delta(delta)
@@ -428,37 +634,7 @@ class GameManager:
         logger.info(f"Evaluated {len(evaluations)} possible moves")
         return evaluations
     
-    def _extract_cp_score(self, score_str: Optional[str]) -> int:
-        """
-        Extract centipawn score from Stockfish score string.
-        
-        Args:
-            score_str: String like "PovScore(Cp(+35), WHITE)" or "PovScore(Mate(+3), WHITE)"
-            
-        Returns:
-            Centipawn value (large positive/negative for mate)
-        """
-        if not score_str:
-            return 0
-        
-        # Handle mate scores
-        if "Mate" in score_str:
-            # Mate in X moves - return very large value
-            if "+" in score_str:
-                return 10000  # Winning
-            else:
-                return -10000  # Losing
-        
-        # Extract centipawn value
-        # Format: "PovScore(Cp(+35), WHITE)"
-        try:
-            cp_part = score_str.split("Cp(")[1].split(")")[0]
-            return int(cp_part)
-        except:
-            logger.warning(f"Could not parse score: {score_str}")
-            return 0
-    
-    def _classify_move_by_delta(self, delta_cp: int) -> tuple[str, list[int]]:
+    def _classify_move_by_delta(self, delta_cp: int) -> Tuple[str, Tuple[int, int, int]]:
         """
         Classify a move and assign LED color based on evaluation delta.
         
@@ -466,23 +642,9 @@ class GameManager:
             delta_cp: Centipawn change (positive = good, negative = bad)
             
         Returns:
-            (classification, [r, g, b] color)
-        """
-        # Thresholds based on common chess evaluation guidelines
-        if delta_cp >= 300:
-            return ("BRILLIANT", [255, 215, 0])      # Gold
-        elif delta_cp >= 100:
-            return ("EXCELLENT", [0, 255, 0])        # Green
-        elif delta_cp >= 0:
-            return ("GOOD", [100, 200, 100])         # Light green
-        elif delta_cp >= -50:
-            return ("NEUTRAL", [200, 200, 200])      # White/gray
-        elif delta_cp >= -100:
-            return ("INACCURACY", [255, 165, 0])     # Orange
-        elif delta_cp >= -300:
-            return ("MISTAKE", [255, 100, 0])        # Dark orange
-        else:
-            return ("BLUNDER", [255, 0, 0])          # Red
+            (classification, (r, g, b) color)
+        """
+        return MOVE_CLASSES[bisect.bisect_right(MOVE_CLASS_THRESHOLDS, delta_cp)]
     
     # ==================== Path Calculation ====================
     
@@ -496,24 +658,36 @@ class GameManager:
         """
         path = []
         
-        # Check if it's a capture
-        if self.board.is_capture(move):
-            # First, remove the captured piece
+        # Inspect the board once for both capture and castling
+        moving_piece = self.board.piece_type_at(move.from_square)
+        is_en_passant = (
+            moving_piece == chess.PAWN and move.to_square == self.board.ep_square
+            and (move.to_square ^ move.from_square) & 7 != 0
+        )
+        if is_en_passant:
+            # The captured pawn sits beside the from square, not on the to square
+            captured_square = (move.from_square & 0x38) | (move.to_square & 7)
+        elif self.board.occupied_co[not self.board.turn] & chess.BB_SQUARES[move.to_square]:
             captured_square = move.to_square
-            
-            # Find an empty graveyard spot
-            graveyard_spot = await self._find_empty_graveyard_spot(
+        else:
+            captured_square = None
+        is_castling = moving_piece == chess.KING and abs((move.to_square & 7) - (move.from_square & 7)) == 2
+        
+        # Check if it's a capture
+        if captured_square is not None:
+            # First, remove the captured piece (find an empty graveyard spot)
+            graveyard_spot = self._find_empty_graveyard_spot(
                 side=not self.board.turn  # Opponent's piece
             )
             
             path.append({
-                'from': self._square_to_coords(captured_square),
+                'from': SQUARE_COORDS[captured_square],
                 'to': graveyard_spot,
                 'action': 'capture'
             })
         
         # Check if it's castling
-        if self.board.is_castling(move):
+        if is_castling:
             # Castling requires moving both king and rook
             king_from = move.from_square
             king_to = move.to_square
@@ -528,26 +702,26 @@ class GameManager:
             
             # Move rook first, then king
             path.append({
-                'from': self._square_to_coords(rook_from),
-                'to': self._square_to_coords(rook_to),
+                'from': SQUARE_COORDS[rook_from],
+                'to': SQUARE_COORDS[rook_to],
                 'action': 'castle_rook'
             })
             path.append({
-                'from': self._square_to_coords(king_from),
-                'to': self._square_to_coords(king_to),
+                'from': SQUARE_COORDS[king_from],
+                'to': SQUARE_COORDS[king_to],
                 'action': 'castle_king'
             })
         else:
             # Normal move
             path.append({
-                'from': self._square_to_coords(move.from_square),
-                'to': self._square_to_coords(move.to_square),
+                'from': SQUARE_COORDS[move.from_square],
+                'to': SQUARE_COORDS[move.to_square],
                 'action': 'move'
             })
         
         return path
     
-    async def _find_empty_graveyard_spot(self, side: chess.Color) -> Tuple[int, int]:
+    def _find_empty_graveyard_spot(self, side: chess.Color) -> Tuple[int, int]:
         """
         Find an empty graveyard position.
         
@@ -574,32 +748,38 @@ class GameManager:
     
     def _square_to_coords(self, square: int) -> Tuple[int, int]:
         """Convert chess.Square to (x, y) coordinates"""
-        file = chess.square_file(square)
-        rank = chess.square_rank(square)
-        return (file, rank)
+        return SQUARE_COORDS[square]
     
     # ==================== Game State ====================
     
-    def get_game_result(self) -> str:
+    def get_game_result(self) -> GameResult:
         """
         Get the result of the game.
         
         Returns:
-            "WHITE_WIN", "BLACK_WIN", "DRAW", or "IN_PROGRESS"
+            GameResult (WHITE_WIN, BLACK_WIN, DRAW, or IN_PROGRESS)
         """
-        if not self.board.is_game_over():
-            return "IN_PROGRESS"
+        # outcome() generates legal moves, so only probe once per position
+        if self._result_cache is not None:
+            return self._result_cache
         
+        # One outcome() probe; it is None while the game is in progress
         outcome = self.board.outcome()
         if outcome is None:
-            return "DRAW"
-        
-        if outcome.winner == chess.WHITE:
-            return "WHITE_WIN"
-        elif outcome.winner == chess.BLACK:
-            return "BLACK_WIN"
+            result = GameResult.IN_PROGRESS
+        elif outcome.winner is chess.WHITE:
+            result = GameResult.WHITE_WIN
+        elif outcome.winner is chess.BLACK:
+            result = GameResult.BLACK_WIN
         else:
-            return "DRAW"
+            result = GameResult.DRAW
+        
+        self._result_cache = result
+        return result
+    
+    def is_game_over(self) -> bool:
+        """Whether the game has ended (shares the cached get_game_result() probe)"""
+        return self.get_game_result() != GameResult.IN_PROGRESS
     
     def resign(self):
         """Resign the current game"""
@@ -609,7 +789,9 @@ class GameManager:
     
     def get_fen(self) -> str:
         """Get current board position in FEN notation"""
-        return self.board.fen()
+        if self._fen_cache is None:
+            self._fen_cache = self.board.fen()
+        return self._fen_cache
     
     def get_pgn(self) -> str:
         """Get game in PGN format"""
@@ -618,60 +800,144 @@ class GameManager:
     
     # ==================== Analysis ====================
     
-    async def evaluate_position(self) -> Dict[str, Any]:
+    async def evaluate_position(self, board: Optional[chess.Board] = None) -> Dict[str, Any]:
         """
         Get engine evaluation of current position.
         
+        Args:
+            board: Position to evaluate instead of the live board
+        
         Returns:
-            Dict with 'score', 'best_move', 'pv' (principal variation)
+            Dict with 'score_cp' (centipawns from White's point of view, mates as
+            +/-MATE_SCORE_CP), 'best_move', 'pv' (principal variation)
         """
-        # Use Stockfish to evaluate
-        engine_path = Path("/usr/games/stockfish")  # Default Stockfish path on Linux
-        
-        if not engine_path.exists():
-            logger.warning("Stockfish not found")
-            return {}
+        # Transpositions (stepping back and forth, repeated lines) reuse the
+        # earlier search instead of asking the engine again
+        key = zobrist_key(board if board is not None else self.board)
+        cached = self._eval_cache.get(key)
+        if cached is None:
+            info = await self._analyse(chess.engine.Limit(time=ANALYSIS_TIME), board=board)
+            if info is None:
+                return {}
+            
+            score = info.get("score")
+            pv = info.get("pv", [])
+            cached = (
+                score.white().score(mate_score=MATE_SCORE_CP) if score else None,
+                pv[0].uci() if pv else None,
+                tuple(m.uci() for m in pv)
+            )
+            self._eval_cache[key] = cached
+            if len(self._eval_cache) > EVAL_CACHE_SIZE:
+                self._eval_cache.popitem(last=False)
+        else:
+            self._eval_cache.move_to_end(key)
+        
+        score_cp, best_move, pv = cached
+        return {
+            'score_cp': score_cp,
+            'best_move': best_move,
+            'pv': list(pv)
+        }
+    
+    async def _analyse(self, limit: chess.engine.Limit,
+                       root_moves: Optional[List[chess.Move]] = None,
+                       board: Optional[chess.Board] = None,
+                       multipv: Optional[int] = None) -> Union[Dict[str, Any], List[Dict[str, Any]], None]:
+        """
+        Analyse a position on the shared analysis engine.
         
-        transport, engine = await chess.engine.popen_uci(str(engine_path))
+        Args:
+            limit: Search limit
+            root_moves: Restrict the search to these moves (all legal moves if None)
+            board: Position to analyse (defaults to the live board)
+            multipv: Number of lines to return; if given the result is a list
         
+        Returns:
+            python-chess InfoDict (or list of them with multipv), or None if
+            Stockfish is not installed
+        """
+        # Snapshot now: the live board may move on while we wait for the engine
+        board = (board if board is not None else self.board).copy(stack=False)
+        
+        # A pondering robot engine would hold the worker cores for the whole
+        # analysis: pause it, and let it pick up again after the last one
+        ponderers = [player for player in (self.white_player, self.black_player)
+                     if isinstance(player, EngineProvider)]
+        self._analyses_running += 1
         try:
-            info = await engine.analyse(self.board, chess.engine.Limit(time=0.1))
-            
-            score = info.get("score")
-            best_move = info.get("pv", [None])[0] if "pv" in info else None
-            
-            return {
-                'score': str(score),
-                'best_move': best_move.uci() if best_move else None,
-                'pv': [m.uci() for m in info.get("pv", [])]
-            }
+            for player in ponderers:
+                await player.pause_pondering()
+            return await self._analyse_on_engine(board, limit, root_moves, multipv)
         finally:
-            await engine.quit()
+            self._analyses_running -= 1
+            if not self._analyses_running:
+                for player in ponderers:
+                    await player.resume_pondering()
+    
+    async def _analyse_on_engine(self, board: chess.Board, limit: chess.engine.Limit,
+                                 root_moves: Optional[List[chess.Move]],
+                                 multipv: Optional[int]) -> Union[Dict[str, Any], List[Dict[str, Any]], None]:
+        """Run one analysis on the shared analysis engine, starting it if needed"""
+        async with self._engine_lock:
+            if self._analysis_engine is None:
+                engine_path = _analysis_engine_path()
+                if engine_path is None:
+                    logger.warning("Stockfish not found")
+                    return None
+                transport, self._analysis_engine = await chess.engine.popen_uci(str(engine_path))
+                # Spawned from the pinned event loop thread: move it to the worker cores
+                pin_worker_process(transport.get_pid(), "analysis Stockfish")
+            
+            try:
+                return await self._analysis_engine.analyse(
+                    board, limit, multipv=multipv, root_moves=root_moves
+                )
+            except chess.engine.EngineTerminatedError:
+                # Reopen on the next call
+                self._analysis_engine = None
+                raise
+    
+    async def shutdown(self):
+        """Shut down the analysis engine and the player providers"""
+        async with self._engine_lock:
+            if self._analysis_engine is not None:
+                try:
+                    await self._analysis_engine.quit()
+                except chess.engine.EngineTerminatedError:
+                    pass
+                self._analysis_engine = None
+        
+        # Both sides may share one provider (e.g. Lichess)
+        players = {id(p): p for p in (self.white_player, self.black_player) if p is not None}
+        for player in players.values():
+            await player.shutdown()
     
     async def classify_move(self, move: chess.Move) -> str:
         """
-        Classify a move as brilliant/good/inaccuracy/mistake/blunder.
+        Classify a move as good/neutral/inaccuracy/mistake/blunder.
         
-        This requires comparing the evaluation before and after the move.
+        Compares the engine's best line with the line restricted to `move`,
+        both searched from the current position (no push/pop needed).
         """
-        # Get evaluation before move
-        eval_before = await self.evaluate_position()
-        
-        # Make move temporarily
-        self.board.push(move)
-        
-        # Get evaluation after move
-        eval_after = await self.evaluate_position()
-        
-        # Undo move
-        self.board.pop()
-        
-        # Compare evaluations and classify
-        # (This is simplified - real implementation would be more sophisticated)
-        
-        # TODO: Implement proper move classification logic
-        
-        return "GOOD"  # Placeholder
+        limit = chess.engine.Limit(time=ANALYSIS_TIME)
+        best = await self._analyse(limit)
+        if not best or "score" not in best:
+            return "GOOD"
+        
+        best_score = best["score"].relative.score(mate_score=MATE_SCORE_CP)
+        if (best.get("pv") or [None])[0] == move:
+            # The move is the engine's choice: nothing lost, skip the second search
+            move_score = best_score
+        else:
+            # An aborted or zero-depth search may report no score: don't classify then
+            played = await self._analyse(limit, root_moves=[move])
+            if not played or "score" not in played:
+                return "GOOD"
+            move_score = played["score"].relative.score(mate_score=MATE_SCORE_CP)
+        
+        classification, _ = self._classify_move_by_delta(min(0, move_score - best_score))
+        return classification
     
     # ==================== Analysis Mode ====================
     
@@ -695,11 +961,13 @@ class GameManager:
                 return False
             
             # Reset to starting position
-            self.board = pgn.board()
-            self.move_history = []
+            start = pgn.board()
+            self.board = ZobristBoard(start.fen(), chess960=start.chess960)
+            self._invalidate_position_caches()
+            self._eval_cache.clear()
             
             # Store all moves from the PGN
-            self.pgn_moves = list(pgn.mainline_moves())
+            self.pgn_moves = tuple(pgn.mainline_moves())
             self.analysis_position_index = 0
             
             logger.info(f"Loaded PGN with {len(self.pgn_moves)} moves")
@@ -730,6 +998,7 @@ class GameManager:
         
         move = self.pgn_moves[self.analysis_position_index]
         self.board.push(move)
+        self._invalidate_position_caches()
         self.analysis_position_index += 1
         
         logger.info(f"Stepped forward: {move.uci()} (position {self.analysis_position_index}/{len(self.pgn_moves)})")
@@ -751,6 +1020,7 @@ class GameManager:
             return None
         
         move = self.board.pop()
+        self._invalidate_position_caches()
         self.analysis_position_index -= 1
         
         logger.info(f"Stepped backward: {move.uci()} (position {self.analysis_position_index}/{len(self.pgn_moves)})")
@@ -772,14 +1042,27 @@ class GameManager:
         if move_number < 0 or move_number > len(self.pgn_moves):
             return False
         
-        # Reset to start
-        self.board.reset()
-        self.analysis_position_index = 0
+        # Step from the current position when the board is still on the PGN
+        # line (no play-mode moves on top of it): O(distance) pushes/pops
+        index = self.analysis_position_index
+        stack = self.board.move_stack
+        if len(stack) == index and (index == 0 or stack[-1] == self.pgn_moves[index - 1]):
+            if move_number == index:
+                return True
+            elif move_number > index:
+                for move in self.pgn_moves[index:move_number]:
+                    self.board.push(move)
+            else:
+                for _ in range(index - move_number):
+                    self.board.pop()
+        else:
+            # Reset to start and replay moves up to target position
+            self.board.reset()
+            for move in self.pgn_moves[:move_number]:
+                self.board.push(move)
         
-        # Replay moves up to target position
-        for i in range(move_number):
-            self.board.push(self.pgn_moves[i])
-            self.analysis_position_index += 1
+        self.analysis_position_index = move_number
+        self._invalidate_position_caches()
         
         logger.info(f"Jumped to position {move_number}")
         return True
@@ -4,11 +4,324 @@ Manages communication with ESP32 microcontrollers via UART.
 """
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import os
+import struct
+from collections import deque
+from itertools import count
+from math import hypot
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Deque
 import json
 
+try:
+    import termios  # POSIX tty control for the UART ports
+    import tty
+except ImportError:
+    termios = tty = None
+
 logger = logging.getLogger(__name__)
 
+# UART ports of the two ESP32s on the Raspberry Pi
+SENSOR_ESP_PORT = Path("/dev/ttyUSB0")
+MOTOR_ESP_PORT = Path("/dev/ttyUSB1")
+UART_BAUD = 115200
+
+# Bytes requested per read: everything the driver has buffered, in one call
+UART_READ_SIZE = 4096
+
+# Seconds to wait for the ESP32 to answer a request
+UART_REPLY_TIMEOUT = 2.0
+
+# Motion replies only come once the gantry stops: homing gets a fixed budget,
+# moves their estimated travel time plus a margin
+HOMING_TIMEOUT = 30.0
+MOTION_TIMEOUT_MARGIN = 2.0
+
+# Unsolicited messages kept per type (button, encoder, sensor_update, ...)
+UART_EVENT_BACKLOG = 64
+
+# Hot-path binary frames, mixed into the line stream: a frame starts with
+# FRAME_MAGIC (never the first byte of a JSON line) and has a fixed size
+FRAME_MAGIC = 0xA5
+FRAME_SCAN = 0x01
+SCAN_REQUEST = struct.Struct("<BBI")   # magic, FRAME_SCAN, request id
+SCAN_FRAME = struct.Struct("<BBIQ")    # magic, FRAME_SCAN, request id (0 = unsolicited), sensor bitboard
+
+# Commands the firmware answers (tagged with the request "id")
+SENSOR_REPLY_COMMANDS = frozenset({"scan_sensors"})
+MOTOR_REPLY_COMMANDS = frozenset({"home", "get_position", "move_absolute", "move_relative", "sequence"})
+
+# Scan cadence of the sensor ESP32 firmware (SCAN_INTERVAL_MS), mimicked in mock mode
+MOCK_SCAN_INTERVAL = 0.1
+
+# Sensor occupancy of the starting position (bit rank * 8 + file, a1 = bit 0)
+INITIAL_BOARD_BB = 0xFFFF00000000FFFF
+
+# Gantry speed (mm/min - will come from settings) and electromagnet settle times
+GANTRY_SPEED = 5000
+GANTRY_SPEED_MM_S = GANTRY_SPEED / 60  # 83.3 mm/s
+MAGNET_ENGAGE_MS = 200
+MAGNET_RELEASE_MS = 100
+
+# Longest command sequence the motor ESP32 accepts (MAX_SEQUENCE_STEPS in its firmware)
+MAX_SEQUENCE_STEPS = 16
+PICK_AND_PLACE_STEPS = 6
+
+# Square size: 50mm (400mm board / 8 squares) + 5mm LED strip between squares
+SQUARE_SIZE_MM = 55.0
+
+# Gantry position (mm) of each square's center, indexed by rank * 8 + file
+SQUARE_POSITIONS: Tuple[Tuple[float, float], ...] = tuple(
+    (file * SQUARE_SIZE_MM + SQUARE_SIZE_MM / 2, rank * SQUARE_SIZE_MM + SQUARE_SIZE_MM / 2)
+    for rank in range(8)
+    for file in range(8)
+)
+
+
+class MotionError(RuntimeError):
+    """The motor ESP32 did not confirm a motion (error/stopped reply or timeout)"""
+
+
+class UartLink:
+    """
+    Newline-delimited JSON link to one ESP32, plus fixed-size binary frames
+    for sensor scans.
+    
+    The tty is driven directly with os.read/os.write from event loop reader
+    and writer callbacks. Outgoing frames are buffered and flushed with a
+    single write per loop tick; incoming bytes are read in bulk and split into
+    frames in memory. Requests carry an id that the firmware copies into its
+    reply, everything else the ESP32 sends is kept as an event.
+    """
+    
+    def __init__(self, name: str, fd: int):
+        self.name = name
+        self._fd = fd
+        self._loop = asyncio.get_running_loop()
+        
+        self._tx_buffer = bytearray()
+        self._rx_buffer = bytearray()
+        
+        # Replies awaited by request(), keyed by request id
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._request_ids = count(1)
+        
+        # Unsolicited messages by "type", and the wake-ups of wait_events()
+        self._events: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._arrivals: Dict[str, asyncio.Event] = {}
+        
+        self._loop.add_reader(fd, self._on_readable)
+    
+    @classmethod
+    async def open(cls, name: str, port: Path, baudrate: int = UART_BAUD) -> "UartLink":
+        """Open the serial port in raw non-blocking mode and start reading"""
+        fd = os.open(port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        
+        # Raw 8N1 at the requested baud rate, no echo or line editing
+        tty.setraw(fd)
+        attributes = termios.tcgetattr(fd)
+        speed = getattr(termios, f"B{baudrate}")
+        attributes[4] = attributes[5] = speed  # ispeed, ospeed
+        termios.tcsetattr(fd, termios.TCSANOW, attributes)
+        termios.tcflush(fd, termios.TCIOFLUSH)
+        
+        link = cls(name, fd)
+        logger.info(f"{name} ESP32 connected on {port}")
+        return link
+    
+    async def close(self):
+        """Stop the I/O callbacks, flush queued frames, fail outstanding requests and close the port"""
+        self._loop.remove_reader(self._fd)
+        self._loop.remove_writer(self._fd)
+        
+        if self._tx_buffer:
+            os.set_blocking(self._fd, True)
+            try:
+                os.write(self._fd, self._tx_buffer)
+            except OSError as e:
+                logger.warning(f"{self.name} ESP32 final write failed: {e}")
+            self._tx_buffer.clear()
+        
+        for future in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+        
+        os.close(self._fd)
+    
+    def send(self, command: Dict[str, Any]):
+        """Queue a command that expects no reply"""
+        self._queue_frame(json.dumps(command, separators=(",", ":")).encode() + b"\n")
+    
+    async def request(self, command: Dict[str, Any], timeout: float = UART_REPLY_TIMEOUT) -> Optional[Dict[str, Any]]:
+        """
+        Send a command and wait for the reply carrying its id.
+        
+        Args:
+            command: Command dictionary (an "id" field is added)
+            timeout: Seconds to wait for the reply
+            
+        Returns:
+            Reply dictionary, or None on timeout
+        """
+        request_id = next(self._request_ids)
+        frame = json.dumps({**command, "id": request_id}, separators=(",", ":")).encode() + b"\n"
+        return await self._request(request_id, frame, command["cmd"], timeout)
+    
+    async def request_scan(self, timeout: float = UART_REPLY_TIMEOUT) -> Optional[int]:
+        """
+        Ask for a sensor scan with a binary frame.
+        
+        Returns:
+            Sensor bitboard, or None on timeout
+        """
+        request_id = next(self._request_ids)
+        frame = SCAN_REQUEST.pack(FRAME_MAGIC, FRAME_SCAN, request_id)
+        return await self._request(request_id, frame, "scan", timeout)
+    
+    async def _request(self, request_id: int, frame: bytes, name: str, timeout: float) -> Any:
+        """Queue a frame and wait for the reply that carries request_id"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        
+        self._queue_frame(frame)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.name} ESP32 did not answer {name} within {timeout}s")
+            return None
+        finally:
+            self._pending.pop(request_id, None)
+    
+    def take_events(self, event_type: str) -> List[Dict[str, Any]]:
+        """Remove and return the buffered unsolicited messages of one type"""
+        events = self._events.get(event_type)
+        if not events:
+            return []
+        taken = list(events)
+        events.clear()
+        return taken
+    
+    async def wait_events(self, event_type: str, timeout: float) -> List[Dict[str, Any]]:
+        """
+        Wait for unsolicited messages of one type, then take them.
+        
+        Args:
+            event_type: Message "type" to wait for
+            timeout: Seconds to wait
+            
+        Returns:
+            The buffered messages, or an empty list on timeout
+        """
+        if not self._events.get(event_type):
+            arrived = self._arrivals.setdefault(event_type, asyncio.Event())
+            arrived.clear()
+            try:
+                await asyncio.wait_for(arrived.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        return self.take_events(event_type)
+    
+    def _queue_frame(self, frame: bytes):
+        """Append a frame to the TX buffer; it goes out with everything else queued this tick"""
+        if not self._tx_buffer:
+            self._loop.add_writer(self._fd, self._on_writable)
+        self._tx_buffer += frame
+    
+    def _on_writable(self):
+        """Write as much of the TX buffer as the tty accepts"""
+        try:
+            written = os.write(self._fd, self._tx_buffer)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.error(f"{self.name} ESP32 write failed: {e}")
+            written = len(self._tx_buffer)
+        
+        del self._tx_buffer[:written]
+        if not self._tx_buffer:
+            self._loop.remove_writer(self._fd)
+    
+    def _on_readable(self):
+        """Read whatever is buffered and dispatch each complete frame"""
+        try:
+            chunk = os.read(self._fd, UART_READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.error(f"{self.name} ESP32 read failed: {e}")
+            chunk = b""
+        
+        if not chunk:
+            logger.error(f"{self.name} ESP32 link closed")
+            self._loop.remove_reader(self._fd)
+            return
+        
+        buffer = self._rx_buffer
+        buffer += chunk
+        start = 0
+        length = len(buffer)
+        while start < length:
+            if buffer[start] == FRAME_MAGIC:
+                end = start + SCAN_FRAME.size
+                if end > length:
+                    break
+                _, _, request_id, bitboard = SCAN_FRAME.unpack_from(buffer, start)
+                self._dispatch_scan(request_id, bitboard)
+                start = end
+            else:
+                end = buffer.find(b"\n", start)
+                if end == -1:
+                    break
+                self._dispatch(buffer[start:end])
+                start = end + 1
+        del buffer[:start]
+    
+    def _dispatch_scan(self, request_id: int, bitboard: int):
+        """Route a binary sensor frame to its waiting request_scan() or the events"""
+        future = self._pending.get(request_id) if request_id else None
+        if future is not None and not future.done():
+            future.set_result(bitboard)
+            return
+        
+        self._dispatch_event({"type": "sensor_update", "bb": bitboard})
+    
+    def _dispatch(self, frame: bytearray):
+        """Route one received frame to its waiting request or the event buffers"""
+        # Blank line (e.g. a bare "\r"); json.loads skips surrounding whitespace itself
+        if not frame or frame.isspace():
+            return
+        
+        try:
+            message = json.loads(frame)
+        except ValueError:
+            logger.warning(f"{self.name} ESP32 sent malformed frame: {frame[:80]!r}")
+            return
+        
+        # Valid JSON but not an object (a bare number or string): nothing to route
+        if not isinstance(message, dict):
+            logger.warning(f"{self.name} ESP32 sent non-object frame: {frame[:80]!r}")
+            return
+        
+        future = self._pending.get(message.get("id"))
+        if future is not None and not future.done():
+            future.set_result(message)
+            return
+        
+        self._dispatch_event(message)
+    
+    def _dispatch_event(self, message: Dict[str, Any]):
+        """Buffer an unsolicited message under its type"""
+        event_type = message.get("type", "unknown")
+        events = self._events.get(event_type)
+        if events is None:
+            events = self._events[event_type] = deque(maxlen=UART_EVENT_BACKLOG)
+        events.append(message)
+        
+        arrived = self._arrivals.get(event_type)
+        if arrived is not None:
+            arrived.set()
+
 
 class HardwareInterface:
     """
@@ -17,22 +330,29 @@ class HardwareInterface:
     """
     
     def __init__(self):
-        self.sensor_esp: Optional[Any] = None  # Will be serial connection
-        self.motor_esp: Optional[Any] = None   # Will be serial connection
+        self.sensor_esp: Optional[UartLink] = None
+        self.motor_esp: Optional[UartLink] = None
         
         # Current gantry position
         self.current_position: Tuple[int, int] = (0, 0)
         self.is_homed: bool = False
         
-        # Simulated sensor state for testing
-        self.mock_sensor_state: List[List[bool]] = [[False] * 8 for _ in range(8)]
+        # Last sensor bitboard read from the hardware (kept if a scan times out)
+        self.last_sensor_bb: int = 0
+        
+        # Simulated sensor bitboard for testing
+        self.mock_sensor_state: int = 0
         
     async def initialize(self):
         """Initialize hardware connections"""
         logger.info("Initializing hardware interface...")
         
-        # TODO: Open serial connections to ESP32s
-        # For now, using mock mode
+        if termios is not None and SENSOR_ESP_PORT.exists() and MOTOR_ESP_PORT.exists():
+            self.sensor_esp = await UartLink.open("Sensor", SENSOR_ESP_PORT)
+            self.motor_esp = await UartLink.open("Motor", MOTOR_ESP_PORT)
+            logger.info("Hardware interface initialized")
+            return
+        
         logger.warning("Running in MOCK MODE - no real hardware")
         
         await asyncio.sleep(0.1)  # Simulate initialization delay
@@ -42,13 +362,11 @@ class HardwareInterface:
         """Home the H-Bot gantry to (0,0) using limit switch"""
         logger.info("Homing motors...")
         
-        # TODO: Send homing command to motor ESP32
-        # Command format: {"cmd": "home"}
-        
-        await self._send_motor_command({"cmd": "home"})
+        # The motor ESP32 answers once the limit switch has been found
+        await self._send_motor_command({"cmd": "home"}, timeout=HOMING_TIMEOUT)
         
-        # Wait for homing to complete
-        await asyncio.sleep(2.0)  # Simulate homing time
+        if self.motor_esp is None:
+            await asyncio.sleep(2.0)  # Simulate homing time
         
         self.current_position = (0, 0)
         self.is_homed = True
@@ -58,32 +376,67 @@ class HardwareInterface:
         """Shutdown hardware gracefully"""
         logger.info("Shutting down hardware...")
         
-        # TODO: Close serial connections
         # Turn off electromagnets
         await self._send_motor_command({"cmd": "magnet_off"})
         
         # Turn off LEDs
         await self._send_sensor_command({"cmd": "leds_off"})
         
+        # Close serial connections
+        for link in (self.sensor_esp, self.motor_esp):
+            if link is not None:
+                await link.close()
+        self.sensor_esp = None
+        self.motor_esp = None
+        
         logger.info("Hardware shutdown complete")
     
     # ==================== Sensor Interface ====================
     
-    async def read_sensor_matrix(self) -> List[List[bool]]:
+    async def wait_sensor_bitboard(self, timeout: float) -> int:
+        """
+        Wait for the next occupancy change.
+        
+        The sensor ESP32 pushes an update whenever its own 100ms scan sees a
+        change, so nothing is sent over the UART while the board is still.
+        If no update arrives within timeout, an explicit scan resyncs.
+        
+        Args:
+            timeout: Seconds to wait for an update before scanning
+            
+        Returns:
+            Occupancy bitboard (see read_sensor_bitboard)
+        """
+        if self.sensor_esp is not None:
+            updates = await self.sensor_esp.wait_events("sensor_update", timeout)
+            if updates:
+                self.last_sensor_bb = updates[-1]["bb"]
+                return self.last_sensor_bb
+        else:
+            # Mock mode: nothing pushes updates, keep the scan cadence
+            await asyncio.sleep(min(timeout, MOCK_SCAN_INTERVAL))
+        
+        return await self.read_sensor_bitboard()
+    
+    async def read_sensor_bitboard(self) -> int:
         """
         Read the 8x8 Hall Effect sensor matrix.
         
         Returns:
-            8x8 boolean matrix (True = piece present)
+            Occupancy bitboard: bit (rank * 8 + file) set = piece present,
+            the python-chess square order (bit 0 = a1)
         """
-        # TODO: Send command to sensor ESP32 to scan matrix
-        # Command format: {"cmd": "scan_sensors"}
-        # Response format: {"sensors": [[bool, ...], ...]}
+        # Hardware: binary scan request/reply frames (see SCAN_REQUEST/SCAN_FRAME)
+        if self.sensor_esp is not None:
+            bitboard = await self.sensor_esp.request_scan()
+            if bitboard is not None:
+                self.last_sensor_bb = bitboard
+            return self.last_sensor_bb
         
         response = await self._send_sensor_command({"cmd": "scan_sensors"})
         
-        if response and "sensors" in response:
-            return response["sensors"]
+        if response and "bb" in response:
+            return response["bb"]
         
         # Return mock state for testing
         return self.mock_sensor_state
@@ -95,7 +448,10 @@ class HardwareInterface:
         Returns:
             List of button events: [{"button": "BTN1", "state": "pressed"}, ...]
         """
-        # TODO: Poll button states from sensor ESP32
+        # The sensor ESP32 pushes button events as they happen
+        if self.sensor_esp is not None:
+            return self.sensor_esp.take_events("button")
+        
         response = await self._send_sensor_command({"cmd": "read_buttons"})
         
         if response and "buttons" in response:
@@ -113,77 +469,105 @@ class HardwareInterface:
             from_square: (file, rank) - 0-indexed
             to_square: (file, rank) - 0-indexed
         """
-        logger.info(f"Moving piece from {from_square} to {to_square}")
-        
-        # Calculate physical coordinates (convert chess coords to mm)
-        from_pos = self._square_to_position(from_square)
-        to_pos = self._square_to_position(to_square)
-        
-        # Move to source square
-        await self._move_gantry(from_pos)
-        
-        # Engage electromagnet
-        await self._send_motor_command({"cmd": "magnet_on"})
-        await asyncio.sleep(0.2)  # Wait for magnet to engage
-        
-        # Move to destination square
-        await self._move_gantry(to_pos)
+        await self.move_pieces([(from_square, to_square)])
+    
+    async def move_pieces(self, moves: List[Tuple[Tuple[int, int], Tuple[int, int]]]):
+        """
+        Move several pieces in order (e.g. captured piece to the graveyard,
+        then the capturing piece).
         
-        # Disengage electromagnet
-        await self._send_motor_command({"cmd": "magnet_off"})
-        await asyncio.sleep(0.1)
+        Args:
+            moves: (from_square, to_square) pairs, each (file, rank) - 0-indexed
+            
+        Raises:
+            MotionError: If a sequence did not complete; the physical board
+                         no longer matches the planned moves
+        """
+        # Pick up, carry and release each piece in one sequence the motor
+        # ESP32 runs on its own: one round-trip for the whole path, no
+        # host-side magnet sleeps or pauses between pieces
+        per_sequence = MAX_SEQUENCE_STEPS // PICK_AND_PLACE_STEPS
+        hold_time = (MAGNET_ENGAGE_MS + MAGNET_RELEASE_MS) / 1000
+        
+        for start in range(0, len(moves), per_sequence):
+            steps: List[Dict[str, Any]] = []
+            duration = 0.0
+            position = self.current_position
+            
+            for from_square, to_square in moves[start:start + per_sequence]:
+                logger.info(f"Moving piece from {from_square} to {to_square}")
+                
+                # Calculate physical coordinates (convert chess coords to mm)
+                from_pos = self._square_to_position(from_square)
+                to_pos = self._square_to_position(to_square)
+                
+                steps += (
+                    self._move_command(from_pos),
+                    {"cmd": "magnet_on"},
+                    {"cmd": "wait", "ms": MAGNET_ENGAGE_MS},
+                    self._move_command(to_pos),
+                    {"cmd": "magnet_off"},
+                    {"cmd": "wait", "ms": MAGNET_RELEASE_MS},
+                )
+                duration += self._travel_time(position, from_pos) + self._travel_time(from_pos, to_pos) + hold_time
+                position = to_pos
+            
+            await self._send_motor_macro(steps, duration=duration)
+            self.current_position = position
         
         logger.info("Move complete")
     
-    async def _move_gantry(self, position: Tuple[float, float]):
+    async def _send_motor_macro(self, steps: List[Dict[str, Any]], duration: float) -> Optional[Dict[str, Any]]:
         """
-        Move gantry to absolute position (in mm).
+        Run motor commands in order on the motor ESP32 as a single request.
         
         Args:
-            position: (x, y) in millimeters
+            steps: Ordered sub-commands (move_absolute, magnet_on, magnet_off, wait)
+            duration: Expected run time in seconds (travel plus waits)
+            
+        Returns:
+            The final position update (None in simulation, with no motor ESP32)
+            
+        Raises:
+            MotionError: If the ESP32 replied with anything but a position
+                         update ("error", "stopped") or not at all
         """
-        x, y = position
-        
-        # TODO: Calculate stepper pulses needed
-        # Send movement command to motor ESP32
-        command = {
-            "cmd": "move_absolute",
-            "x": x,
-            "y": y,
-            "speed": 5000  # mm/min - will come from settings
-        }
-        
-        await self._send_motor_command(command)
+        reply = await self._send_motor_command({"cmd": "sequence", "steps": steps},
+                                               timeout=duration + MOTION_TIMEOUT_MARGIN)
         
-        # Wait for movement to complete
-        # TODO: Implement proper movement completion detection
-        distance = ((x - self.current_position[0])**2 + (y - self.current_position[1])**2)**0.5
-        movement_time = distance / 83.3  # 5000 mm/min = 83.3 mm/s
-        await asyncio.sleep(movement_time)
+        if self.motor_esp is None:
+            await asyncio.sleep(duration)  # Simulate the whole sequence
+        elif reply is None or reply.get("type") != "position":
+            raise MotionError(f"Motor sequence did not complete: {reply}")
         
-        self.current_position = (x, y)
+        return reply
+    
+    def _move_command(self, position: Tuple[float, float]) -> Dict[str, Any]:
+        """move_absolute command for a gantry position (in mm)"""
+        x, y = position
+        return {"cmd": "move_absolute", "x": x, "y": y, "speed": GANTRY_SPEED}
+    
+    def _travel_time(self, start: Tuple[float, float], end: Tuple[float, float]) -> float:
+        """Seconds the gantry needs between two positions (in mm)"""
+        return hypot(end[0] - start[0], end[1] - start[1]) / GANTRY_SPEED_MM_S
     
     def _square_to_position(self, square: Tuple[int, int]) -> Tuple[float, float]:
         """
         Convert chess square coordinates to physical position in mm.
         
         Args:
-            square: (file, rank) where file=0-7, rank=0-7
+            square: (file, rank) where file=0-7, rank=0-7 on the board;
+                    graveyard slots lie outside that range (e.g. file -1)
             
         Returns:
             (x, y) position in mm
         """
         file, rank = square
+        if 0 <= file < 8 and 0 <= rank < 8:
+            return SQUARE_POSITIONS[rank * 8 + file]
         
-        # Square size: 50mm (400mm board / 8 squares)
-        # Add 5mm for LED strip between squares
-        square_size = 55.0  # 50mm square + 5mm LED strip
-        
-        # Center of square
-        x = (file * square_size) + (square_size / 2)
-        y = (rank * square_size) + (square_size / 2)
-        
-        return (x, y)
+        # Off-board (graveyard) slot: same grid, extended past the edge
+        return (file * SQUARE_SIZE_MM + SQUARE_SIZE_MM / 2, rank * SQUARE_SIZE_MM + SQUARE_SIZE_MM / 2)
     
     # ==================== LED Control ====================
     
@@ -270,7 +654,7 @@ class HardwareInterface:
     
     async def _send_sensor_command(self, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
-        Send a command to the sensor ESP32 and wait for response.
+        Send a command to the sensor ESP32 and wait for its reply, if it sends one.
         
         Args:
             command: Command dictionary
@@ -278,51 +662,54 @@ class HardwareInterface:
         Returns:
             Response dictionary or None
         """
-        # TODO: Implement actual UART communication
-        # For now, return mock responses
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Sensor ESP32 <- {json.dumps(command)}")
         
-        logger.debug(f"Sensor ESP32 <- {json.dumps(command)}")
+        if self.sensor_esp is not None:
+            if command["cmd"] in SENSOR_REPLY_COMMANDS:
+                return await self.sensor_esp.request(command)
+            self.sensor_esp.send(command)
+            return None
         
-        # Simulate response delay
+        # Mock mode: simulate response delay
         await asyncio.sleep(0.01)
         
         # Mock responses
         if command["cmd"] == "scan_sensors":
             # Return initial board position
-            return {"sensors": self._get_initial_board_state()}
+            return {"bb": self._get_initial_board_state()}
         elif command["cmd"] == "read_buttons":
             return {"buttons": []}
         
         return {"status": "ok"}
     
-    async def _send_motor_command(self, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def _send_motor_command(self, command: Dict[str, Any],
+                                  timeout: float = UART_REPLY_TIMEOUT) -> Optional[Dict[str, Any]]:
         """
-        Send a command to the motor ESP32 and wait for response.
+        Send a command to the motor ESP32 and wait for its reply, if it sends one.
         
         Args:
             command: Command dictionary
+            timeout: Seconds to wait for the reply
             
         Returns:
             Response dictionary or None
         """
-        # TODO: Implement actual UART communication
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Motor ESP32 <- {json.dumps(command)}")
         
-        logger.debug(f"Motor ESP32 <- {json.dumps(command)}")
+        if self.motor_esp is not None:
+            if command["cmd"] in MOTOR_REPLY_COMMANDS:
+                return await self.motor_esp.request(command, timeout)
+            self.motor_esp.send(command)
+            return None
         
-        # Simulate response delay
+        # Mock mode: simulate response delay
         await asyncio.sleep(0.01)
         
         return {"status": "ok"}
     
-    def _get_initial_board_state(self) -> List[List[bool]]:
+    def _get_initial_board_state(self) -> int:
         """Get the standard chess starting position sensor state"""
-        state = [[False] * 8 for _ in range(8)]
-        
-        # Ranks 0-1 (white pieces) and 6-7 (black pieces) are occupied
-        for file in range(8):
-            state[0][file] = True  # White back rank
-            state[1][file] = True  # White pawns
-            state[6][file] = True  # Black pawns
-            state[7][file] = True  # Black back rank
-        
-        return state
+        # Ranks 1-2 (white pieces) and 7-8 (black pieces) are occupied
+        return INITIAL_BOARD_BB
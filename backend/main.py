@@ -4,15 +4,26 @@ Implements the async event loop that coordinates all subsystems.
 """
 import asyncio
 import logging
+import os
 import signal
-from typing import Optional
 
-from statemachine import StateMachine, State
+import chess
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from typing import Callable, List, Optional, Tuple
+
 from game_manager import GameManager
+from providers.engine_provider import shutdown_engines
 from hardware_interface import HardwareInterface
 from database_manager import DatabaseManager
 from user_manager import UserManager
 from voice_service import VoiceService
+from cpu_affinity import pin_orchestrator, pin_worker_thread
+
+try:
+    import uvloop  # Faster drop-in event loop (libuv)
+except ImportError:
+    uvloop = None
 
 # Configure logging
 logging.basicConfig(
@@ -21,8 +32,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Background loop periods (seconds)
+SENSOR_RESYNC_INTERVAL = 1.0  # explicit scan if the sensor ESP32 reported no change
+INPUT_POLL_INTERVAL = 0.05
+UI_UPDATE_INTERVAL = 0.5
+
+# Worker threads shared by every blocking call (asyncio.to_thread / run_in_executor)
+BLOCKING_IO_WORKERS = os.cpu_count() or 1
+
+
+class BoardState(IntEnum):
+    """State machine states, kept on the controller as plain ints"""
+    BOOT = 0
+    IDLE = 1
+    HUMAN_TURN = 2
+    ROBOT_THINKING = 3
+    ROBOT_MOVING = 4
+    ERROR = 5
+    GAME_OVER = 6
+
+
+class BoardEvent(IntEnum):
+    """State machine events, dense so they index the transition table directly"""
+    STARTUP_COMPLETE = 0
+    START_GAME = 1
+    MOVE_DETECTED = 2
+    THINK_COMPLETE = 3
+    MOVE_EXECUTED = 4
+    ERROR_OCCURRED = 5
+    ERROR_RESOLVED = 6
+    GAME_ENDED = 7
+    RESET_GAME = 8
+
+
+# States in which a physical move can happen, so the sensors are worth polling
+SENSOR_POLLING_STATES = frozenset({BoardState.HUMAN_TURN, BoardState.IDLE})
+
+
+class ShutdownRequested(Exception):
+    """Raised inside the background task group to cancel all its tasks"""
+
+
+class TransitionNotAllowed(Exception):
+    """Raised when an event has no transition out of the current state"""
 
-class ChessStateMachine(StateMachine):
+
+# One transition option: (guard or None, target). Options of a cell are tried in order.
+TransitionOption = Tuple[Optional[Callable[["ChessStateMachine"], bool]], BoardState]
+
+
+def _event(event: BoardEvent) -> Callable[["ChessStateMachine"], None]:
+    """Build the method that sends one event, e.g. state_machine.move_detected()"""
+    def send_event(self: "ChessStateMachine"):
+        self.send(event)
+    send_event.__name__ = event.name.lower()
+    return send_event
+
+
+class ChessStateMachine:
     """
     State machine for Chess Board Logic Flow
     
@@ -34,43 +101,143 @@ class ChessStateMachine(StateMachine):
     - ROBOT_MOVING: Executing mechanical movements
     - ERROR: Illegal move detected or hardware fault
     - GAME_OVER: Display results, save stats
+    
+    The current state lives on the model (model.board_state); send() is
+    specialized at import time into straight-line compares over TRANSITIONS.
     """
     
-    # Define States
-    boot = State(initial=True)
-    idle = State()
-    human_turn = State()
-    robot_thinking = State()
-    robot_moving = State()
-    error = State()
-    game_over = State()
+    def __init__(self, model):
+        self.model = model
+    
+    # send(event) is generated from TRANSITIONS once the table exists (see _compile_send)
+    
+    # Events
+    startup_complete = _event(BoardEvent.STARTUP_COMPLETE)
+    start_game = _event(BoardEvent.START_GAME)
+    move_detected = _event(BoardEvent.MOVE_DETECTED)
+    think_complete = _event(BoardEvent.THINK_COMPLETE)
+    move_executed = _event(BoardEvent.MOVE_EXECUTED)
+    error_occurred = _event(BoardEvent.ERROR_OCCURRED)
+    error_resolved = _event(BoardEvent.ERROR_RESOLVED)
+    game_ended = _event(BoardEvent.GAME_ENDED)
+    reset_game = _event(BoardEvent.RESET_GAME)
+    
+    # Conditions
+    def is_robot_next(self) -> bool:
+        """Check if it's the robot's turn to move"""
+        game_manager = self.model.game_manager
+        return game_manager is not None and game_manager.is_robot_next()
+    
+    def game_continues(self) -> bool:
+        """Check if game should continue"""
+        return self.model.game_manager and not self.model.game_manager.is_game_over()
+    
+    # Actions
+    def on_enter_state(self, target: BoardState):
+        """
+        Record the new state on the controller and wake the sensor polling
+        loop only in states that accept physical moves.
+        """
+        self.model.board_state = target
+        
+        if target in SENSOR_POLLING_STATES:
+            self.model.sensor_polling_enabled.set()
+        else:
+            self.model.sensor_polling_enabled.clear()
+
 
-    # Define Transitions
-    startup_complete = boot.to(idle)
-    start_game = idle.to(human_turn)
+def _build_transition_table(
+    rules: Tuple[Tuple[BoardState, BoardEvent, BoardState, Optional[Callable]], ...]
+) -> List[List[Optional[Tuple[TransitionOption, ...]]]]:
+    """
+    Lay (source, event, target, guard) rules out as a [state][event] table.
+    Rules sharing a source and event become ordered options of one cell.
+    """
+    table: List[List[Optional[Tuple[TransitionOption, ...]]]] = [
+        [None] * len(BoardEvent) for _ in BoardState
+    ]
+    for source, event, target, guard in rules:
+        table[source][event] = (table[source][event] or ()) + ((guard, target),)
+    return table
+
+
+TRANSITIONS = _build_transition_table((
+    (BoardState.BOOT, BoardEvent.STARTUP_COMPLETE, BoardState.IDLE, None),
+    (BoardState.IDLE, BoardEvent.START_GAME, BoardState.HUMAN_TURN, None),
     
     # Move processing transitions
-    move_detected = human_turn.to(robot_thinking, cond="is_robot_next") | human_turn.to(human_turn)
+    (BoardState.HUMAN_TURN, BoardEvent.MOVE_DETECTED, BoardState.ROBOT_THINKING,
+     ChessStateMachine.is_robot_next),
+    (BoardState.HUMAN_TURN, BoardEvent.MOVE_DETECTED, BoardState.HUMAN_TURN, None),
     
-    think_complete = robot_thinking.to(robot_moving)
-    move_executed = robot_moving.to(human_turn, cond="game_continues") | robot_moving.to(game_over)
+    (BoardState.ROBOT_THINKING, BoardEvent.THINK_COMPLETE, BoardState.ROBOT_MOVING, None),
+    (BoardState.ROBOT_MOVING, BoardEvent.MOVE_EXECUTED, BoardState.HUMAN_TURN,
+     ChessStateMachine.game_continues),
+    (BoardState.ROBOT_MOVING, BoardEvent.MOVE_EXECUTED, BoardState.GAME_OVER, None),
     
     # Error handling
-    error_occurred = human_turn.to(error) | robot_thinking.to(error) | robot_moving.to(error)
-    error_resolved = error.to(human_turn)
+    (BoardState.HUMAN_TURN, BoardEvent.ERROR_OCCURRED, BoardState.ERROR, None),
+    (BoardState.ROBOT_THINKING, BoardEvent.ERROR_OCCURRED, BoardState.ERROR, None),
+    (BoardState.ROBOT_MOVING, BoardEvent.ERROR_OCCURRED, BoardState.ERROR, None),
+    (BoardState.ERROR, BoardEvent.ERROR_RESOLVED, BoardState.HUMAN_TURN, None),
     
     # Game termination
-    game_ended = human_turn.to(game_over) | robot_moving.to(game_over)
-    reset_game = game_over.to(idle)
+    (BoardState.HUMAN_TURN, BoardEvent.GAME_ENDED, BoardState.GAME_OVER, None),
+    (BoardState.ROBOT_MOVING, BoardEvent.GAME_ENDED, BoardState.GAME_OVER, None),
+    (BoardState.GAME_OVER, BoardEvent.RESET_GAME, BoardState.IDLE, None),
+))
+
+
+def _compile_send(
+    table: List[List[Optional[Tuple[TransitionOption, ...]]]]
+) -> Callable[[ChessStateMachine, BoardEvent], None]:
+    """
+    Generate ChessStateMachine.send from the transition table.
     
-    # Conditions
-    def is_robot_next(self) -> bool:
-        """Check if it's the robot's turn to move"""
-        return self.model.game_manager and not self.model.game_manager.board.turn == self.model.game_manager.human_color
+    The graph is fixed, so every (state, event) cell becomes an inline int
+    compare and guard call instead of a generic table walk at runtime.
     
-    def game_continues(self) -> bool:
-        """Check if game should continue"""
-        return self.model.game_manager and not self.model.game_manager.board.is_game_over()
+    Returns:
+        send(self, event) applying the event to model.board_state; it raises
+        TransitionNotAllowed if no transition matches the state and event
+    """
+    namespace = {"TransitionNotAllowed": TransitionNotAllowed}
+    lines = [
+        "def send(self, event):",
+        "    state = self.model.board_state",
+    ]
+    
+    for state in BoardState:
+        cells = [(event, table[state][event]) for event in BoardEvent if table[state][event]]
+        if not cells:
+            continue
+        lines.append(f"    if state == {int(state)}:  # {state.name}")
+        for event, options in cells:
+            lines.append(f"        if event == {int(event)}:  # {event.name}")
+            for guard, target in options:
+                namespace[f"S_{target.name}"] = target
+                enter = f"return self.on_enter_state(S_{target.name})"
+                if guard is None:
+                    lines.append(f"            {enter}")
+                    break
+                namespace[guard.__name__] = guard
+                lines.append(f"            if {guard.__name__}(self):")
+                lines.append(f"                {enter}")
+    
+    lines.append(
+        "    raise TransitionNotAllowed("
+        "f\"Can't {BoardEvent(event).name.lower()} when in {BoardState(state).name}\")"
+    )
+    namespace["BoardEvent"] = BoardEvent
+    namespace["BoardState"] = BoardState
+    
+    exec(compile("\n".join(lines), "<ChessStateMachine.send>", "exec"), namespace)
+    send = namespace["send"]
+    send.__doc__ = "Apply an event to the current state (generated from TRANSITIONS)"
+    return send
+
+
+ChessStateMachine.send = _compile_send(TRANSITIONS)
 
 
 class ChessBoardController:
@@ -80,6 +247,12 @@ class ChessBoardController:
     """
     
     def __init__(self):
+        # Current state, owned by the state machine and updated on every transition
+        self.board_state = BoardState.BOOT
+        
+        # Set by the state machine while physical moves are possible
+        self.sensor_polling_enabled = asyncio.Event()
+        
         self.state_machine = ChessStateMachine(model=self)
         self.hardware: Optional[HardwareInterface] = None
         self.game_manager: Optional[GameManager] = None
@@ -88,9 +261,14 @@ class ChessBoardController:
         self.voice_service: Optional[VoiceService] = None
         
         # Task management
-        self.background_tasks: list[asyncio.Task] = []
         self.shutdown_event = asyncio.Event()
         
+        # One bounded thread pool for all blocking subsystem calls
+        # Workers start lazily from the (pinned) event loop thread, so each moves itself off its core
+        self.executor = ThreadPoolExecutor(
+            max_workers=BLOCKING_IO_WORKERS, thread_name_prefix="blocking_io", initializer=pin_worker_thread
+        )
+        
         # Current game state
         self.current_user_id: Optional[int] = None
         self.pending_move: Optional[str] = None
@@ -99,6 +277,9 @@ class ChessBoardController:
         """Initialize all subsystems"""
         logger.info("Initializing chess board controller...")
         
+        # Route asyncio.to_thread / run_in_executor(None, ...) to the shared pool
+        asyncio.get_running_loop().set_default_executor(self.executor)
+        
         try:
             # Initialize database
             self.db_manager = DatabaseManager()
@@ -119,6 +300,9 @@ class ChessBoardController:
             self.voice_service = VoiceService()
             await self.voice_service.initialize()
             
+            # Last, so the database, Vosk and audio threads started above keep every core
+            pin_orchestrator()
+            
             logger.info("Initialization complete")
             return True
             
@@ -138,19 +322,9 @@ class ChessBoardController:
         # Transition to IDLE state
         self.state_machine.startup_complete()
         
-        # Start background tasks
-        self.background_tasks = [
-            asyncio.create_task(self._sensor_polling_loop(), name="sensor_polling"),
-            asyncio.create_task(self._voice_listening_loop(), name="voice_listening"),
-            asyncio.create_task(self._ui_update_loop(), name="ui_updates"),
-            asyncio.create_task(self._button_monitoring_loop(), name="button_monitoring"),
-        ]
-        
-        logger.info(f"System ready. Current state: {self.state_machine.current_state.id}")
-        
-        # Main loop - wait for shutdown signal
+        # Main loop - run background tasks until shutdown signal
         try:
-            await self.shutdown_event.wait()
+            await self._run_background_tasks()
         except asyncio.CancelledError:
             logger.info("Main loop cancelled")
         finally:
@@ -160,14 +334,13 @@ class ChessBoardController:
         """Gracefully shutdown all subsystems"""
         logger.info("Shutting down chess board system...")
         
-        # Cancel all background tasks
-        for task in self.background_tasks:
-            task.cancel()
+        # Shutdown subsystems
+        if self.game_manager:
+            await self.game_manager.shutdown()
         
-        # Wait for tasks to complete
-        await asyncio.gather(*self.background_tasks, return_exceptions=True)
+        # Stockfish processes are kept across games; stop them for good now
+        await shutdown_engines()
         
-        # Shutdown subsystems
         if self.hardware:
             await self.hardware.shutdown()
         
@@ -177,53 +350,103 @@ class ChessBoardController:
         if self.db_manager:
             await self.db_manager.close()
         
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        
         logger.info("Shutdown complete")
     
     # ==================== Background Tasks ====================
     
+    async def _run_background_tasks(self):
+        """
+        Run the background loops until the shutdown signal.
+        
+        The loops live in one task group: leaving it (shutdown signal,
+        cancellation or a crashed loop) cancels and awaits all of them.
+        """
+        try:
+            async with asyncio.TaskGroup() as background_tasks:
+                background_tasks.create_task(self._sensor_polling_loop(), name="sensor_polling")
+                background_tasks.create_task(self._input_loop(), name="input")
+                background_tasks.create_task(self._voice_loop(), name="voice")
+                background_tasks.create_task(self._ui_update_loop(), name="ui_updates")
+                
+                logger.info(f"System ready. Current state: {self.board_state.name}")
+                
+                await self.shutdown_event.wait()
+                raise ShutdownRequested()
+        except* ShutdownRequested:
+            pass
+    
     async def _sensor_polling_loop(self):
         """
-        Continuously poll Hall Effect sensors for board state changes.
-        Runs every 100ms as specified in the technical report.
+        React to Hall Effect sensor changes pushed by the sensor ESP32 (which
+        scans every 100ms as specified in the technical report), with an
+        explicit scan every SENSOR_RESYNC_INTERVAL of silence. Sleeps without
+        waking while the state machine is in a state where no physical move
+        can happen (robot thinking/moving, error, game over).
         """
         logger.info("Starting sensor polling loop")
         
         try:
             while not self.shutdown_event.is_set():
                 # Only poll when in states that care about physical moves
-                if self.state_machine.current_state.id in ['human_turn', 'idle']:
-                    board_state = await self.hardware.read_sensor_matrix()
-                    
-                    # Check for changes (delta detection)
-                    if self.game_manager and self.game_manager.has_board_changed(board_state):
-                        logger.info("Board change detected")
-                        await self._handle_board_change(board_state)
+                await self.sensor_polling_enabled.wait()
+                
+                # One bitboard per change; change detection and move parsing share it
+                board_bb = await self.hardware.wait_sensor_bitboard(SENSOR_RESYNC_INTERVAL)
+                
+                # The state may have moved on while waiting
+                if not self.sensor_polling_enabled.is_set():
+                    continue
                 
-                # Poll every 100ms
-                await asyncio.sleep(0.1)
+                # Check for changes (delta detection)
+                if self.game_manager and self.game_manager.has_board_changed(board_bb):
+                    logger.info("Board change detected")
+                    await self._handle_board_change(board_bb)
                 
         except asyncio.CancelledError:
             logger.info("Sensor polling loop cancelled")
     
-    async def _voice_listening_loop(self):
+    async def _input_loop(self):
         """
-        Continuously listen for voice commands using Vosk.
+        Poll user input: physical buttons and rotary encoders.
         """
-        logger.info("Starting voice listening loop")
+        logger.info("Starting input loop")
+        tick = asyncio.get_running_loop().time()
         
         try:
             while not self.shutdown_event.is_set():
-                if self.voice_service and self.voice_service.is_enabled():
-                    command = await self.voice_service.listen_for_command()
-                    
-                    if command:
-                        logger.info(f"Voice command received: {command}")
-                        await self._handle_voice_command(command)
+                button_events = await self.hardware.read_buttons()
+                
+                for event in button_events:
+                    await self._handle_button_event(event)
+                
+                # Check for input every 50ms
+                tick = await self._wait_next_tick(tick, INPUT_POLL_INTERVAL)
                 
-                await asyncio.sleep(0.05)  # Check for voice every 50ms
+        except asyncio.CancelledError:
+            logger.info("Input loop cancelled")
+    
+    async def _voice_loop(self):
+        """
+        Handle voice commands (Vosk) as they are recognized. Sleeps until the
+        voice service reports an utterance, so it never wakes in mock mode.
+        """
+        if not self.voice_service:
+            return
+        logger.info("Starting voice loop")
+        
+        try:
+            while not self.shutdown_event.is_set():
+                command = await self.voice_service.listen_for_command()
+                
+                # Utterances heard while voice control is switched off are dropped
+                if command and self.voice_service.is_enabled():
+                    logger.info(f"Voice command received: {command}")
+                    await self._handle_voice_command(command)
                 
         except asyncio.CancelledError:
-            logger.info("Voice listening loop cancelled")
+            logger.info("Voice loop cancelled")
     
     async def _ui_update_loop(self):
         """
@@ -231,43 +454,50 @@ class ChessBoardController:
         Updates board state, clock, evaluation, etc.
         """
         logger.info("Starting UI update loop")
+        tick = asyncio.get_running_loop().time()
         
         try:
             while not self.shutdown_event.is_set():
                 if self.game_manager:
                     # Prepare UI update payload
                     ui_data = {
-                        'state': self.state_machine.current_state.id,
-                        'board_fen': self.game_manager.board.fen(),
+                        'state': self.board_state.name.lower(),
+                        'board_fen': self.game_manager.get_fen(),
                         'turn': 'white' if self.game_manager.board.turn else 'black',
-                        'game_over': self.game_manager.board.is_game_over(),
+                        'game_over': self.game_manager.is_game_over(),
                     }
                     
                     # Send to WebSocket clients (will implement later)
                     # await self.websocket_manager.broadcast(ui_data)
                 
-                await asyncio.sleep(0.5)  # Update UI every 500ms
+                # Update UI every 500ms
+                tick = await self._wait_next_tick(tick, UI_UPDATE_INTERVAL)
                 
         except asyncio.CancelledError:
             logger.info("UI update loop cancelled")
     
-    async def _button_monitoring_loop(self):
+    async def _wait_next_tick(self, tick: float, period: float) -> float:
         """
-        Monitor physical buttons and rotary encoders for input.
+        Sleep until the next tick of a fixed-rate loop, so the time spent in
+        the loop body counts towards the period instead of adding to it.
+        
+        Args:
+            tick: Event loop time of the current tick
+            period: Loop period in seconds
+            
+        Returns:
+            Event loop time of the next tick
         """
-        logger.info("Starting button monitoring loop")
+        now = asyncio.get_running_loop().time()
+        tick += period
         
-        try:
-            while not self.shutdown_event.is_set():
-                button_events = await self.hardware.read_buttons()
-                
-                for event in button_events:
-                    await self._handle_button_event(event)
-                
-                await asyncio.sleep(0.05)  # Poll buttons every 50ms
-                
-        except asyncio.CancelledError:
-            logger.info("Button monitoring loop cancelled")
+        # Fell behind (slow iteration or paused loop): restart the cadence
+        # rather than firing the missed ticks back to back
+        if tick < now:
+            tick = now
+        
+        await asyncio.sleep(tick - now)
+        return tick
     
     # ==================== Event Handlers ====================
     
@@ -276,13 +506,14 @@ class ChessBoardController:
         Process a detected change in the physical board state.
         """
         try:
-            if self.state_machine.current_state.id == 'human_turn':
+            if self.board_state == BoardState.HUMAN_TURN:
                 # Validate the move
                 move = self.game_manager.parse_physical_move(new_board_state)
                 
                 if move and self.game_manager.is_legal_move(move):
                     logger.info(f"Legal move detected: {move}")
                     self.game_manager.make_move(move)
+                    self._record_move()
                     
                     # Update LEDs to show the move
                     await self.hardware.highlight_move(move)
@@ -291,7 +522,7 @@ class ChessBoardController:
                     self.state_machine.move_detected()
                     
                     # If it's robot's turn, start thinking
-                    if self.state_machine.current_state.id == 'robot_thinking':
+                    if self.board_state == BoardState.ROBOT_THINKING:
                         await self._robot_think()
                 else:
                     logger.warning(f"Illegal move detected: {move}")
@@ -336,16 +567,15 @@ class ChessBoardController:
             # Calculate path (handles captures, castling, etc.)
             path = await self.game_manager.calculate_move_path(move)
             
-            # Execute each step of the path
-            for step in path:
-                await self.hardware.move_piece(step['from'], step['to'])
-                await asyncio.sleep(0.1)  # Small delay between steps
+            # Execute every step of the path as one motor sequence
+            await self.hardware.move_pieces([(step['from'], step['to']) for step in path])
             
             # Update the internal board state
             self.game_manager.make_move(move)
+            self._record_move()
             
             # Check if game is over
-            if self.game_manager.board.is_game_over():
+            if self.game_manager.is_game_over():
                 logger.info("Game over!")
                 self.state_machine.move_executed()  # Will transition to game_over
                 await self._handle_game_over()
@@ -353,10 +583,27 @@ class ChessBoardController:
                 # Transition back to human turn
                 self.state_machine.move_executed()
                 
+                # Let the engine keep searching while the human thinks
+                await self.game_manager.start_pondering()
+                
         except Exception as e:
             logger.error(f"Error during robot move: {e}")
             self.state_machine.error_occurred()
     
+    def _record_move(self):
+        """Queue the move just played for the move history (and later opening books)"""
+        if not (self.db_manager and self.game_manager.game_id):
+            return
+        board = self.game_manager.board
+        move = board.peek()
+        self.db_manager.save_move(
+            game_id=self.game_manager.game_id,
+            move_number=len(board.move_stack),  # ply
+            side="BLACK" if board.turn == chess.WHITE else "WHITE",
+            move_notation=move.uci(),
+            fen_after=self.game_manager.get_fen()
+        )
+    
     async def _handle_voice_command(self, command: str):
         """
         Process a voice command.
@@ -388,11 +635,19 @@ class ChessBoardController:
         result = self.game_manager.get_game_result()
         logger.info(f"Game over. Result: {result}")
         
-        # Save game to database
-        if self.db_manager and self.game_manager.game_id:
-            await self.db_manager.save_game_result(
-                game_id=self.game_manager.game_id,
-                result=result
+        # Save the result and credit both players' stats in one transaction
+        game_id = self.game_manager.game_id
+        if self.db_manager and game_id:
+            game = await self.db_manager.get_game(game_id) or {}
+            outcome = self.game_manager.board.outcome()
+            await self.db_manager.finalize_game(
+                game_id=game_id,
+                white_user_id=game.get("white_user_id"),
+                black_user_id=game.get("black_user_id"),
+                result=str(result),
+                # No outcome on the board: the game was resigned
+                termination=outcome.termination.name if outcome else "RESIGNATION",
+                final_fen=self.game_manager.get_fen()
             )
         
         # Update UI to show result
@@ -400,9 +655,15 @@ class ChessBoardController:
     
     # ==================== Public API ====================
     
-    async def start_new_game(self, mode: str = "VS_ENGINE", user_id: Optional[int] = None):
+    async def start_new_game(self, mode: str = "VS_ENGINE", user_id: Optional[int] = None,
+                             lichess_game_id: Optional[str] = None):
         """
         Start a new game with specified mode.
+        
+        Args:
+            mode: Game mode (OFFLINE_PVP, VS_ENGINE, ONLINE_LICHESS, ...)
+            user_id: Logged-in player, whose settings and opening book are used
+            lichess_game_id: For ONLINE_LICHESS, the Lichess game to play
         """
         logger.info(f"Starting new game: mode={mode}, user_id={user_id}")
         
@@ -413,14 +674,22 @@ class ChessBoardController:
             self.current_user_id = user_id
         
         # Create game manager with mode
-        self.game_manager = GameManager(mode=mode, settings=settings)
+        if self.game_manager:
+            await self.game_manager.shutdown()
+        # The logged-in player's openings let the engine answer known positions instantly
+        opening_book = None
+        if user_id and self.user_manager and self.user_manager.current_user_id == user_id:
+            opening_book = self.user_manager.opening_book
+        self.game_manager = GameManager(mode=mode, settings=settings, opening_book=opening_book)
+        if lichess_game_id:
+            await self.game_manager.start_online_game(lichess_game_id)
         
         # Create game record in database
         if self.db_manager:
             self.game_manager.game_id = await self.db_manager.create_game(
                 white_user_id=user_id,
                 black_user_id=None,  # AI or online opponent
-                mode=mode
+                game_mode=mode
             )
         
         # Transition to human turn
@@ -482,6 +751,9 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        if uvloop is not None:
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Application stopped by user")
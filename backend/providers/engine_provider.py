@@ -4,12 +4,341 @@ Engine Provider - Stockfish chess engine.
 import chess
 import chess.engine
 import logging
-from typing import Optional
+import os
+from typing import Any, Dict, Optional, Set, Tuple
 from pathlib import Path
 import asyncio
 
+from cpu_affinity import pin_worker_process
+from zobrist_board import zobrist_key
+
 logger = logging.getLogger(__name__)
 
+# Common Stockfish install locations, tried in order
+STOCKFISH_PATHS = (
+    Path("/usr/games/stockfish"),
+    Path("/usr/local/bin/stockfish"),
+    Path("/opt/homebrew/bin/stockfish"),
+    Path("stockfish"),
+)
+
+# Search resources: every core but one (left for the event loop and I/O), and
+# a transposition table of up to ENGINE_HASH_MB, capped at a quarter of free RAM
+ENGINE_THREADS = max(1, (os.cpu_count() or 1) - 1)
+ENGINE_HASH_MB = 256
+
+# Search time (seconds) for every move; strength comes from the options below,
+# not from cutting the search short
+ENGINE_THINK_TIME = 0.4
+
+# Stockfish's UCI_Elo range; difficulty 0-19 maps linearly onto it, 20 is unlimited.
+# The result is clamped to the range the engine build advertises.
+ENGINE_ELO_MIN = 1320
+ENGINE_ELO_MAX = 3190
+MAX_SKILL_LEVEL = 20
+
+# Upper bound (seconds) on a ponder search: after this the engine is told to
+# stop, and its result is kept for a ponderhit (or dropped on a miss)
+PONDER_TIME_LIMIT = 60.0
+
+# Seconds a quitting engine gets before it is killed
+ENGINE_QUIT_TIMEOUT = 2.0
+
+# Running Stockfish processes shared by every EngineProvider, one per binary
+# path: a new game reuses the process instead of paying fork/exec and the
+# UCI handshake again, and each search sets its own strength. Closed by
+# shutdown_engines().
+_ENGINE_POOL: Dict[str, "UciEngine"] = {}
+_ENGINE_POOL_LOCK = asyncio.Lock()
+
+
+def _engine_hash_mb() -> int:
+    """Hash size in MB: ENGINE_HASH_MB, or less when free memory is short"""
+    try:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return ENGINE_HASH_MB
+    return max(16, min(ENGINE_HASH_MB, available // (4 * 1024 * 1024)))
+
+
+def _millis(seconds: float) -> int:
+    """UCI time argument (whole milliseconds, at least 1)"""
+    return max(1, round(seconds * 1000))
+
+
+def _strength_options(skill_level: int, elo_range: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+    """
+    UCI options that set playing strength for a difficulty of 0-20.
+    
+    Args:
+        skill_level: Difficulty; 0-19 limit strength through UCI_Elo, 20 plays at full strength
+        elo_range: (min, max) UCI_Elo the engine advertises; builds differ
+                   (older Stockfish starts at 1350), and out-of-range values are rejected
+    """
+    if skill_level >= MAX_SKILL_LEVEL:
+        return {"Skill Level": skill_level, "UCI_LimitStrength": False}
+    elo = ENGINE_ELO_MIN + (ENGINE_ELO_MAX - ENGINE_ELO_MIN) * skill_level // MAX_SKILL_LEVEL
+    if elo_range is not None:
+        elo = max(elo_range[0], min(elo_range[1], elo))
+    return {"Skill Level": skill_level, "UCI_LimitStrength": True, "UCI_Elo": elo}
+
+
+class UciEngine:
+    """
+    Minimal UCI client for playing moves.
+    
+    EngineProvider only needs the final "bestmove" of each search, so the
+    engine's output is read as raw lines and everything else (thousands of
+    "info" lines per deep search) is dropped with a prefix check instead of
+    being parsed into Python objects.
+    """
+    
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.options: Set[str] = set()
+        # Spin option name -> (min, max), as advertised in the "uci" reply
+        self.option_ranges: Dict[str, Tuple[int, int]] = {}
+        # Strength options last sent; providers of any difficulty share the process
+        self._strength: Optional[Dict[str, Any]] = None
+        self._game: Optional[object] = None
+        self._searching = False
+        # Sends "stop" when a ponder search reaches PONDER_TIME_LIMIT
+        self._search_deadline: Optional[asyncio.TimerHandle] = None
+        # One command/response exchange at a time on the shared pipes
+        self._lock = asyncio.Lock()
+    
+    @classmethod
+    async def start(cls, path: Path) -> "UciEngine":
+        """Start the engine process and complete the UCI handshake"""
+        process = await asyncio.create_subprocess_exec(
+            str(path),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        engine = cls(process)
+        
+        engine._send("uci")
+        while True:
+            line = await engine._read_line()
+            if line.startswith(b"uciok"):
+                break
+            if line.startswith(b"option name "):
+                # "option name <name> type <type> ..."; names may contain spaces
+                name, _, details = line[12:].partition(b" type ")
+                name = name.decode()
+                engine.options.add(name)
+                
+                # "... type spin default <n> min <lo> max <hi>"
+                fields = details.split()
+                if fields[:1] == [b"spin"] and b"min" in fields and b"max" in fields:
+                    try:
+                        engine.option_ranges[name] = (
+                            int(fields[fields.index(b"min") + 1]),
+                            int(fields[fields.index(b"max") + 1]),
+                        )
+                    except (IndexError, ValueError):
+                        pass
+        return engine
+    
+    def is_running(self) -> bool:
+        """True until the engine process exits"""
+        return self.process.returncode is None
+    
+    async def configure(self, options: Dict[str, Any]):
+        """Set UCI options and wait until the engine has applied them"""
+        async with self._lock:
+            self._setoptions(options)
+            await self._sync()
+    
+    async def play(self, board: chess.Board, think_time: float, game: object,
+                   skill_level: int) -> Tuple[Optional[chess.Move], Optional[chess.Move]]:
+        """
+        Search the position for think_time seconds.
+        
+        Args:
+            board: Position to search (its move stack is replayed from the root)
+            think_time: Search time in seconds
+            game: Identity of the current game; "ucinewgame" is sent whenever it changes
+            skill_level: Difficulty 0-20 to search at (see _strength_options)
+            
+        Returns:
+            (best move, expected reply); the best move is None if the position
+            has no legal moves, the reply None if the engine didn't predict one
+        """
+        async with self._lock:
+            self._set_strength(skill_level)
+            self._go(board, game, f"go movetime {_millis(think_time)}")
+            return await self._read_bestmove()
+    
+    async def start_ponder(self, board: chess.Board, think_time: float, game: object, skill_level: int):
+        """
+        Start pondering on board ("go ponder"); end it with ponderhit() if the
+        opponent plays the move it assumes, or stop_search() otherwise.
+        
+        Args:
+            board: Position after the opponent's expected reply
+            think_time: Search time once the ponder search turns into a real one
+            game: Identity of the current game
+            skill_level: Difficulty 0-20 to search at
+        """
+        async with self._lock:
+            self._set_strength(skill_level)
+            self._go(board, game, f"go ponder movetime {_millis(think_time)}")
+            self._searching = True
+            self._search_deadline = asyncio.get_running_loop().call_later(
+                PONDER_TIME_LIMIT, self._halt_search
+            )
+    
+    async def ponderhit(self) -> Tuple[Optional[chess.Move], Optional[chess.Move]]:
+        """
+        Tell the ponder search its assumed move was played and wait for the
+        result. A search that already ran past think_time answers at once.
+        
+        Returns:
+            (best move, expected reply), as from play()
+        """
+        async with self._lock:
+            self._end_background_search()
+            # Ignored by an engine the deadline already stopped: its bestmove is buffered
+            self._send("ponderhit")
+            return await self._read_bestmove()
+    
+    async def stop_search(self):
+        """Stop the background search (if any) and consume its bestmove"""
+        async with self._lock:
+            if not self._searching:
+                return
+            self._end_background_search()
+            # Harmless if the search already finished: its bestmove is buffered
+            self._send("stop")
+            await self._read_bestmove()
+    
+    async def quit(self):
+        """Ask the engine to exit, killing it if it doesn't"""
+        if self.is_running():
+            try:
+                self._send("quit")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            try:
+                await asyncio.wait_for(self.process.wait(), ENGINE_QUIT_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+    
+    def _set_strength(self, skill_level: int):
+        """Send the strength options for skill_level, unless they are already set"""
+        options = _strength_options(skill_level, self.option_ranges.get("UCI_Elo"))
+        options = {name: value for name, value in options.items() if name in self.options}
+        if options != self._strength:
+            self._setoptions(options)
+            self._strength = options
+    
+    def _setoptions(self, options: Dict[str, Any]):
+        """Send one setoption per option (UCI booleans are lowercase)"""
+        if options:
+            self._send(*(
+                f"setoption name {name} value {str(value).lower() if isinstance(value, bool) else value}"
+                for name, value in options.items()
+            ))
+    
+    def _halt_search(self):
+        """PONDER_TIME_LIMIT reached: stop searching, leaving the bestmove buffered"""
+        self._search_deadline = None
+        if self._searching and self.is_running():
+            self._send("stop")
+    
+    def _end_background_search(self):
+        """Forget the background search and its deadline (the caller reads its bestmove)"""
+        self._searching = False
+        if self._search_deadline is not None:
+            self._search_deadline.cancel()
+            self._search_deadline = None
+    
+    def _go(self, board: chess.Board, game: object, go_command: str):
+        """Send the position (and ucinewgame for a new game) followed by a go command"""
+        if game is not self._game:
+            self._send("ucinewgame")
+            self._game = game
+        
+        position = f"position fen {board.root().fen()}"
+        if board.move_stack:
+            position += " moves " + " ".join(move.uci() for move in board.move_stack)
+        self._send(position, go_command)
+    
+    async def _read_bestmove(self) -> Tuple[Optional[chess.Move], Optional[chess.Move]]:
+        """Skip output up to the "bestmove" line and parse it: (move, ponder move)"""
+        while True:
+            line = await self._read_line()
+            if line.startswith(b"bestmove"):
+                break
+        
+        # "bestmove <move> [ponder <move>]"
+        fields = line.split()
+        if len(fields) < 2 or fields[1] in (b"(none)", b"0000"):
+            return None, None
+        move = chess.Move.from_uci(fields[1].decode())
+        if len(fields) >= 4 and fields[2] == b"ponder":
+            return move, chess.Move.from_uci(fields[3].decode())
+        return move, None
+    
+    async def _sync(self):
+        """Round-trip isready/readyok"""
+        self._send("isready")
+        while not (await self._read_line()).startswith(b"readyok"):
+            pass
+    
+    def _send(self, *commands: str):
+        """Write commands, one per line"""
+        if not self.is_running():
+            raise chess.engine.EngineTerminatedError("engine process died unexpectedly")
+        self.process.stdin.write(("\n".join(commands) + "\n").encode())
+    
+    async def _read_line(self) -> bytes:
+        """Next output line (without the newline)"""
+        line = await self.process.stdout.readline()
+        if not line:
+            raise chess.engine.EngineTerminatedError("engine process died unexpectedly")
+        return line.rstrip()
+
+
+async def _acquire_engine(path: Path) -> UciEngine:
+    """Pooled engine for path, started on first use"""
+    key = str(path)
+    
+    async with _ENGINE_POOL_LOCK:
+        engine = _ENGINE_POOL.get(key)
+        if engine is not None and engine.is_running():
+            return engine
+        
+        logger.info(f"Starting Stockfish from {path}")
+        engine = await UciEngine.start(path)
+        # Off the event loop's core, before "Threads" spawns the search threads
+        pin_worker_process(engine.process.pid, "Stockfish")
+        
+        # Search resources (only options this build offers); strength is set per search
+        options = {
+            "Threads": ENGINE_THREADS,
+            "Hash": _engine_hash_mb(),
+            # UCI: a GUI that sends "go ponder" announces it with this option
+            "Ponder": True,
+        }
+        await engine.configure({name: value for name, value in options.items() if name in engine.options})
+        
+        _ENGINE_POOL[key] = engine
+        return engine
+
+
+async def shutdown_engines():
+    """Quit every pooled Stockfish process (call once at application shutdown)"""
+    async with _ENGINE_POOL_LOCK:
+        for engine in _ENGINE_POOL.values():
+            await engine.quit()
+        _ENGINE_POOL.clear()
+    
+    logger.info("Stockfish engines shutdown")
+
 
 class EngineProvider:
     """
@@ -17,44 +346,42 @@ class EngineProvider:
     Calculates moves based on difficulty setting.
     """
     
-    def __init__(self, difficulty: int = 5):
+    def __init__(self, difficulty: int = 5, opening_book: Optional[Dict[int, str]] = None,
+                 game: Optional[object] = None):
         """
         Initialize engine provider.
         
         Args:
-            difficulty: Skill level 0-20 (0=easiest, 20=strongest)
+            difficulty: 0-20; 0-19 play at UCI_Elo ENGINE_ELO_MIN..ENGINE_ELO_MAX
+                        (e.g. 5 is about 1787 Elo), 20 at full strength
+            opening_book: Zobrist hash -> move (UCI) played without searching
+            game: Identity of the game being played (e.g. its GameManager); both
+                  engines of an engine-vs-engine game share it, so the shared
+                  process isn't sent "ucinewgame" between their moves
         """
-        self.difficulty = max(0, min(20, difficulty))
-        self.engine = None
-        self.transport = None
+        self.difficulty = max(0, min(MAX_SKILL_LEVEL, difficulty))
+        self.opening_book = opening_book or {}
+        self.game = game if game is not None else self
+        self.engine: Optional[UciEngine] = None
+        # Reply the engine expects to its last move (from "bestmove ... ponder ...")
+        self._expected_reply: Optional[chess.Move] = None
+        # Position the ponder search is on (the expected reply played), kept while paused
+        self._ponder_board: Optional[chess.Board] = None
+        self._pondering = False
+        # Serializes starting, pausing and ending the ponder search
+        self._ponder_lock = asyncio.Lock()
         self.name = f"Stockfish (Level {self.difficulty})"
         
     async def _ensure_engine(self):
-        """Ensure engine is initialized"""
-        if self.engine is None:
-            # Try common Stockfish paths
-            stockfish_paths = [
-                Path("/usr/games/stockfish"),
-                Path("/usr/local/bin/stockfish"),
-                Path("/opt/homebrew/bin/stockfish"),
-                Path("stockfish")
-            ]
-            
-            stockfish_path = None
-            for path in stockfish_paths:
-                if path.exists():
-                    stockfish_path = path
-                    break
+        """Ensure engine is initialized (reusing a pooled process when one is running)"""
+        if self.engine is None or not self.engine.is_running():
+            stockfish_path = next((path for path in STOCKFISH_PATHS if path.exists()), None)
             
             if stockfish_path is None:
                 logger.error("Stockfish not found! Install it with: sudo apt install stockfish")
                 raise FileNotFoundError("Stockfish engine not found")
             
-            logger.info(f"Starting Stockfish from {stockfish_path}")
-            self.transport, self.engine = await chess.engine.popen_uci(str(stockfish_path))
-            
-            # Set skill level
-            await self.engine.configure({"Skill Level": self.difficulty})
+            self.engine = await _acquire_engine(stockfish_path)
             
             logger.info(f"Stockfish initialized at skill level {self.difficulty}")
     
@@ -68,23 +395,108 @@ class EngineProvider:
         Returns:
             Best move according to the engine
         """
+        move = self._book_move(board)
+        if move is not None:
+            async with self._ponder_lock:
+                await self._stop_pondering()
+            self._expected_reply = None
+            logger.info(f"Stockfish played book move: {move.uci()}")
+            return move
+        
         await self._ensure_engine()
         
-        # Calculate time based on difficulty (higher = more time)
-        think_time = 0.1 + (self.difficulty * 0.05)  # 0.1s to 1.1s
+        async with self._ponder_lock:
+            ponder_board = self._ponder_board
+            if self._pondering and zobrist_key(ponder_board) == zobrist_key(board):
+                # The opponent played the expected reply: keep the ponder search
+                self._pondering = False
+                self._ponder_board = None
+                logger.info("Stockfish ponderhit")
+                move, self._expected_reply = await self.engine.ponderhit()
+            else:
+                await self._stop_pondering()
+                logger.info(f"Stockfish thinking (difficulty={self.difficulty}, time={ENGINE_THINK_TIME}s)...")
+                
+                # A pooled engine gets "ucinewgame" whenever it moves for a
+                # different game than last time
+                move, self._expected_reply = await self.engine.play(
+                    board, ENGINE_THINK_TIME, game=self.game, skill_level=self.difficulty
+                )
         
-        logger.info(f"Stockfish thinking (difficulty={self.difficulty}, time={think_time}s)...")
+        if move is None:
+            raise chess.engine.EngineError(f"Stockfish found no move in {board.fen()}")
         
-        result = await self.engine.play(
-            board,
-            chess.engine.Limit(time=think_time)
-        )
+        logger.info(f"Stockfish chose: {move.uci()}")
+        return move
+    
+    def _book_move(self, board: chess.Board) -> Optional[chess.Move]:
+        """Opening book move for the position, if it has one and it is legal here"""
+        if not self.opening_book:
+            return None
+        uci = self.opening_book.get(zobrist_key(board))
+        if uci is None:
+            return None
+        move = chess.Move.from_uci(uci)
+        return move if board.is_legal(move) else None
+    
+    async def start_pondering(self, board: chess.Board):
+        """
+        Ponder while the opponent thinks: search the position after the reply
+        the engine expects ("go ponder").
+        
+        If the opponent plays that reply, get_next_move() sends "ponderhit"
+        and the search carries on as the real one. Otherwise it is stopped;
+        the lines it explored stay in Stockfish's transposition table.
         
-        logger.info(f"Stockfish chose: {result.move.uci()}")
-        return result.move
+        Args:
+            board: Position with the opponent to move
+        """
+        reply = self._expected_reply
+        if reply is None or not board.is_legal(reply):
+            return  # After a book move there is no expected reply to ponder on
+        
+        ponder_board = board.copy()
+        ponder_board.push(reply)
+        
+        await self._ensure_engine()
+        async with self._ponder_lock:
+            await self._stop_pondering()
+            self._ponder_board = ponder_board
+            await self._start_ponder_search()
+        logger.debug(f"Stockfish pondering on {reply.uci()}")
+    
+    async def pause_pondering(self):
+        """Stop the ponder search until resume_pondering(), freeing the cores for analysis"""
+        async with self._ponder_lock:
+            if self._pondering:
+                self._pondering = False
+                await self.engine.stop_search()
+    
+    async def resume_pondering(self):
+        """Restart a paused ponder search, unless the opponent has moved in the meantime"""
+        async with self._ponder_lock:
+            if self._ponder_board is not None and not self._pondering and self.engine is not None:
+                await self._start_ponder_search()
+    
+    async def _start_ponder_search(self):
+        """Start searching self._ponder_board (caller holds _ponder_lock)"""
+        await self.engine.start_ponder(
+            self._ponder_board, ENGINE_THINK_TIME, game=self.game, skill_level=self.difficulty
+        )
+        self._pondering = True
+    
+    async def _stop_pondering(self):
+        """End pondering and wait until the engine is free (caller holds _ponder_lock)"""
+        self._ponder_board = None
+        if self._pondering:
+            self._pondering = False
+            await self.engine.stop_search()
     
     async def shutdown(self):
-        """Clean up engine resources"""
-        if self.engine:
-            await self.engine.quit()
-            logger.info("Stockfish engine shutdown")
\ No newline at end of file
+        """Release the engine; the process stays pooled for the next game"""
+        async with self._ponder_lock:
+            if self.engine is not None and self.engine.is_running():
+                await self._stop_pondering()
+            self._ponder_board = None
+            self._pondering = False
+            self.engine = None
\ No newline at end of file
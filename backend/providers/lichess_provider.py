@@ -3,11 +3,21 @@ Lichess Provider - Online play via Lichess API.
 """
 import chess
 import logging
-from typing import Optional
+import random
+import threading
+from typing import Any, Dict, Optional
 import asyncio
 
+from cpu_affinity import pin_worker_thread
+
 logger = logging.getLogger(__name__)
 
+# Game id returned until challenge creation is implemented; never streamed
+MOCK_GAME_ID = "mock_game_id"
+
+# Lichess game statuses in which moves can still arrive
+LIVE_GAME_STATUSES = frozenset({"created", "started"})
+
 
 class LichessProvider:
     """
@@ -27,6 +37,10 @@ class LichessProvider:
         self.game_id: Optional[str] = None
         self.name = "Lichess Opponent"
         
+        # Game states pushed by the stream thread; None marks the end of the stream
+        self._game_states: asyncio.Queue = asyncio.Queue()
+        self._stream_thread: Optional[threading.Thread] = None
+        
         if not token:
             logger.warning("No Lichess token provided - online play will not work")
     
@@ -61,8 +75,64 @@ class LichessProvider:
         # This would use the Lichess API to create a game
         logger.info(f"Creating Lichess challenge with time control {time_control}")
         
-        # Placeholder
-        return "mock_game_id"
+        # Placeholder: no real game, so nothing to stream (see start_game)
+        self.game_id = MOCK_GAME_ID
+        return self.game_id
+    
+    async def start_game(self, game_id: str):
+        """
+        Play an existing Lichess game: opponent moves arrive over its stream.
+        
+        Args:
+            game_id: Lichess game id (e.g. from an accepted challenge)
+        """
+        await self._ensure_client()
+        if self.client is None:
+            raise ConnectionError("Lichess client unavailable (no API token)")
+        
+        self.game_id = game_id
+        self._start_game_stream(game_id)
+    
+    def _start_game_stream(self, game_id: str):
+        """
+        Start streaming the game state (once per game).
+        
+        berserk's stream is a blocking ndjson iterator, so it runs on a daemon
+        thread that forwards each state to the event loop; a stream that stays
+        open for the whole game must not hold a pool worker or block exit.
+        """
+        if self.client is None or self._stream_thread is not None:
+            return
+        
+        self._stream_thread = threading.Thread(
+            target=self._stream_worker,
+            args=(game_id, asyncio.get_running_loop()),
+            name=f"lichess-{game_id}",
+            daemon=True
+        )
+        self._stream_thread.start()
+        logger.info(f"Streaming Lichess game {game_id}")
+    
+    def _stream_worker(self, game_id: str, loop: asyncio.AbstractEventLoop):
+        """Runs on the stream thread: push every game state onto the event loop's queue"""
+        pin_worker_thread()
+        try:
+            for event in self.client.board.stream_game_state(game_id):
+                event_type = event.get("type")
+                if event_type == "gameFull":
+                    state = event["state"]
+                elif event_type == "gameState":
+                    state = event
+                else:
+                    continue  # chat lines, opponent-gone notices
+                loop.call_soon_threadsafe(self._game_states.put_nowait, state)
+        except Exception as e:
+            logger.error(f"Lichess game stream failed: {e}")
+        finally:
+            try:
+                loop.call_soon_threadsafe(self._game_states.put_nowait, None)
+            except RuntimeError:
+                pass  # Event loop already closed
     
     async def get_next_move(self, board: chess.Board) -> chess.Move:
         """
@@ -78,22 +148,48 @@ class LichessProvider:
         
         logger.info("Waiting for opponent's move from Lichess...")
         
-        # TODO: Implement actual Lichess game stream listening
-        # This would poll/stream the game state and return when opponent moves
+        if self._stream_thread is not None:
+            return await self._next_streamed_move(len(board.move_stack))
         
-        # For now, just simulate waiting
-        await asyncio.sleep(1.0)
+        # No game stream (mock game): placeholder - return a random legal move
+        # right away (reservoir sampling over the generator, so no move list is built)
+        move = None
+        for seen, candidate in enumerate(board.legal_moves, 1):
+            if random.randrange(seen) == 0:
+                move = candidate
         
-        # Placeholder - return a random legal move
-        import random
-        legal_moves = list(board.legal_moves)
-        if legal_moves:
-            move = random.choice(legal_moves)
+        if move is not None:
             logger.info(f"Lichess opponent played: {move.uci()}")
             return move
         
         raise Exception("No legal moves available")
     
+    async def _next_streamed_move(self, played: int) -> chess.Move:
+        """
+        Wait for the stream to report a move beyond the first `played` plies.
+        
+        States that only echo moves already on the board (our own move coming
+        back) are skipped.
+        
+        Raises:
+            ConnectionError: If the stream ended
+            RuntimeError: If the game finished without another move
+        """
+        while True:
+            state: Optional[Dict[str, Any]] = await self._game_states.get()
+            if state is None:
+                raise ConnectionError("Lichess game stream closed")
+            
+            moves = state.get("moves", "").split()
+            if len(moves) > played:
+                move = chess.Move.from_uci(moves[played])
+                logger.info(f"Lichess opponent played: {move.uci()}")
+                return move
+            
+            status = state.get("status", "started")
+            if status not in LIVE_GAME_STATUSES:
+                raise RuntimeError(f"Lichess game ended: {status}")
+    
     async def send_move(self, move: chess.Move):
         """
         Send our move to Lichess.
@@ -0,0 +1,177 @@
+"""
+Schema migration tests: open a database created by the original schema.
+Run from backend/ with: python -m pytest tests (or python -m unittest discover tests)
+"""
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database_manager import DatabaseManager, SCHEMA_VERSION  # noqa: E402
+
+# The tables touched by migrations, as the original schema created them
+BASELINE_DDL = """
+CREATE TABLE users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    display_name TEXT,
+    email TEXT UNIQUE,
+    password_hash TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP,
+    total_games INTEGER DEFAULT 0,
+    wins INTEGER DEFAULT 0,
+    losses INTEGER DEFAULT 0,
+    draws INTEGER DEFAULT 0
+);
+CREATE TABLE user_settings (
+    user_id INTEGER PRIMARY KEY,
+    motor_speed TEXT DEFAULT 'MEDIUM',
+    move_animation_speed TEXT DEFAULT 'MEDIUM',
+    clock_enabled BOOLEAN DEFAULT 0,
+    clock_time_minutes INTEGER DEFAULT 10,
+    clock_increment_seconds INTEGER DEFAULT 0,
+    evaluation_enabled BOOLEAN DEFAULT 1,
+    evaluation_level TEXT DEFAULT 'BASIC',
+    show_blunders BOOLEAN DEFAULT 1,
+    show_mistakes BOOLEAN DEFAULT 1,
+    show_inaccuracies BOOLEAN DEFAULT 1,
+    show_good_moves BOOLEAN DEFAULT 1,
+    show_excellent_moves BOOLEAN DEFAULT 1,
+    show_brilliant_moves BOOLEAN DEFAULT 1,
+    hint_count INTEGER DEFAULT 3,
+    leds_enabled BOOLEAN DEFAULT 1,
+    led_brightness INTEGER DEFAULT 128,
+    led_theme TEXT DEFAULT 'CLASSIC',
+    highlight_legal_moves BOOLEAN DEFAULT 1,
+    highlight_last_move BOOLEAN DEFAULT 1,
+    engine_difficulty INTEGER DEFAULT 5,
+    engine_type TEXT DEFAULT 'STOCKFISH',
+    voice_enabled BOOLEAN DEFAULT 1,
+    voice_language TEXT DEFAULT 'en-US',
+    voice_feedback BOOLEAN DEFAULT 1,
+    ui_theme TEXT DEFAULT 'DARK',
+    sound_enabled BOOLEAN DEFAULT 1,
+    sound_volume INTEGER DEFAULT 70,
+    auto_queen_promotion BOOLEAN DEFAULT 0,
+    confirm_moves BOOLEAN DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+);
+CREATE TABLE games (
+    game_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    white_user_id INTEGER,
+    black_user_id INTEGER,
+    game_mode TEXT NOT NULL,
+    start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    end_time TIMESTAMP,
+    result TEXT,
+    termination TEXT,
+    opening_name TEXT,
+    final_fen TEXT,
+    white_time_remaining INTEGER,
+    black_time_remaining INTEGER,
+    lichess_game_id TEXT
+);
+CREATE TABLE move_history (
+    move_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    game_id INTEGER NOT NULL,
+    move_number INTEGER NOT NULL,
+    side TEXT NOT NULL,
+    move_notation TEXT NOT NULL,
+    san_notation TEXT,
+    fen_after TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    time_taken INTEGER,
+    evaluation_cp INTEGER,
+    evaluation_mate INTEGER,
+    classification TEXT
+);
+"""
+
+FEN_AFTER_E4 = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"
+
+
+class BaselineSchemaMigrationTest(unittest.TestCase):
+    """DatabaseManager.initialize() on a database written by the original schema"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmp.name) / "chessboard.db"
+
+        connection = sqlite3.connect(self.db_path)
+        connection.executescript(BASELINE_DDL)
+        connection.execute("INSERT INTO users (username) VALUES ('alice')")
+        connection.execute(
+            "INSERT INTO user_settings (user_id, clock_enabled, show_blunders, confirm_moves) "
+            "VALUES (1, 1, 0, 1)"
+        )
+        connection.execute("INSERT INTO games (white_user_id, game_mode) VALUES (1, 'OFFLINE_PVP')")
+        connection.execute(
+            "INSERT INTO move_history (game_id, move_number, side, move_notation, fen_after) "
+            "VALUES (1, 1, 'WHITE', 'e2e4', ?)",
+            (FEN_AFTER_E4,)
+        )
+        connection.commit()
+        connection.close()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_settings_and_moves_survive_migration(self):
+        async def scenario():
+            db = DatabaseManager(str(self.db_path))
+            await db.initialize()
+            try:
+                settings = await db.get_user_settings(1)
+                self.assertTrue(settings["clock_enabled"])
+                self.assertFalse(settings["show_blunders"])
+                self.assertTrue(settings["confirm_moves"])
+                self.assertTrue(settings["show_mistakes"])
+                self.assertFalse(settings["auto_queen_promotion"])
+
+                await db.update_user_settings(1, {"show_blunders": True, "led_brightness": 200})
+                db._settings_cache.clear()
+                settings = await db.get_user_settings(1)
+                self.assertTrue(settings["show_blunders"])
+                self.assertTrue(settings["clock_enabled"])
+                self.assertEqual(settings["led_brightness"], 200)
+
+                moves = await db.get_game_moves_with_fen(1)
+                self.assertEqual(moves[0]["fen_after"], FEN_AFTER_E4)
+            finally:
+                await db.close()
+
+        asyncio.run(scenario())
+
+        connection = sqlite3.connect(self.db_path)
+        try:
+            (version,) = connection.execute("PRAGMA user_version").fetchone()
+            (fen_type,) = connection.execute("SELECT typeof(fen_after) FROM move_history").fetchone()
+        finally:
+            connection.close()
+        self.assertEqual(version, SCHEMA_VERSION)
+        self.assertEqual(fen_type, "blob")
+
+    def test_migration_runs_once(self):
+        async def open_and_close():
+            db = DatabaseManager(str(self.db_path))
+            await db.initialize()
+            await db.close()
+
+        asyncio.run(open_and_close())
+        asyncio.run(open_and_close())
+
+        connection = sqlite3.connect(self.db_path)
+        try:
+            (flags,) = connection.execute("SELECT flags FROM user_settings").fetchone()
+        finally:
+            connection.close()
+        self.assertTrue(flags & 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Game-over tests: ChessBoardController._handle_game_over() credits both players.
+Run from backend/ with: python -m pytest tests (or python -m unittest discover tests)
+"""
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import chess
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database_manager import DatabaseManager  # noqa: E402
+from game_manager import GameManager  # noqa: E402
+from main import ChessBoardController  # noqa: E402
+
+FOOLS_MATE = ("f2f3", "e7e5", "g2g4", "d8h4")
+
+
+class GameOverStatsTest(unittest.TestCase):
+    """A finished game is saved and counted in the users table in one go"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = Path(self._tmp.name) / "chessboard.db"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_checkmate_credits_winner_and_loser(self):
+        async def scenario():
+            db = DatabaseManager(str(self.db_path))
+            await db.initialize()
+            try:
+                white = await db.create_user("white")
+                black = await db.create_user("black")
+                game_id = await db.create_game(white, black, "OFFLINE_PVP")
+
+                controller = ChessBoardController()
+                controller.db_manager = db
+                controller.game_manager = GameManager(mode="OFFLINE_PVP")
+                controller.game_manager.game_id = game_id
+                for uci in FOOLS_MATE:
+                    controller.game_manager.make_move(chess.Move.from_uci(uci))
+
+                await controller._handle_game_over()
+                controller.executor.shutdown(wait=False)
+
+                white_row = await db.get_user(white)
+                black_row = await db.get_user(black)
+                game = await db.get_game(game_id)
+                return white_row, black_row, game, controller.game_manager.get_fen()
+            finally:
+                await db.close()
+
+        white_row, black_row, game, final_fen = asyncio.run(scenario())
+
+        self.assertEqual(
+            (white_row["total_games"], white_row["wins"], white_row["losses"], white_row["draws"]),
+            (1, 0, 1, 0)
+        )
+        self.assertEqual(
+            (black_row["total_games"], black_row["wins"], black_row["losses"], black_row["draws"]),
+            (1, 1, 0, 0)
+        )
+        self.assertEqual(game["result"], "BLACK_WIN")
+        self.assertEqual(game["termination"], "CHECKMATE")
+        self.assertEqual(game["final_fen"], final_fen)
+
+
+if __name__ == "__main__":
+    unittest.main()
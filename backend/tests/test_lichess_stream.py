@@ -0,0 +1,100 @@
+"""
+Lichess game stream tests: LichessProvider.start_game() against a fake berserk client.
+Run from backend/ with: python -m pytest tests (or python -m unittest discover tests)
+"""
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+import chess
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from providers.lichess_provider import LichessProvider  # noqa: E402
+
+
+class FakeBoardApi:
+    """Stands in for berserk's client.board"""
+
+    def __init__(self, events):
+        self.events = events
+        self.streamed_game_ids = []
+
+    def stream_game_state(self, game_id):
+        """Iterate the canned events, like berserk's ndjson stream"""
+        self.streamed_game_ids.append(game_id)
+        yield from self.events
+
+
+class FakeClient:
+    def __init__(self, events):
+        self.board = FakeBoardApi(events)
+
+
+class LichessStreamTest(unittest.TestCase):
+    """Opponent moves arrive through the daemon stream thread"""
+
+    def setUp(self):
+        self.events = [
+            {"type": "gameFull", "state": {"type": "gameState", "moves": "", "status": "started"}},
+            {"type": "chatLine", "text": "hi"},
+            {"type": "gameState", "moves": "e2e4", "status": "started"},
+            {"type": "gameState", "moves": "e2e4 e7e5", "status": "started"},
+            {"type": "gameState", "moves": "e2e4 e7e5", "status": "resign"},
+        ]
+
+    def _provider(self) -> LichessProvider:
+        provider = LichessProvider(token="test-token")
+        provider.client = FakeClient(self.events)
+        return provider
+
+    def test_streamed_moves_reach_get_next_move(self):
+        async def scenario():
+            provider = self._provider()
+            await provider.start_game("abcd1234")
+
+            board = chess.Board()
+            # Black's provider: waits past the gameFull and chat events for White's move
+            move = await asyncio.wait_for(provider.get_next_move(board), 5)
+            self.assertEqual(move, chess.Move.from_uci("e2e4"))
+            board.push(move)
+
+            move = await asyncio.wait_for(provider.get_next_move(board), 5)
+            self.assertEqual(move, chess.Move.from_uci("e7e5"))
+            board.push(move)
+
+            # The game ends (resign) without another move
+            with self.assertRaises(RuntimeError):
+                await asyncio.wait_for(provider.get_next_move(board), 5)
+
+            self.assertEqual(provider.game_id, "abcd1234")
+            self.assertEqual(provider.client.board.streamed_game_ids, ["abcd1234"])
+            self.assertTrue(provider._stream_thread.daemon)
+
+        asyncio.run(scenario())
+
+    def test_stream_end_raises_connection_error(self):
+        self.events = [{"type": "gameState", "moves": "", "status": "started"}]
+
+        async def scenario():
+            provider = self._provider()
+            await provider.start_game("abcd1234")
+            with self.assertRaises(ConnectionError):
+                await asyncio.wait_for(provider.get_next_move(chess.Board()), 5)
+
+        asyncio.run(scenario())
+
+    def test_start_game_streams_once(self):
+        async def scenario():
+            provider = self._provider()
+            await provider.start_game("abcd1234")
+            await provider.start_game("abcd1234")
+            await asyncio.wait_for(provider.get_next_move(chess.Board()), 5)
+            self.assertEqual(provider.client.board.streamed_game_ids, ["abcd1234"])
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,12 +2,21 @@
 User Manager for the Smart Chess Board.
 Handles user authentication, profiles, and settings.
 """
+import asyncio
 import logging
 from typing import Optional, Dict, Any
+
+import chess
+
 from database_manager import DatabaseManager
+from zobrist_board import ZobristBoard
 
 logger = logging.getLogger(__name__)
 
+# Opening book built at login from the user's recent games against the engine
+OPENING_BOOK_PLIES = 12
+OPENING_BOOK_GAMES = 50
+
 
 class UserManager:
     """Manages user accounts and settings"""
@@ -15,6 +24,9 @@ class UserManager:
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
         self.current_user_id: Optional[int] = None
+        
+        # Zobrist hash -> engine move (UCI) for the logged-in user's openings
+        self.opening_book: Dict[int, str] = {}
     
     async def login(self, username: str, password: Optional[str] = None) -> Optional[int]:
         """
@@ -33,12 +45,10 @@ class UserManager:
             self.current_user_id = user['user_id']
             logger.info(f"User logged in: {username} (ID: {user['user_id']})")
             
-            # Update last login time
-            # await self.db.connection.execute(
-            #     "UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE user_id = ?",
-            #     (user['user_id'],)
-            # )
-            # await self.db.connection.commit()
+            # Update last login time (committed by the write-behind writer)
+            self.db.touch_last_login(user['user_id'])
+            
+            self.opening_book = await self._load_opening_book(user['user_id'])
             
             return user['user_id']
         
@@ -70,13 +80,71 @@ class UserManager:
         settings = await self.db.get_user_settings(user_id)
         return settings or {}
     
-    async def update_setting(self, user_id: int, setting_name: str, value: Any):
-        """Update a single user setting"""
-        await self.db.update_user_settings(user_id, {setting_name: value})
+    def update_setting(self, user_id: int, setting_name: str, value: Any) -> asyncio.Future:
+        """
+        Queue a single user setting update.
+        
+        Returns:
+            Future resolving once the write is committed; await it only if
+            durability matters to the caller
+        """
+        future = self.db.update_user_settings(user_id, {setting_name: value})
         logger.info(f"Updated setting for user {user_id}: {setting_name} = {value}")
+        return future
+    
+    def update_settings(self, user_id: int, settings: Dict[str, Any]) -> asyncio.Future:
+        """
+        Queue several user settings (e.g. a whole settings page) as one UPDATE.
+        
+        Args:
+            user_id: User whose settings to change
+            settings: Setting name -> new value
+            
+        Returns:
+            Future resolving once the write is committed
+        """
+        future = self.db.update_user_settings(user_id, settings)
+        logger.info(f"Updated {len(settings)} settings for user {user_id}: {', '.join(settings)}")
+        return future
+    
+    async def _load_opening_book(self, user_id: int) -> Dict[int, str]:
+        """
+        Replay the first OPENING_BOOK_PLIES of the user's recent engine games
+        and record the engine's move in every position it faced.
+        
+        Returns:
+            Zobrist hash -> move (UCI); later games override earlier ones
+        """
+        rows = await self.db.get_opening_moves(user_id, OPENING_BOOK_PLIES, OPENING_BOOK_GAMES)
+        
+        book: Dict[int, str] = {}
+        game_id = None
+        board = ZobristBoard()
+        engine_color = chess.BLACK
+        for row_game_id, user_is_white, move_notation in rows:
+            if row_game_id != game_id:
+                game_id = row_game_id
+                board = ZobristBoard()
+                engine_color = chess.BLACK if user_is_white else chess.WHITE
+            elif board is None:
+                continue  # Rest of a game whose history didn't replay
+            
+            try:
+                move = board.parse_uci(move_notation)
+            except ValueError:
+                board = None
+                continue
+            
+            if board.turn == engine_color:
+                book[board.zobrist_key] = move_notation
+            board.push(move)
+        
+        logger.info(f"Loaded {len(book)} opening book positions for user {user_id}")
+        return book
     
     async def logout(self):
         """Log out the current user"""
         if self.current_user_id:
             logger.info(f"User {self.current_user_id} logged out")
             self.current_user_id = None
+            self.opening_book = {}
@@ -3,11 +3,36 @@ Voice Service for the Smart Chess Board.
 Handles voice recognition using Vosk for offline speech-to-text.
 """
 import asyncio
+import json
 import logging
-from typing import Optional
+import subprocess
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, Optional
+
+try:
+    from vosk import Model, KaldiRecognizer  # Offline speech recognition
+    from vosk import _ffi as vosk_ffi  # cffi handle, wraps the audio buffer without copying
+except ImportError:
+    Model = KaldiRecognizer = vosk_ffi = None
 
 logger = logging.getLogger(__name__)
 
+# Vosk model directory, loaded once at startup
+VOSK_MODEL_PATH = Path(__file__).parent / "model"
+
+# Microphone capture: the MS3625 pair on I2S, read as 16 kHz mono S16_LE PCM
+AUDIO_DEVICE = "plughw:1,0"
+SAMPLE_RATE = 16000
+
+# Samples fed to the recognizer per read (0.1 s of audio)
+AUDIO_CHUNK_FRAMES = SAMPLE_RATE // 10
+
+# Recognized commands kept until listen_for_command() takes them (oldest dropped)
+UTTERANCE_BACKLOG = 8
+
 
 class VoiceService:
     """
@@ -19,40 +44,145 @@ class VoiceService:
         self.enabled = False
         self.vosk_model = None
         self.recognizer = None
+        self.audio_process: Optional[subprocess.Popen] = None
+        
+        # Capture and decoding run on one dedicated thread, never on the event loop
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self._recognize_task: Optional[asyncio.Task] = None
+        
+        # Recognized text, signalled by _utterance_ready as it arrives
+        self._utterances: Deque[str] = deque(maxlen=UTTERANCE_BACKLOG)
+        self._utterance_ready = asyncio.Event()
+        
+        # One int16 capture buffer, overwritten by every read, and its byte views
+        self._audio_buffer = array("h", bytes(AUDIO_CHUNK_FRAMES * 2))
+        self._audio_bytes = memoryview(self._audio_buffer).cast("B")
+        self._audio_cdata = None
         
     async def initialize(self):
-        """Initialize Vosk voice recognition"""
+        """
+        Initialize Vosk voice recognition.
+        
+        The model is loaded exactly once and a single recognizer is kept for
+        the lifetime of the service; it is reset between utterances instead of
+        being recreated, so the FSTs are never parsed again.
+        """
         logger.info("Initializing voice service...")
         
-        # TODO: Load Vosk model
-        # from vosk import Model, KaldiRecognizer
-        # self.vosk_model = Model("model")  # Path to Vosk model
-        # self.recognizer = KaldiRecognizer(self.vosk_model, 16000)
+        if Model is None or not VOSK_MODEL_PATH.is_dir():
+            logger.warning("Voice service running in MOCK MODE")
+            self.enabled = False  # Disabled until Vosk is set up
+            return
+        
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vosk")
+        try:
+            # Model loading parses the FSTs and takes seconds; keep it off the loop
+            loop = asyncio.get_running_loop()
+            self.vosk_model = await loop.run_in_executor(self.executor, Model, str(VOSK_MODEL_PATH))
+            self.recognizer = KaldiRecognizer(self.vosk_model, SAMPLE_RATE)
+            self._audio_cdata = vosk_ffi.from_buffer(self._audio_buffer)
+            
+            # Unbuffered pipe, read straight into the capture buffer
+            self.audio_process = subprocess.Popen(
+                ["arecord", "-q", "-D", AUDIO_DEVICE, "-f", "S16_LE",
+                 "-r", str(SAMPLE_RATE), "-c", "1", "-t", "raw"],
+                stdout=subprocess.PIPE, bufsize=0
+            )
+        except Exception as e:
+            logger.error(f"Failed to start voice recognition: {e}")
+            logger.warning("Voice service running in MOCK MODE")
+            self.executor.shutdown(wait=False)
+            self.executor = None
+            self.recognizer = None
+            self.enabled = False
+            return
         
-        logger.warning("Voice service running in MOCK MODE")
-        self.enabled = False  # Disabled until Vosk is set up
+        self.enabled = True
+        self._recognize_task = asyncio.create_task(self._recognize_loop(), name="vosk_recognize")
+        logger.info(f"Vosk model loaded from {VOSK_MODEL_PATH}")
         
     async def shutdown(self):
         """Shutdown voice service"""
+        self.enabled = False
+        if self.audio_process:
+            self.audio_process.terminate()
+            # The capture thread sees EOF once arecord exits; reap it on the same thread
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self.audio_process.wait)
+            self.audio_process.stdout.close()
+        if self._recognize_task:
+            await asyncio.gather(self._recognize_task, return_exceptions=True)
+        if self.executor:
+            self.executor.shutdown()
+        self.audio_process = None
+        self._recognize_task = None
+        self.executor = None
+        self._audio_cdata = None
+        self.recognizer = None
+        self.vosk_model = None
         logger.info("Voice service shutdown")
     
     def is_enabled(self) -> bool:
         """Check if voice recognition is enabled"""
         return self.enabled
     
-    async def listen_for_command(self) -> Optional[str]:
+    async def listen_for_command(self) -> str:
+        """
+        Wait for the next voice command.
+        
+        Sleeps on an event until the recognizer finishes an utterance, so in
+        mock mode (nothing recognized) it never wakes.
+        
+        Returns:
+            Recognized command text
+        """
+        while not self._utterances:
+            self._utterance_ready.clear()
+            await self._utterance_ready.wait()
+        return self._utterances.popleft()
+    
+    async def _recognize_loop(self):
+        """Decode audio on the voice executor and publish every recognized utterance"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                text = await loop.run_in_executor(self.executor, self._decode_chunk)
+            except EOFError:
+                if self.enabled:
+                    logger.error("Microphone capture stopped; disabling voice recognition")
+                    self.enabled = False
+                return
+            
+            if text:
+                self._utterances.append(text)
+                self._utterance_ready.set()
+    
+    def _decode_chunk(self) -> Optional[str]:
         """
-        Listen for a voice command.
+        Capture one chunk of audio and feed it to the recognizer.
+        Runs on the voice executor thread.
         
         Returns:
-            Recognized command text, or None
+            Recognized text when the chunk ends an utterance, else None
+            
+        Raises:
+            EOFError: If the capture process has stopped
         """
-        # TODO: Implement Vosk speech recognition
-        # This would read from the MS3625 microphones via I2S
+        stream = self.audio_process.stdout
+        filled = 0
+        while filled < len(self._audio_bytes):
+            read = stream.readinto(self._audio_bytes[filled:])
+            if not read:
+                raise EOFError("audio capture closed")
+            filled += read
+        
+        if not self.recognizer.AcceptWaveform(self._audio_cdata):
+            return None
         
-        # For now, return None (no commands in mock mode)
-        await asyncio.sleep(0.1)
-        return None
+        # End of utterance: take the text and reuse the recognizer for the next one
+        text = json.loads(self.recognizer.Result()).get("text", "")
+        self.recognizer.Reset()
+        return text or None
     
     def enable(self):
         """Enable voice recognition"""
@@ -0,0 +1,119 @@
+"""
+Chess board with an incrementally maintained Zobrist hash.
+Keys are identical to chess.polyglot.zobrist_hash(), so they index the same
+caches and books, but a push only re-hashes the squares the move touched.
+"""
+from typing import List, Optional
+
+import chess
+import chess.polyglot
+
+# Polyglot key table: 12 x 64 piece-square keys, then castling, en passant, turn
+POLYGLOT_KEYS = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+CASTLING_KEY_OFFSET = 768
+EP_KEY_OFFSET = 772
+TURN_KEY_INDEX = 780
+
+
+def zobrist_key(board: chess.Board) -> int:
+    """Polyglot Zobrist hash of a board, incremental when the board supports it"""
+    if isinstance(board, ZobristBoard):
+        return board.zobrist_key
+    return chess.polyglot.zobrist_hash(board)
+
+
+class ZobristBoard(chess.Board):
+    """
+    chess.Board that keeps its Polyglot Zobrist hash up to date on push/pop.
+    
+    Every python-chess method that rewrites the position (set_fen, reset,
+    set_piece_at, ...) clears the move stack, which drops the key; it is
+    then recomputed in full on next use. Writing board attributes such as
+    turn directly bypasses the key.
+    """
+    
+    _zobrist_key: Optional[int]
+    _zobrist_stack: List[Optional[int]]
+    
+    @property
+    def zobrist_key(self) -> int:
+        """Polyglot Zobrist hash of the current position"""
+        if self._zobrist_key is None:
+            self._zobrist_key = chess.polyglot.zobrist_hash(self)
+        return self._zobrist_key
+    
+    def clear_stack(self):
+        """Clear the move stack and forget the key (the position was replaced)"""
+        super().clear_stack()
+        self._zobrist_key = None
+        self._zobrist_stack = []
+    
+    def push(self, move: chess.Move):
+        """Play a move, XOR-ing the changed squares and state flags into the key"""
+        key = self._zobrist_key
+        if key is None:
+            # Nothing to update; keep the stack aligned and stay lazy
+            self._zobrist_stack.append(None)
+            super().push(move)
+            return
+        
+        pieces_before = (self.pawns, self.knights, self.bishops, self.rooks, self.queens, self.kings)
+        white_before = self.occupied_co[chess.WHITE]
+        state_before = self._state_key()
+        
+        super().push(move)
+        
+        pieces_after = (self.pawns, self.knights, self.bishops, self.rooks, self.queens, self.kings)
+        white_after = self.occupied_co[chess.WHITE]
+        
+        # Only squares whose piece changed contribute: 2-4 per move.
+        # Keys per piece type: black at base + square, white at base + 64 + square
+        for piece_index, (before, after) in enumerate(zip(pieces_before, pieces_after)):
+            base = 128 * piece_index
+            for square in chess.scan_forward(before ^ after):
+                bit = chess.BB_SQUARES[square]
+                white = white_before if before & bit else white_after
+                key ^= POLYGLOT_KEYS[base + (64 if white & bit else 0) + square]
+            
+            # Same piece type, other color: a capture of a like piece (pawn takes pawn)
+            for square in chess.scan_forward(before & after & (white_before ^ white_after)):
+                key ^= POLYGLOT_KEYS[base + square] ^ POLYGLOT_KEYS[base + 64 + square]
+        
+        self._zobrist_stack.append(self._zobrist_key)
+        self._zobrist_key = key ^ state_before ^ self._state_key()
+    
+    def pop(self) -> chess.Move:
+        """Take back the last move and restore the key it replaced"""
+        move = super().pop()
+        # A copied board has moves but no keys for them: fall back to a full hash
+        self._zobrist_key = self._zobrist_stack.pop() if self._zobrist_stack else None
+        return move
+    
+    def _state_key(self) -> int:
+        """Castling, en passant and side-to-move part of the Polyglot hash"""
+        key = 0
+        
+        # Castling flags
+        if self.castling_rights:
+            if self.has_kingside_castling_rights(chess.WHITE):
+                key ^= POLYGLOT_KEYS[CASTLING_KEY_OFFSET]
+            if self.has_queenside_castling_rights(chess.WHITE):
+                key ^= POLYGLOT_KEYS[CASTLING_KEY_OFFSET + 1]
+            if self.has_kingside_castling_rights(chess.BLACK):
+                key ^= POLYGLOT_KEYS[CASTLING_KEY_OFFSET + 2]
+            if self.has_queenside_castling_rights(chess.BLACK):
+                key ^= POLYGLOT_KEYS[CASTLING_KEY_OFFSET + 3]
+        
+        # En passant file, only when a pawn stands ready to capture
+        if self.ep_square:
+            if self.turn == chess.WHITE:
+                ep_mask = chess.shift_down(chess.BB_SQUARES[self.ep_square])
+            else:
+                ep_mask = chess.shift_up(chess.BB_SQUARES[self.ep_square])
+            ep_mask = chess.shift_left(ep_mask) | chess.shift_right(ep_mask)
+            if ep_mask & self.pawns & self.occupied_co[self.turn]:
+                key ^= POLYGLOT_KEYS[EP_KEY_OFFSET + chess.square_file(self.ep_square)]
+        
+        if self.turn == chess.WHITE:
+            key ^= POLYGLOT_KEYS[TURN_KEY_INDEX]
+        return key